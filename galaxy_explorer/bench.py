@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+# Headless frame benchmark.
+#   python -m galaxy_explorer.bench --frames 600 --output bench.json
+#   python -m galaxy_explorer.bench --baseline bench.json   (exit code 1 on regression)
+import os
+# Must be set before pygame initializes its display/audio subsystems
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import contextlib
+import json
+import math
+import platform
+import random
+import sys
+import pygame
+
+from . import settings
+from .core import assets, quality, texture_jobs
+from .core.input_state import KeyState
+from .core.profiler import FrameProfiler, PHASES
+from .main import Game, parse_window_size
+
+DEFAULT_FRAMES = 300
+DEFAULT_SEED = 1234
+DEFAULT_TOLERANCE = 0.15 # Allowed slowdown vs. baseline before flagging a regression
+
+# --- Scripted inputs ---
+def _orbit_mouse(frame, radius, period):
+    a = frame / period * math.tau
+    return (int(settings.SCREEN_WIDTH / 2 + math.cos(a) * radius),
+            int(settings.SCREEN_HEIGHT / 2 + math.sin(a) * radius))
+
+def _galaxy_script(game, frame):
+    # Sweep the cursor across each system in turn so hover highlights and labels change
+    systems = game.game_context['star_systems']
+    target = systems[(frame // 30) % len(systems)].galaxy_pos
+    return [], (int(target.x) + (frame % 30) - 15, int(target.y)), KeyState()
+
+def _star_system_script(game, frame):
+    keys = {pygame.K_w} if (frame // 60) % 2 == 0 else {pygame.K_a}
+    if (frame // 90) % 3 == 2:
+        keys.add(pygame.K_LSHIFT)
+    return [], _orbit_mouse(frame, 200, 240), KeyState(keys)
+
+def _planet_script(game, frame):
+    keys = {pygame.K_w} if frame % 40 < 10 else set()
+    return [], _orbit_mouse(frame, 120, 120), KeyState(keys)
+
+def _ground_script(game, frame):
+    keys = {pygame.K_d} if (frame // 120) % 2 == 0 else {pygame.K_a}
+    if frame % 45 == 0:
+        keys.add(pygame.K_SPACE)
+    return [], (0, 0), KeyState(keys)
+
+def _hyperspace_script(game, frame):
+    return [], (0, 0), KeyState()
+
+# --- Scenario entry (leaves the game in the view under test) ---
+def _system_with_planets(game):
+    for i, system in enumerate(game.game_context['star_systems']):
+        if system.planets:
+            return i
+    return 0
+
+def _enter_galaxy(game):
+    game.transition_to_state(settings.GALAXY_VIEW, {})
+
+def _enter_star_system(game):
+    game.transition_to_state(settings.STAR_SYSTEM_VIEW,
+                             {'system_idx': _system_with_planets(game), 'from_galaxy_map_entry': True})
+
+def _enter_planet(game):
+    system_idx = _system_with_planets(game)
+    if game.game_context['current_star_system_idx'] != system_idx:
+        game.transition_to_state(settings.STAR_SYSTEM_VIEW, {'system_idx': system_idx})
+    game.transition_to_state(settings.PLANET_OVERHEAD_VIEW, {'planet_idx': 0})
+
+def _enter_ground(game):
+    _enter_planet(game)
+    game.transition_to_state(settings.GROUND_VIEW, {'region_idx': 0})
+
+def _enter_hyperspace(game):
+    target = (game.game_context['current_star_system_idx'] + 1) % len(game.game_context['star_systems'])
+    game.transition_to_state(settings.HYPERSPACE_TRANSITION, {'target_system_idx': target})
+
+SCENARIOS = (
+    ('GalaxyView', _enter_galaxy, _galaxy_script),
+    ('StarSystemView', _enter_star_system, _star_system_script),
+    ('PlanetView', _enter_planet, _planet_script),
+    ('GroundView', _enter_ground, _ground_script),
+    ('HyperspaceView', _enter_hyperspace, _hyperspace_script),
+)
+
+# --- Running ---
+def _summarize(profiler, view_name):
+    rows = [row for row in profiler.rows() if row[1] == view_name]
+    stats = profiler.stats(view_name=view_name)
+    totals = [sum(row[2:]) for row in rows]
+    summary = {'frames': len(rows)}
+    for phase in PHASES + ('total',):
+        p50, p95, p99 = stats[phase]
+        summary[phase] = {'p50': round(p50, 4), 'p95': round(p95, 4), 'p99': round(p99, 4)}
+    summary['total']['mean'] = round(sum(totals) / len(totals), 4) if totals else 0.0
+    summary['total']['max'] = round(max(totals), 4) if totals else 0.0
+    draws = profiler.draw_stats(view_name=view_name)
+    summary['draws'] = {'commands': round(draws['commands'], 1), 'calls': round(draws['calls'], 1)}
+    return summary
+
+def run_scenario(game, view_name, enter, script, frames, seed):
+    random.seed(seed)
+    enter(game)
+    game.profiler = FrameProfiler(capacity=max(1, frames), enabled=True)
+    game.profiler.show_overlay = False
+    dt = 1.0 / settings.FPS
+    for frame in range(frames):
+        game.sync_simulation()
+        if type(game.current_view).__name__ != view_name:
+            enter(game) # e.g. hyperspace arrival or flying off a planet: restart the scenario
+        events, mouse_pos, keys = script(game, frame)
+        game.run_frame(dt, events, mouse_pos, keys)
+    return _summarize(game.profiler, view_name)
+
+def run_belt_sweep(game, belt_sizes, frames, seed):
+    """StarSystemView frame time per asteroid belt size (rocks), for spotting where the belt stops scaling."""
+    system = game.game_context['star_systems'][_system_with_planets(game)]
+    sweep = {}
+    for count in belt_sizes:
+        print(f"Benchmarking StarSystemView with {count} asteroids for {frames} frames...")
+        system.rebuild_belts(count)
+        summary = run_scenario(game, 'StarSystemView', _enter_star_system, _star_system_script, frames, seed)
+        sweep[str(count)] = {phase: summary[phase] for phase in ('update', 'render', 'total')}
+    system.rebuild_belts(settings.ASTEROID_BELT_SIZE)
+    return sweep
+
+def run_benchmark(frames=DEFAULT_FRAMES, seed=DEFAULT_SEED, views=None, quality_level=None, threaded=False,
+                  memory_report_path=None, belt_sizes=None, render_scale=None, window_size=None):
+    game = Game(seed=seed, threaded=threaded, memory_report_path=memory_report_path, render_scale=render_scale,
+                window_size=window_size)
+    # run_frame never feeds the quality controller, so the level stays fixed for the whole run
+    quality.set_level(settings.QUALITY_START_LEVEL if quality_level is None else quality_level)
+    results = {
+        'meta': {
+            'frames_per_view': frames,
+            'seed': seed,
+            'quality': quality.level_name(),
+            'threaded': bool(threaded),
+            'screen': [settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT],
+            'window': list(game.window.get_size()),
+            'render_size': list(game.screen.get_size()),
+            'video_driver': os.environ.get('SDL_VIDEODRIVER'),
+            'pygame': pygame.version.ver,
+            'python': platform.python_version(),
+        },
+        'views': {},
+    }
+    for view_name, enter, script in SCENARIOS:
+        if views and view_name not in views:
+            continue
+        print(f"Benchmarking {view_name} for {frames} frames...")
+        results['views'][view_name] = run_scenario(game, view_name, enter, script, frames, seed)
+    if belt_sizes:
+        results['belts'] = run_belt_sweep(game, belt_sizes, frames, seed)
+    results['assets'] = assets.SURFACES.stats()
+    results['prefetch'] = game.game_context['texture_prefetcher'].stats()
+    if game.memory:
+        game.memory.write_report(game)
+    if game.sim_thread:
+        game.sim_thread.stop()
+    texture_jobs.shutdown()
+    pygame.quit()
+    return results
+
+def compare_to_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Returns a list of regressions (total frame time p50/p95 slower than baseline by > tolerance)."""
+    regressions = []
+    for view_name, current in results['views'].items():
+        reference = baseline.get('views', {}).get(view_name)
+        if not reference:
+            continue
+        for metric in ('p50', 'p95'):
+            cur_ms = current['total'][metric]
+            ref_ms = reference['total'][metric]
+            if ref_ms > 0 and cur_ms > ref_ms * (1 + tolerance):
+                regressions.append({
+                    'view': view_name, 'metric': f"total.{metric}",
+                    'baseline_ms': ref_ms, 'current_ms': cur_ms,
+                    'change_pct': round((cur_ms / ref_ms - 1) * 100, 1),
+                })
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless per-view frame time benchmark.")
+    parser.add_argument('--frames', type=int, default=DEFAULT_FRAMES, help="frames to run per view")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--views', nargs='*', help="subset of view class names to run")
+    parser.add_argument('--quality', type=int, help="fixed quality level index (default QUALITY_START_LEVEL)")
+    parser.add_argument('--threaded', action='store_true', help="run view updates on the simulation thread")
+    parser.add_argument('--render-scale', type=float,
+                        help="render resolution as a fraction of the window, 0.25-1.0 (default RENDER_SCALE)")
+    parser.add_argument('--window-size', type=parse_window_size, metavar='WxH',
+                        help="window size in pixels (default WINDOW_SIZE)")
+    parser.add_argument('--memory-report', metavar='PATH', help="write a tracemalloc per-view memory report")
+    parser.add_argument('--belt-sizes', type=int, nargs='*', metavar='N',
+                        help="also run StarSystemView once per asteroid belt size (e.g. 0 1000 4000)")
+    parser.add_argument('--output', help="write results JSON here instead of stdout")
+    parser.add_argument('--baseline', help="results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed fractional slowdown vs. baseline (default 0.15)")
+    args = parser.parse_args(argv)
+
+    # Game progress messages go to stderr so stdout stays valid JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        results = run_benchmark(args.frames, args.seed, args.views, args.quality, args.threaded,
+                                args.memory_report, args.belt_sizes, args.render_scale, args.window_size)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        results['regressions'] = compare_to_baseline(results, baseline, args.tolerance)
+        for r in results['regressions']:
+            print(f"REGRESSION {r['view']} {r['metric']}: {r['baseline_ms']} -> {r['current_ms']} ms "
+                  f"(+{r['change_pct']}%)", file=sys.stderr)
+        if results['regressions']:
+            exit_code = 1
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return exit_code
+
+if __name__ == '__main__':
+    sys.exit(main())
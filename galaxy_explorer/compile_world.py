@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# Offline galaxy compiler: pre-generates a galaxy into a memory-mappable world file.
+#   python -m galaxy_explorer.compile_world galaxy.gxw --systems 100000 --seed 7
+#   python -m galaxy_explorer.main --world galaxy.gxw
+import argparse
+import contextlib
+import os
+import random
+import sys
+import time
+
+from . import settings
+from .models.world import DEFAULT_STAR_SYSTEMS, StarSystem
+from .models.world_file import WorldFile, write_world
+
+STAR_COLORS = (settings.YELLOW, settings.BLUE, settings.RED, settings.WHITE, settings.PURPLE, settings.ORANGE)
+_NAME_PREFIXES = ("HD", "Gliese", "Kepler", "Ross", "Wolf", "Luyten", "Tau", "Sigma", "Vega", "Draco")
+
+def iter_galaxy(count, seed):
+    """The hand-placed systems first, then procedural ones spread over the galaxy map."""
+    rng = random.Random(seed)
+    for i in range(count):
+        if i < len(DEFAULT_STAR_SYSTEMS):
+            name, galaxy_pos, star_color, num_planets = DEFAULT_STAR_SYSTEMS[i]
+        else:
+            name = f"{rng.choice(_NAME_PREFIXES)} {i}"
+            galaxy_pos = (rng.randint(30, settings.SCREEN_WIDTH - 30), rng.randint(60, settings.SCREEN_HEIGHT - 60))
+            star_color = rng.choice(STAR_COLORS)
+            num_planets = rng.randint(1, 12) # More than fit on screen makes a scrolling system
+        yield StarSystem(name, galaxy_pos, star_color, num_planets, seed=rng.getrandbits(32))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate a galaxy into a world file for --world.")
+    parser.add_argument('output', help="world file to write")
+    parser.add_argument('--systems', type=int, default=len(DEFAULT_STAR_SYSTEMS), help="number of star systems")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true', help="show per-system generation warnings")
+    args = parser.parse_args(argv)
+
+    t_start = time.perf_counter()
+    tmp_path = args.output + '.tmp'
+    with open(os.devnull, 'w') as devnull, \
+         contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+        systems, planets, regions, size = write_world(tmp_path, iter_galaxy(args.systems, args.seed), args.seed)
+    os.replace(tmp_path, args.output)
+    compile_s = time.perf_counter() - t_start
+
+    t_start = time.perf_counter()
+    world = WorldFile(args.output)
+    world.close()
+    open_ms = (time.perf_counter() - t_start) * 1000.0
+    print(f"Wrote {args.output}: {systems} systems, {planets} planets, {regions} regions, "
+          f"{size / 1024:.1f} KiB in {compile_s:.1f}s (opens in {open_ms:.2f} ms).")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,18 +1,73 @@
 # -*- coding: utf-8 -*-
+import json
+import os
 import pygame
 import sys
+import threading
 import traceback
+from collections import OrderedDict
+from .. import settings
 
 # Global font storage
 _FONT = None
 _SMALL_FONT = None
+_FONTS = {} # (face, size) -> pygame.font.Font
+_font_paths = None # System font name -> file path (or None if not installed), persisted to FONT_CACHE_PATH
+
+def _load_font_paths():
+    global _font_paths
+    if _font_paths is None:
+        _font_paths = {}
+        try:
+            with open(settings.FONT_CACHE_PATH) as f:
+                _font_paths = {name: path for name, path in json.load(f).items()
+                               if path is None or os.path.isfile(path)}
+        except (OSError, ValueError):
+            pass
+    return _font_paths
+
+def _save_font_paths():
+    try:
+        directory = os.path.dirname(settings.FONT_CACHE_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(settings.FONT_CACHE_PATH, 'w') as f:
+            json.dump(_font_paths, f, indent=1)
+    except OSError as e:
+        print(f"Warning: could not write font cache {settings.FONT_CACHE_PATH}: {e}")
+
+def find_font_path(face):
+    """File path for a font face: None for pygame's bundled default, a file path as is, or a system font name.
+
+    System names are resolved with pygame.font.match_font, which scans every
+    installed font the first time it runs (fc-list on Linux). The answer is
+    saved to FONT_CACHE_PATH so later starts skip the scan.
+    """
+    if face is None or os.path.isfile(face):
+        return face
+    paths = _load_font_paths()
+    if face not in paths:
+        paths[face] = pygame.font.match_font(face)
+        _save_font_paths()
+    return paths[face]
+
+def get_font(size, face=None):
+    """Cached Font of the given size. face defaults to settings.FONT_FACE."""
+    if face is None:
+        face = settings.FONT_FACE
+    key = (face, size)
+    font = _FONTS.get(key)
+    if font is None:
+        font = pygame.font.Font(find_font_path(face), size) # None path = bundled default font
+        _FONTS[key] = font
+    return font
 
 def load_fonts():
     global _FONT, _SMALL_FONT
     print("Loading Fonts...")
     try:
-        _FONT = pygame.font.SysFont(None, 30)
-        _SMALL_FONT = pygame.font.SysFont(None, 20)
+        _FONT = get_font(30)
+        _SMALL_FONT = get_font(20)
         print("Fonts Loaded.")
         return True
     except Exception as e:
@@ -26,33 +81,153 @@ def get_main_font():
     if _FONT is None:
         # Fallback if not loaded, though load_fonts should be called at init
         try:
-            return pygame.font.SysFont(None, 30)
+            return get_font(30)
         except: return None # Should not happen if pygame.font.init() worked
     return _FONT
 
 def get_small_font():
     if _SMALL_FONT is None:
         try:
-            return pygame.font.SysFont(None, 20)
+            return get_font(20)
         except: return None
     return _SMALL_FONT
 
-# Placeholder for other asset loading (images, sounds)
-# Example:
-# _images_cache = {}
-# def load_image(name, colorkey=None):
-#     if name in _images_cache:
-#         return _images_cache[name]
-#     # fullname = os.path.join('assets/images', name)
-#     # try:
-#     #     image = pygame.image.load(fullname)
-#     # except pygame.error as message:
-#     #     print('Cannot load image:', fullname)
-#     #     raise SystemExit(message)
-#     # image = image.convert()
-#     # if colorkey is not None:
-#     #     if colorkey == -1:
-#     #         colorkey = image.get_at((0,0))
-#     #     image.set_colorkey(colorkey, pygame.RLEACCEL)
-#     # _images_cache[name] = image
-#     # return image
\ No newline at end of file
+# --- Surfaces ---
+def surface_bytes(surface):
+    """Approximate pixel memory held by a surface"""
+    if surface is None: return 0
+    return surface.get_pitch() * surface.get_height()
+
+def to_display_format(surface, alpha=True):
+    """Converts a surface to the display's pixel format so blits skip per-pixel conversion.
+
+    Returns the surface unchanged when no display mode is set yet.
+    """
+    if surface is None or pygame.display.get_surface() is None:
+        return surface
+    try:
+        return surface.convert_alpha() if alpha else surface.convert()
+    except pygame.error as e:
+        print(f"Warning: surface conversion failed: {e}")
+        return surface
+
+class SurfaceCache:
+    """LRU cache of display-format surfaces with a byte budget.
+
+    Keys are tuples whose first element names the category ('text', 'glow', ...),
+    which stats() uses to break down memory. Evicted surfaces stay valid for
+    whoever still holds them; they are simply regenerated on the next request.
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._surfaces = OrderedDict() # key -> (surface, bytes), least recently used first
+        self._lock = threading.RLock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._surfaces.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, surface, alpha=True):
+        """Stores (and returns) the display-format version of surface under key."""
+        surface = to_display_format(surface, alpha)
+        size = surface_bytes(surface)
+        with self._lock:
+            self.discard(key)
+            self._surfaces[key] = (surface, size)
+            self.bytes += size
+            self._evict()
+        return surface
+
+    def get_or_create(self, key, factory, alpha=True):
+        """Cached surface for key, building it with factory() on a miss. factory may return None."""
+        surface = self.get(key)
+        if surface is None:
+            surface = factory()
+            if surface is not None:
+                surface = self.put(key, surface, alpha)
+        return surface
+
+    def items(self):
+        """(key, surface) pairs, least recently used first."""
+        with self._lock:
+            return [(key, entry[0]) for key, entry in self._surfaces.items()]
+
+    def discard(self, key):
+        with self._lock:
+            entry = self._surfaces.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry[1]
+
+    def clear(self, category=None):
+        with self._lock:
+            for key in [k for k in self._surfaces if category is None or k[0] == category]:
+                self.discard(key)
+
+    def _evict(self):
+        # The newest entry is never evicted, even if it alone exceeds the budget
+        while self.bytes > self.budget_bytes and len(self._surfaces) > 1:
+            _, (_, size) = self._surfaces.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            categories = {}
+            for key, (_, size) in self._surfaces.items():
+                count, total = categories.get(key[0], (0, 0))
+                categories[key[0]] = (count + 1, total + size)
+            lookups = self.hits + self.misses
+            return {
+                'surfaces': len(self._surfaces),
+                'bytes': self.bytes,
+                'budget_bytes': self.budget_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'categories': {name: {'surfaces': count, 'bytes': total}
+                               for name, (count, total) in sorted(categories.items())},
+            }
+
+# Shared by the drawing helpers in core/utils.py and the models
+SURFACES = SurfaceCache(settings.ASSET_MEMORY_BUDGET_MB * 1024 * 1024)
+
+def get_surface(key, factory, alpha=True):
+    return SURFACES.get_or_create(key, factory, alpha)
+
+def load_image(name, colorkey=None):
+    """Loads an image from ASSET_IMAGE_DIR once, in display format."""
+    def _load():
+        fullname = os.path.join(settings.ASSET_IMAGE_DIR, name)
+        try:
+            image = pygame.image.load(fullname)
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Cannot load image {fullname}: {e}")
+            return None
+        if colorkey is not None:
+            image = to_display_format(image, alpha=False)
+            if colorkey == -1:
+                colorkey = image.get_at((0, 0))
+            image.set_colorkey(colorkey, pygame.RLEACCEL)
+        return image
+    return get_surface(('image', name, colorkey), _load, alpha=colorkey is None)
+
+def surface_stats_report():
+    stats = SURFACES.stats()
+    lines = [f"Surfaces: {stats['surfaces']} ({stats['bytes'] / 1024:.0f} KiB of "
+             f"{stats['budget_bytes'] / 1024:.0f} KiB), hit rate {stats['hit_rate'] * 100:.1f}% "
+             f"({stats['hits']} hits / {stats['misses']} misses), {stats['evictions']} evictions"]
+    for name, entry in stats['categories'].items():
+        lines.append(f"  {name:<8} {entry['surfaces']:5d} surfaces {entry['bytes'] / 1024:9.1f} KiB")
+    return "\n".join(lines)
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import pygame
+from .. import settings
+
+class Camera:
+    """Maps world coordinates to the screen for views whose world is bigger than the window.
+
+    follow() centres the view on a target but stops at the edges of the world
+    bounds. Along an axis where the bounds are no wider than the screen, the
+    view stays centred on them, so a world whose bounds are the screen rect
+    maps 1:1 onto the screen. Offsets are whole pixels, so sprites don't
+    shimmer as the camera moves.
+    """
+
+    def __init__(self, screen_size=None):
+        self.width, self.height = screen_size or (settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT)
+        self.x = self.y = 0
+
+    @staticmethod
+    def _axis(target, low, high, size):
+        if high - low <= size:
+            return (low + high - size) // 2
+        return int(round(min(max(target - size / 2, low), high - size)))
+
+    def follow(self, target, bounds):
+        """Moves the view to target. Returns True if it moved."""
+        x = self._axis(target[0], bounds.left, bounds.right, self.width)
+        y = self._axis(target[1], bounds.top, bounds.bottom, self.height)
+        moved = (x, y) != (self.x, self.y)
+        self.x, self.y = x, y
+        return moved
+
+    @property
+    def offset(self):
+        return (self.x, self.y)
+
+    def view_rect(self):
+        """The part of the world on screen."""
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+    def to_screen(self, pos):
+        return (pos[0] - self.x, pos[1] - self.y)
+
+    def to_world(self, pos):
+        return (pos[0] + self.x, pos[1] + self.y)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import weakref
+import pygame
+
+def _scale_sprite(source, size):
+    # Colorkeyed sprites keep hard edges (smoothscale would blend the key colour into them);
+    # everything else is filtered, which keeps downscaled text and gradients readable
+    if source.get_colorkey() is None and source.get_bitsize() >= 24:
+        return pygame.transform.smoothscale(source, size)
+    return pygame.transform.scale(source, size)
+
+class Canvas:
+    """What views draw on: a render surface addressed in logical (SCREEN_WIDTH x SCREEN_HEIGHT) coordinates.
+
+    The render surface may be smaller than the logical size (RENDER_SCALE below 1) or larger
+    (a big window). Positions, lengths and rects are multiplied by scale on the way through,
+    and sprites are drawn from a copy scaled once per source surface, so a source must not be
+    redrawn in place after it was blitted (per-surface alpha may change). At scale 1 every call
+    goes straight to the surface and the frame is pixel-identical to drawing on it directly.
+    """
+
+    def __init__(self, surface, logical_size=None):
+        self.surface = surface
+        self.size = tuple(logical_size or surface.get_size())
+        self.scale = surface.get_width() / self.size[0]
+        self.scaled = self.scale != 1.0
+        self._sprites = weakref.WeakKeyDictionary()
+
+    # --- Logical size, as a pygame.Surface would report it ---
+    def get_size(self):
+        return self.size
+
+    def get_width(self):
+        return self.size[0]
+
+    def get_height(self):
+        return self.size[1]
+
+    def get_rect(self, **kwargs):
+        rect = pygame.Rect((0, 0), self.size)
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+        return rect
+
+    # --- Coordinate mapping ---
+    def map_point(self, pos):
+        s = self.scale
+        return (int(pos[0] * s), int(pos[1] * s))
+
+    def map_length(self, length):
+        """A radius or line width in render pixels; positive lengths never vanish, 0 (filled) stays 0."""
+        return max(1, round(length * self.scale)) if length > 0 else length
+
+    def map_rect(self, rect):
+        s = self.scale
+        rect = pygame.Rect(rect)
+        left, top = round(rect.left * s), round(rect.top * s)
+        return pygame.Rect(left, top, round(rect.right * s) - left, round(rect.bottom * s) - top)
+
+    def unmap_rect(self, rect):
+        """A rect on the render surface back in logical coordinates (covering it)."""
+        s = self.scale
+        left, top = int(rect.left / s), int(rect.top / s)
+        return pygame.Rect(left, top, int(rect.right / s) + 1 - left, int(rect.bottom / s) + 1 - top)
+
+    def sprite(self, source):
+        """source at render scale (source itself at scale 1), cached for as long as source lives."""
+        if not self.scaled:
+            return source
+        sprite = self._sprites.get(source)
+        if sprite is None:
+            w, h = source.get_size()
+            sprite = _scale_sprite(source, (max(1, round(w * self.scale)), max(1, round(h * self.scale))))
+            self._sprites[source] = sprite
+        alpha = source.get_alpha()
+        if alpha != sprite.get_alpha():
+            sprite.set_alpha(alpha)
+        return sprite
+
+    # --- Drawing, with pygame.Surface / pygame.draw arguments in logical coordinates ---
+    def fill(self, color, rect=None, special_flags=0):
+        if rect is not None and self.scaled:
+            rect = self.map_rect(rect)
+        return self.surface.fill(color, rect, special_flags)
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        if self.scaled:
+            source = self.sprite(source)
+            dest = self.map_point(dest)
+            if area is not None:
+                area = self.map_rect(area)
+        return self.surface.blit(source, dest, area, special_flags)
+
+    def blits(self, items, doreturn=True):
+        if self.scaled:
+            items = self.map_blits(items, all(len(item) == 2 for item in items))
+        return self.surface.blits(items, doreturn)
+
+    def map_blits(self, items, plain):
+        """(surface, dest[, area, special_flags]) items mapped onto the render surface;
+        plain says they are all (surface, dest) pairs."""
+        s = self.scale
+        # Runs reuse a handful of sprites (rocks, dots) many times: scale each source once
+        sprites = {item[0]: None for item in items}
+        for source in sprites:
+            sprites[source] = self.sprite(source)
+        if plain:
+            return [(sprites[source], (int(dest[0] * s), int(dest[1] * s))) for source, dest in items]
+        return [(sprites[item[0]], (int(item[1][0] * s), int(item[1][1] * s)),
+                 None if len(item) < 3 or item[2] is None else self.map_rect(item[2]),
+                 item[3] if len(item) > 3 else 0) for item in items]
+
+    def blit_rotated(self, source, angle, center):
+        """Blits source rotated by angle degrees (pygame.transform.rotate) centred on center.
+        Rotates the render-scale copy, so a smaller render surface also makes the rotation cheaper."""
+        rotated = pygame.transform.rotate(self.sprite(source), angle)
+        if self.scaled:
+            center = self.map_point(center)
+        return self.surface.blit(rotated, rotated.get_rect(center=(int(center[0]), int(center[1]))))
+
+    def draw_circle(self, color, center, radius, width=0):
+        if self.scaled:
+            center, radius, width = self.map_point(center), self.map_length(radius), self.map_length(width)
+        return pygame.draw.circle(self.surface, color, center, radius, width)
+
+    def draw_line(self, color, start, end, width=1):
+        if self.scaled:
+            start, end, width = self.map_point(start), self.map_point(end), self.map_length(width)
+        return pygame.draw.line(self.surface, color, start, end, width)
+
+    def draw_polygon(self, color, points, width=0):
+        if self.scaled:
+            points, width = [self.map_point(p) for p in points], self.map_length(width)
+        return pygame.draw.polygon(self.surface, color, points, width)
+
+    def draw_rect(self, color, rect, width=0):
+        if self.scaled:
+            rect, width = self.map_rect(rect), self.map_length(width)
+        return pygame.draw.rect(self.surface, color, rect, width)
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+class KeyState:
+    """Stand-in for pygame.key.get_pressed() built from a set of pressed key codes.
+
+    Views only index it (keys[pygame.K_w]), so scripted or replayed input can be
+    fed through the same handle_event/update path as live input.
+    """
+    __slots__ = ('pressed',)
+
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+    def __eq__(self, other):
+        return isinstance(other, KeyState) and self.pressed == other.pressed
+
+    def __hash__(self):
+        return hash(self.pressed)
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+import time
+import tracemalloc
+import traceback
+from collections import Counter
+import pygame
+from .. import settings
+from . import assets
+
+# Allocations made by the instrumentation itself are not interesting
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+def _format_bytes(size):
+    sign = '-' if size < 0 else '+'
+    size = abs(size)
+    if size >= 1024 * 1024:
+        return f"{sign}{size / (1024 * 1024):.2f} MiB"
+    return f"{sign}{size / 1024:.1f} KiB"
+
+def _surfaces_in(obj, seen):
+    """Bytes of Surfaces referenced by obj's attributes (one container level deep), skipping ids in seen."""
+    total = 0
+    values = list(vars(obj).values()) if hasattr(obj, '__dict__') else []
+    for value in values:
+        if isinstance(value, (list, tuple)):
+            candidates = value
+        elif isinstance(value, dict):
+            candidates = value.values()
+        else:
+            candidates = (value,)
+        for candidate in candidates:
+            if isinstance(candidate, pygame.Surface) and id(candidate) not in seen:
+                seen.add(id(candidate))
+                total += assets.surface_bytes(candidate)
+    return total
+
+def surface_bytes_by_owner(game):
+    """Estimated pygame Surface memory per owner. Shared surfaces are counted once, for the first owner."""
+    seen = set()
+    owners = {}
+    screen_bytes = 0
+    for surface in {id(game.screen): game.screen, id(game.window): game.window}.values():
+        seen.add(id(surface))
+        if surface.get_parent() is None: # A screen drawn straight into the window shares its pixels
+            screen_bytes += assets.surface_bytes(surface)
+    owners['display'] = screen_bytes
+    for key, surface in assets.SURFACES.items():
+        if id(surface) not in seen:
+            seen.add(id(surface))
+            name = f"assets:{key[0]}"
+            owners[name] = owners.get(name, 0) + assets.surface_bytes(surface)
+    owners['PlayerShip'] = _surfaces_in(game.game_context['player_ship'], seen)
+    owners['PlayerCharacter'] = _surfaces_in(game.game_context['player_char'], seen)
+    for key, view in game.views.items():
+        owners[f"{type(view).__name__}{list(key[1:]) if len(key) > 1 else ''}"] = _surfaces_in(view, seen)
+    return owners
+
+class MemoryTracker:
+    """tracemalloc-based memory accounting for soak runs (MEMORY_TRACKING / --memory-report).
+
+    A snapshot is taken at every view transition and every
+    MEMORY_SNAPSHOT_INTERVAL_FRAMES; the growth between two snapshots is
+    charged to the view that was active in between. write_report() lists
+    growth per view with its top allocation sites, the overall top growth
+    sites since start, and Surface bytes per owner.
+    """
+
+    def __init__(self, report_path, interval_frames=None, top_n=None):
+        self.report_path = report_path
+        self.interval_frames = settings.MEMORY_SNAPSHOT_INTERVAL_FRAMES if interval_frames is None else interval_frames
+        self.top_n = settings.MEMORY_REPORT_TOP_N if top_n is None else top_n
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.MEMORY_TRACE_FRAMES)
+        self._first = self._last = self._take()
+        self._last_frame = 0
+        self.per_view = {} # view name -> {'intervals', 'net_bytes', 'sites': Counter}
+        self.timeline = [] # (frame, label, view name, traced bytes, peak bytes, surface bytes)
+        self.snapshot_ms = 0.0
+
+    def _take(self):
+        return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+    def checkpoint(self, game, label):
+        t_start = time.perf_counter()
+        snapshot = self._take()
+        view_name = type(game.current_view).__name__
+        entry = self.per_view.setdefault(view_name, {'intervals': 0, 'net_bytes': 0, 'sites': Counter()})
+        entry['intervals'] += 1
+        for stat in snapshot.compare_to(self._last, 'lineno'):
+            entry['net_bytes'] += stat.size_diff
+            if stat.size_diff > 0:
+                entry['sites'][str(stat.traceback[0])] += stat.size_diff
+        self._last = snapshot
+        self._last_frame = game.frame_count
+
+        current, peak = tracemalloc.get_traced_memory()
+        surfaces = sum(surface_bytes_by_owner(game).values())
+        self.timeline.append((game.frame_count, label, view_name, current, peak, surfaces))
+        self.snapshot_ms += (time.perf_counter() - t_start) * 1000.0
+
+    def tick(self, game):
+        if game.frame_count - self._last_frame >= self.interval_frames:
+            game.sync_simulation() # Owners' attributes must not change while they are walked
+            self.checkpoint(game, "interval")
+
+    def report(self, game):
+        top_n = self.top_n
+        lines = ["Memory report (tracemalloc; growth is charged to the view active between snapshots)", ""]
+
+        lines.append("Growth per view:")
+        for view_name, entry in sorted(self.per_view.items(), key=lambda item: -item[1]['net_bytes']):
+            lines.append(f"  {view_name:<16} {_format_bytes(entry['net_bytes']):>12} over {entry['intervals']} intervals")
+            for site, size in entry['sites'].most_common(min(5, top_n)):
+                lines.append(f"      {_format_bytes(size):>12}  {site}")
+
+        lines.append("")
+        lines.append(f"Top {top_n} growth sites since start:")
+        for stat in self._last.compare_to(self._first, 'traceback')[:top_n]:
+            if stat.size_diff <= 0:
+                break
+            lines.append(f"  {_format_bytes(stat.size_diff):>12} ({stat.count_diff:+d} blocks)")
+            for frame_line in stat.traceback.format()[-4:]:
+                lines.append(f"      {frame_line.strip()}")
+
+        lines.append("")
+        lines.append("Surface bytes per owner (now):")
+        for owner, size in sorted(surface_bytes_by_owner(game).items(), key=lambda item: -item[1]):
+            if size:
+                lines.append(f"  {owner:<32} {size / 1024:10.1f} KiB")
+
+        lines.append("")
+        lines.append("Snapshots (frame, label, view, traced, peak, surfaces):")
+        for frame, label, view_name, current, peak, surfaces in self.timeline:
+            lines.append(f"  {frame:7d}  {label:<40} {view_name:<16} {current / 1024:9.0f} KiB "
+                         f"{peak / 1024:9.0f} KiB {surfaces / 1024:9.0f} KiB")
+        lines.append(f"Instrumentation time: {self.snapshot_ms:.0f} ms over {len(self.timeline)} snapshots")
+        return "\n".join(lines)
+
+    def write_report(self, game):
+        try:
+            self.checkpoint(game, "final")
+            with open(self.report_path, 'w') as f:
+                f.write(self.report(game) + "\n")
+            print(f"Memory report written to {self.report_path}.")
+        except Exception as e:
+            print(f"Failed to write memory report to {self.report_path}: {e}")
+            traceback.print_exc()
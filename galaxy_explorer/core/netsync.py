@@ -0,0 +1,412 @@
+# -*- coding: utf-8 -*-
+import math
+import socket
+import struct
+import time
+from collections import deque
+import pygame
+from .. import settings
+from ..views import registry
+
+# One datagram per simulation tick, server -> each client (little-endian):
+#   header   magic, version, sequence, frame, send time (server monotonic s), field mask
+#   VIEW     state code, system/planet/region index, hyperspace target (-1 = none), world seed
+#   SHIP     pos x/y f32, angle u16, velocity x/y f16
+#   CHAR     pos x/y, world scroll f32
+#   PLANETS  count, then orbit angle and rotation angle per planet as u16
+# A field is sent while its packed bytes changed within the last NET_REDUNDANT_TICKS
+# packets, so a change survives that many lost packets in a row, and every field goes
+# in keyframes (every NET_KEYFRAME_INTERVAL ticks), which heal longer outages. Values
+# are absolute, so a lost packet never corrupts later ones.
+MAGIC = b'GN'
+VERSION = 2 # 2: 32-bit system and hyperspace target indices
+HELLO = b'GNHI'
+BYE = b'GNBY'
+_HEADER = struct.Struct('<2sBIIdB')
+_VIEW = struct.Struct('<BihhiI')
+_SHIP = struct.Struct('<2fH2e')
+_CHAR = struct.Struct('<3f')
+_COUNT = struct.Struct('<B')
+_ANGLES = struct.Struct('<2H')
+
+F_VIEW, F_SHIP, F_CHAR, F_PLANETS, F_KEYFRAME = 1, 2, 4, 8, 16
+_MISSING_KEPT = 256 # Sequences a client keeps looking out for after they were skipped
+_FIELDS = (F_VIEW, F_SHIP, F_CHAR, F_PLANETS)
+
+_STATES = (settings.GALAXY_VIEW, settings.STAR_SYSTEM_VIEW, settings.PLANET_OVERHEAD_VIEW,
+           settings.GROUND_VIEW, settings.HYPERSPACE_TRANSITION)
+
+def _pack_angle(degrees):
+    return int(round((degrees % 360.0) * 65536.0 / 360.0)) & 0xFFFF
+
+def _unpack_angle(value):
+    return value * 360.0 / 65536.0
+
+def _index(value):
+    return -1 if value is None else value
+
+def _lerp_angle(a, b, t):
+    return a + ((b - a + 180.0) % 360.0 - 180.0) * t
+
+def parse_address(text, default_host='127.0.0.1'):
+    """'PORT' or 'HOST:PORT' -> (host, port)."""
+    host, _, port = text.rpartition(':')
+    return (host or default_host, int(port))
+
+def encode_fields(game):
+    """{field bit: packed bytes} for the game's current state."""
+    ctx = game.game_context
+    view_name = registry.get_state_name(game.current_view)
+    state_code = _STATES.index(view_name) if view_name in _STATES else 0
+    target_idx = game.current_view.target_system_idx if view_name == settings.HYPERSPACE_TRANSITION else None
+    ship = ctx['player_ship']
+    fields = {
+        F_VIEW: _VIEW.pack(state_code, ctx['current_star_system_idx'], _index(ctx['current_planet_idx']),
+                           _index(ctx['current_region_idx']), _index(target_idx), game.seed & 0xFFFFFFFF),
+        F_SHIP: _SHIP.pack(ship.pos.x, ship.pos.y, _pack_angle(ship.angle), ship.velocity.x, ship.velocity.y),
+    }
+    if view_name == settings.GROUND_VIEW:
+        char = ctx['player_char']
+        fields[F_CHAR] = _CHAR.pack(char.pos.x, char.pos.y, char.world_scroll)
+    if view_name in (settings.STAR_SYSTEM_VIEW, settings.PLANET_OVERHEAD_VIEW):
+        planets = ctx['current_star_system'].planets
+        fields[F_PLANETS] = _COUNT.pack(len(planets)) + b''.join(
+            _ANGLES.pack(_pack_angle(p['angle']), _pack_angle(p['rotation_angle'])) for p in planets)
+    return fields
+
+class SyncServer:
+    """Publishes the game's state to every client that said hello, once per tick (non-blocking UDP)."""
+
+    def __init__(self, address, keyframe_interval=None, redundant_ticks=None, report_ticks=None):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(address)
+        self.socket.setblocking(False)
+        self.address = self.socket.getsockname()
+        self.keyframe_interval = settings.NET_KEYFRAME_INTERVAL if keyframe_interval is None else keyframe_interval
+        self.redundant_ticks = settings.NET_REDUNDANT_TICKS if redundant_ticks is None else redundant_ticks
+        self.clients = set()
+        self.sequence = 0
+        self._last_fields = {}
+        self._changed_at = {} # field bit -> sequence of the packet that first carried its current value
+        self.ticks = deque(maxlen=settings.NET_REPORT_TICKS if report_ticks is None else report_ticks)
+        self.total_bytes = 0
+        self.keyframes = 0
+        self.encode_ms = 0.0
+
+    def _accept(self):
+        while True:
+            try:
+                data, addr = self.socket.recvfrom(64)
+            except (BlockingIOError, InterruptedError):
+                return
+            except ConnectionResetError: # Windows reports an earlier send to a closed port here
+                continue
+            if data == HELLO and addr not in self.clients:
+                self.clients.add(addr)
+                self._last_fields = {} # Next packet carries everything
+                print(f"Sync client connected from {addr[0]}:{addr[1]}.")
+            elif data == BYE:
+                self.clients.discard(addr)
+
+    def build_packet(self, game):
+        t_start = time.perf_counter()
+        fields = encode_fields(game)
+        keyframe = self.sequence % self.keyframe_interval == 0 or not self._last_fields
+        mask = F_KEYFRAME if keyframe else 0
+        body = []
+        for bit in _FIELDS:
+            packed = fields.get(bit)
+            if packed is None:
+                continue
+            if self._last_fields.get(bit) != packed:
+                self._changed_at[bit] = self.sequence
+            recent = (self.sequence - self._changed_at.get(bit, self.sequence)) & 0xFFFFFFFF < self.redundant_ticks
+            if keyframe or recent:
+                mask |= bit
+                body.append(packed)
+        self._last_fields = fields
+        packet = _HEADER.pack(MAGIC, VERSION, self.sequence, game.frame_count, time.monotonic(), mask) + b''.join(body)
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+        self.encode_ms += (time.perf_counter() - t_start) * 1000.0
+        return packet, keyframe
+
+    def publish(self, game, send=None):
+        """Encodes this tick and sends it. send(packet, addr) may stand in for the socket (e.g. to simulate loss)."""
+        self._accept()
+        if not self.clients:
+            return
+        packet, keyframe = self.build_packet(game)
+        for addr in list(self.clients):
+            try:
+                if send:
+                    send(packet, addr)
+                else:
+                    self.socket.sendto(packet, addr)
+            except OSError as e:
+                print(f"Sync send to {addr} failed: {e}; dropping client.")
+                self.clients.discard(addr)
+        sent = len(packet) * len(self.clients)
+        self.total_bytes += sent
+        self.keyframes += keyframe
+        self.ticks.append((game.frame_count, len(packet), sent, keyframe))
+
+    def report(self):
+        ticks = len(self.ticks)
+        per_tick = sum(t[2] for t in self.ticks) / ticks if ticks else 0.0
+        return {
+            'clients': len(self.clients),
+            'packets': self.sequence,
+            'keyframes': self.keyframes,
+            'bytes_total': self.total_bytes,
+            'bytes_per_tick': round(per_tick, 1),
+            'kbit_per_s': round(per_tick * settings.FPS * 8 / 1000.0, 1),
+            'encode_ms_total': round(self.encode_ms, 2),
+        }
+
+    def write_tick_report(self, path):
+        """Per-tick CSV: frame, packet bytes, bytes sent to all clients, keyframe."""
+        with open(path, 'w') as f:
+            f.write("frame,packet_bytes,bytes_sent,keyframe\n")
+            for frame, size, sent, keyframe in self.ticks:
+                f.write(f"{frame},{size},{sent},{int(keyframe)}\n")
+
+    def close(self):
+        self.socket.close()
+
+class SyncClient:
+    """Receives a SyncServer's ticks into a replica of its state and interpolates between them.
+
+    Packets older than the newest one seen are dropped. Ship pose and planet
+    angles are rendered NET_INTERP_DELAY_MS in the past, between the two
+    received ticks that bracket that time; view changes apply immediately.
+    """
+
+    def __init__(self, server_address, report_ticks=None):
+        self.server_address = server_address
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False) # Bound to an ephemeral port by the first hello
+        self.interp_delay = settings.NET_INTERP_DELAY_MS / 1000.0
+        self.last_sequence = None
+        self.last_frame = 0
+        self.view = None # (state name, system, planet, region, hyperspace target)
+        self.seed = None # The server's world seed
+        self._seed_warned = False
+        self.ship = None # (x, y, angle, vx, vy)
+        self.char = None
+        self.planets = None # [(orbit angle, rotation angle)]
+        self._history = deque(maxlen=8) # (server time, ship, planets)
+        self._clock_offset = None # Local minus server clock, lower bound (includes the smallest latency seen)
+        self._last_hello = 0.0
+        self.received = self.stale = self.late = self.lost = self.invalid = 0
+        self._missing = set() # Sequences skipped over; one arriving later was reordered, not lost
+        self.bytes_received = 0
+        self.ticks = deque(maxlen=settings.NET_REPORT_TICKS if report_ticks is None else report_ticks)
+        self.hello()
+
+    def hello(self):
+        self._last_hello = time.monotonic()
+        try:
+            self.socket.sendto(HELLO, self.server_address)
+        except OSError as e:
+            print(f"Sync hello to {self.server_address} failed: {e}")
+
+    def poll(self):
+        """Reads every queued packet. Returns the number applied."""
+        now = time.monotonic()
+        if self.last_sequence is None and now - self._last_hello > 1.0:
+            self.hello() # Server may have started after us
+        applied = 0
+        while True:
+            try:
+                data = self.socket.recv(2048)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionResetError:
+                continue
+            if self._receive(data, time.monotonic()):
+                applied += 1
+        return applied
+
+    def _receive(self, data, recv_time):
+        try:
+            magic, version, sequence, frame, send_time, mask = _HEADER.unpack_from(data, 0)
+        except struct.error:
+            self.invalid += 1
+            return False
+        if magic != MAGIC or version != VERSION:
+            self.invalid += 1
+            return False
+        lost = 0
+        if self.last_sequence is not None:
+            step = (sequence - self.last_sequence) & 0xFFFFFFFF
+            if step == 0 or step >= 0x80000000: # Duplicate or older than what we have
+                if sequence in self._missing:
+                    self._missing.discard(sequence)
+                    self.lost -= 1 # Counted when its gap opened, but it was only late
+                    self.late += 1
+                else:
+                    self.stale += 1
+                return False
+            lost = step - 1
+        try:
+            self._apply_fields(data, _HEADER.size, mask)
+        except (struct.error, IndexError):
+            self.invalid += 1
+            return False
+        self.lost += lost
+        self._note_gap(sequence, lost)
+        self.last_sequence = sequence
+        self.last_frame = frame
+        self.received += 1
+        self.bytes_received += len(data)
+
+        offset = recv_time - send_time
+        if self._clock_offset is None or offset < self._clock_offset:
+            self._clock_offset = offset
+        self._history.append((send_time, self.ship, self.planets))
+        latency_ms = (recv_time - send_time) * 1000.0
+        self.ticks.append((frame, sequence, len(data), round(latency_ms, 3), lost, self.stale))
+        return True
+
+    def _note_gap(self, sequence, lost):
+        """Remembers the sequences a gap skipped (the most recent _MISSING_KEPT), so a late arrival can be told from loss."""
+        for back in range(min(lost, _MISSING_KEPT), 0, -1):
+            self._missing.add((sequence - back) & 0xFFFFFFFF)
+        if len(self._missing) > _MISSING_KEPT:
+            # Anything that far behind is treated as lost for good
+            self._missing = {s for s in self._missing if (sequence - s) & 0xFFFFFFFF <= _MISSING_KEPT}
+
+    def _apply_fields(self, data, offset, mask):
+        if mask & F_VIEW:
+            code, system_idx, planet_idx, region_idx, target_idx, self.seed = _VIEW.unpack_from(data, offset); offset += _VIEW.size
+            self.view = (_STATES[code], system_idx, None if planet_idx < 0 else planet_idx,
+                         None if region_idx < 0 else region_idx, None if target_idx < 0 else target_idx)
+        if mask & F_SHIP:
+            x, y, angle, vx, vy = _SHIP.unpack_from(data, offset); offset += _SHIP.size
+            self.ship = (x, y, _unpack_angle(angle), vx, vy)
+        if mask & F_CHAR:
+            self.char = _CHAR.unpack_from(data, offset); offset += _CHAR.size
+        if mask & F_PLANETS:
+            (count,) = _COUNT.unpack_from(data, offset); offset += _COUNT.size
+            planets = []
+            for _ in range(count):
+                orbit, rotation = _ANGLES.unpack_from(data, offset); offset += _ANGLES.size
+                planets.append((_unpack_angle(orbit), _unpack_angle(rotation)))
+            self.planets = planets
+
+    def sample(self, now=None):
+        """Interpolated (ship, planets) for display, or the newest values if there is nothing to blend."""
+        if not self._history:
+            return self.ship, self.planets
+        now = time.monotonic() if now is None else now
+        render_time = now - self._clock_offset - self.interp_delay # On the server's clock
+        newer = None
+        for entry in reversed(self._history):
+            if entry[0] <= render_time:
+                if newer is None:
+                    return entry[1], entry[2] # Nothing newer yet: hold the latest
+                return self._blend(entry, newer, render_time)
+            newer = entry
+        return newer[1], newer[2] # Older than everything we kept
+
+    @staticmethod
+    def _blend(older, newer, render_time):
+        span = newer[0] - older[0]
+        t = (render_time - older[0]) / span if span > 0 else 1.0
+        ship_a, ship_b = older[1], newer[1]
+        ship = ship_b
+        if ship_a and ship_b:
+            ship = (ship_a[0] + (ship_b[0] - ship_a[0]) * t, ship_a[1] + (ship_b[1] - ship_a[1]) * t,
+                    _lerp_angle(ship_a[2], ship_b[2], t), ship_b[3], ship_b[4])
+        planets_a, planets_b = older[2], newer[2]
+        planets = planets_b
+        if planets_a and planets_b and len(planets_a) == len(planets_b):
+            planets = [(_lerp_angle(a[0], b[0], t), _lerp_angle(a[1], b[1], t)) for a, b in zip(planets_a, planets_b)]
+        return ship, planets
+
+    def apply(self, game):
+        """Makes a display-only Game show the replica: follows view changes, then poses ship and planets.
+
+        Runs after the local view's update (fed no input), so view-local animation
+        keeps going while everything the server sends is overwritten.
+        """
+        self.poll()
+        if game.current_view:
+            game.current_view.next_state_request = None # Only the server changes views
+        if self.view is None:
+            return
+        if self.seed != game.seed & 0xFFFFFFFF and not self._seed_warned:
+            print(f"Warning: sync server's world seed is {self.seed}, ours is {game.seed}; "
+                  f"restart with --seed {self.seed} (and the same --world) to see the same galaxy.")
+            self._seed_warned = True
+        ctx = game.game_context
+        state, system_idx, planet_idx, region_idx, target_idx = self.view
+        current = (registry.get_state_name(game.current_view), ctx['current_star_system_idx'],
+                   ctx['current_planet_idx'], ctx['current_region_idx'])
+        if current != self.view[:4] and 0 <= system_idx < len(ctx['star_systems']):
+            ctx['current_star_system_idx'] = system_idx
+            ctx['current_star_system'] = ctx['star_systems'][system_idx]
+            ctx['current_planet_idx'] = planet_idx
+            ctx['current_region_idx'] = region_idx
+            params = {'system_idx': system_idx}
+            if state == settings.HYPERSPACE_TRANSITION:
+                params = {'target_system_idx': target_idx}
+            elif state == settings.PLANET_OVERHEAD_VIEW:
+                params = {'planet_idx': planet_idx}
+            elif state == settings.GROUND_VIEW:
+                params = {'region_idx': region_idx}
+            game.transition_to_state(state, params)
+
+        ship_pose, planets = self.sample()
+        if ship_pose:
+            ship = ctx['player_ship']
+            x, y, angle, vx, vy = ship_pose
+            ship.pos = pygame.Vector2(x, y)
+            ship.velocity = pygame.Vector2(vx, vy)
+            if not math.isclose(angle, ship.angle, abs_tol=0.01):
+                ship.angle = angle
+            ship.update_rect()
+            ship.rect.center = (int(x), int(y))
+        if planets and state in (settings.STAR_SYSTEM_VIEW, settings.PLANET_OVERHEAD_VIEW):
+            system_planets = ctx['current_star_system'].planets
+            if len(system_planets) == len(planets):
+                for planet, (orbit, rotation) in zip(system_planets, planets):
+                    planet['angle'] = orbit
+                    planet['rotation_angle'] = rotation
+        if self.char and state == settings.GROUND_VIEW:
+            char = ctx['player_char']
+            char.pos = pygame.Vector2(self.char[0], self.char[1])
+            char.world_scroll = self.char[2]
+            char.rect.center = (int(char.pos.x + char.world_scroll), int(char.pos.y))
+
+    def report(self):
+        latencies = sorted(t[3] for t in self.ticks)
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else None
+        expected = self.received + self.lost
+        return {
+            'received': self.received,
+            'lost': self.lost, # Skipped and never seen, reordered packets excluded
+            'late_dropped': self.late, # Arrived after a newer packet: not lost, but too late to apply
+            'stale_dropped': self.stale,
+            'invalid': self.invalid,
+            'loss_rate': round(self.lost / expected, 4) if expected else 0.0,
+            'bytes_received': self.bytes_received,
+            'latency_ms_p50': pct(0.5),
+            'latency_ms_p95': pct(0.95),
+        }
+
+    def write_tick_report(self, path):
+        """Per-tick CSV: server frame, sequence, bytes, latency, packets skipped before it (lost or still to come
+        late), stale drops so far."""
+        with open(path, 'w') as f:
+            f.write("frame,sequence,bytes,latency_ms,gap_before,stale_total\n")
+            for tick in self.ticks:
+                f.write(",".join(str(v) for v in tick) + "\n")
+
+    def close(self):
+        try:
+            self.socket.sendto(BYE, self.server_address)
+        except OSError:
+            pass
+        self.socket.close()
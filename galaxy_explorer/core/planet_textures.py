@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import threading
+import pygame
+from .. import settings
+from . import assets, texture_jobs, utils
+
+# A planet's region texture is kept as a mip chain in the asset cache: level 0 is the
+# overhead texture (PLANET_OVERHEAD_SCALE), each further level half the size, down to
+# the star system view's scale of 1. Levels are keyed by (system seed, planet index).
+_pending = {} # (system seed, planet idx) -> TextureJob building the chain
+_pending_lock = threading.Lock() # The prefetcher requests from the simulation thread in threaded mode
+
+def mip_scales():
+    scales = [float(settings.PLANET_OVERHEAD_SCALE)]
+    while scales[-1] / 2 > 1.0:
+        scales.append(scales[-1] / 2)
+    if scales[-1] != 1.0:
+        scales.append(1.0)
+    return scales
+
+MIP_SCALES = mip_scales()
+OVERHEAD_LEVEL = 0
+SYSTEM_LEVEL = len(MIP_SCALES) - 1
+
+def nearest_level(scale):
+    return min(range(len(MIP_SCALES)), key=lambda level: abs(MIP_SCALES[level] - scale))
+
+def build_mip_chain(texture, planet_data):
+    """[texture, ...] down to SYSTEM_LEVEL. Each level is a box-filtered reduction of the one above
+    (smoothscale averages every source pixel when shrinking)."""
+    chain = [texture]
+    for scale in MIP_SCALES[1:]:
+        chain.append(pygame.transform.smoothscale(chain[-1], utils.planet_texture_size(planet_data, scale)))
+    return chain
+
+def _key(system_seed, planet_idx, level):
+    return ('planet_mip', system_seed, planet_idx, level)
+
+def store(system_seed, planet_idx, planet_data, texture):
+    """Caches the chain for a freshly built overhead texture. Returns the cached level 0."""
+    chain = build_mip_chain(texture, planet_data)
+    return [assets.SURFACES.put(_key(system_seed, planet_idx, level), surface)
+            for level, surface in enumerate(chain)][OVERHEAD_LEVEL]
+
+def cached(system_seed, planet_idx, level):
+    return assets.SURFACES.get(_key(system_seed, planet_idx, level))
+
+def _chain_job(planet_data):
+    def build(job):
+        texture = utils.create_planet_texture(planet_data, settings.PLANET_OVERHEAD_SCALE,
+                                              cancelled=lambda: job.cancelled)
+        return build_mip_chain(texture, planet_data) if texture is not None else None
+    return texture_jobs.TextureJob(f"planet mips r{planet_data['radius']}", [build])
+
+def request(system_seed, planet_idx, planet_data, level):
+    """The cached level, or None while the chain is built in the background (call again next frame)."""
+    pending_key = (system_seed, planet_idx)
+    with _pending_lock:
+        job = _pending.get(pending_key)
+        if job is not None:
+            finished = job.done or job.cancelled
+            result = job.poll()
+            if result:
+                for chain_level, surface in enumerate(result[1]):
+                    assets.SURFACES.put(_key(system_seed, planet_idx, chain_level), surface)
+            if not finished:
+                return None
+            del _pending[pending_key]
+        surface = cached(system_seed, planet_idx, level)
+        if surface is None and job is None: # Never built, or evicted since
+            _pending[pending_key] = texture_jobs.submit(_chain_job(planet_data))
+        return surface
+
+def is_pending(system_seed, planet_idx):
+    """True while a chain build for the planet is queued or running."""
+    with _pending_lock:
+        return (system_seed, planet_idx) in _pending
+
+def cancel(system_seed, planet_idx):
+    with _pending_lock:
+        job = _pending.pop((system_seed, planet_idx), None)
+    if job is not None:
+        job.cancel()
+
+def cancel_pending(keep_seed=None):
+    """Cancels background builds, except those for the system with keep_seed."""
+    with _pending_lock:
+        for key in [k for k in _pending if k[0] != keep_seed]:
+            _pending.pop(key).cancel()
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import pygame
+from .. import settings
+from . import planet_textures, utils
+
+class PlanetTexturePrefetcher:
+    """Builds overhead textures for the planets the ship is likely to visit next.
+
+    StarSystemView calls update() every frame. Planets within PREFETCH_RANGE
+    are scored by closeness and by how directly the ship is heading at them;
+    the best PREFETCH_CANDIDATES get their mip chain built through
+    planet_textures.request(), the same build the star system view asks for,
+    so a planet is never built twice. Planets whose chain is cached or already
+    being built are skipped; the prefetcher starts at most
+    PREFETCH_MAX_IN_FLIGHT builds, estimated under PREFETCH_MEMORY_MB, and
+    cancels them if the ship turns away. The finished chain lives in the asset
+    cache. PlanetView.on_enter claim()s the planet: a hit if its chain was
+    cached, late if it was still being built, a miss otherwise.
+    """
+
+    def __init__(self, max_in_flight=None, budget_mb=None, candidates=None):
+        self.max_in_flight = settings.PREFETCH_MAX_IN_FLIGHT if max_in_flight is None else max_in_flight
+        self.budget_bytes = int((settings.PREFETCH_MEMORY_MB if budget_mb is None else budget_mb) * 1024 * 1024)
+        self.candidates = settings.PREFETCH_CANDIDATES if candidates is None else candidates
+        self.system_seed = None
+        self._jobs = {} # (system seed, planet idx) -> (planet data, estimated bytes), for builds started here
+        self.hits = self.late = self.misses = 0
+        self.submitted = self.wasted = 0
+
+    @staticmethod
+    def _estimate_bytes(planet_data):
+        return sum(width * height * 4 for width, height in
+                   (utils.planet_texture_size(planet_data, scale) for scale in planet_textures.MIP_SCALES))
+
+    def _bytes_committed(self):
+        return sum(estimate for _, estimate in self._jobs.values())
+
+    def score(self, star_system, ship):
+        """[(score, planet idx)] best first, for planets worth prefetching."""
+        velocity = ship.velocity
+        speed = velocity.length()
+        scored = []
+        for idx in range(len(star_system.planets)):
+            offset = pygame.Vector2(star_system.get_planet_position(idx)) - ship.pos
+            distance = offset.length()
+            if distance > settings.PREFETCH_RANGE:
+                continue
+            heading = velocity.dot(offset) / (speed * distance) if speed > 0.05 and distance > 0 else 0.0
+            score = (1.0 - distance / settings.PREFETCH_RANGE) * (0.5 + 0.5 * heading)
+            if score >= settings.PREFETCH_MIN_SCORE:
+                scored.append((score, idx))
+        scored.sort(reverse=True)
+        return scored
+
+    def update(self, star_system, ship):
+        if star_system.seed != self.system_seed:
+            self.reset()
+            self.system_seed = star_system.seed
+        self._collect()
+
+        wanted = [(star_system.seed, idx) for _, idx in self.score(star_system, ship)[:self.candidates]]
+        for key in list(self._jobs):
+            if key not in wanted: # The ship turned away
+                planet_textures.cancel(*key)
+                del self._jobs[key]
+                self.wasted += 1
+
+        for key in wanted:
+            if key in self._jobs:
+                continue
+            if planet_textures.cached(*key, planet_textures.OVERHEAD_LEVEL) or planet_textures.is_pending(*key):
+                continue # Built already, or being built for the star system view
+            if len(self._jobs) >= self.max_in_flight:
+                break
+            planet_data = star_system.planets[key[1]]
+            estimate = self._estimate_bytes(planet_data)
+            if self._bytes_committed() + estimate > self.budget_bytes:
+                break
+            planet_textures.request(*key, planet_data, planet_textures.OVERHEAD_LEVEL)
+            self._jobs[key] = (planet_data, estimate)
+            self.submitted += 1
+
+    def _collect(self):
+        # Nothing else polls a build for a planet off screen: request() moves a finished chain into the cache
+        for key, (planet_data, _) in list(self._jobs.items()):
+            if planet_textures.is_pending(*key):
+                planet_textures.request(*key, planet_data, planet_textures.OVERHEAD_LEVEL)
+            if not planet_textures.is_pending(*key):
+                del self._jobs[key]
+
+    def claim(self, system_seed, planet_idx):
+        """Counts PlanetView's entry to a planet as a hit, late or miss. Returns the cached overhead texture, or None."""
+        key = (system_seed, planet_idx)
+        self._jobs.pop(key, None) # The view polls the build from here on
+        texture = planet_textures.cached(*key, planet_textures.OVERHEAD_LEVEL)
+        if texture is not None:
+            self.hits += 1
+        elif planet_textures.is_pending(*key):
+            self.late += 1
+        else:
+            self.misses += 1
+        return texture
+
+    def reset(self):
+        for key in self._jobs:
+            planet_textures.cancel(*key)
+        self.wasted += len(self._jobs)
+        self._jobs.clear()
+
+    def stats(self):
+        claims = self.hits + self.late + self.misses
+        return {
+            'hits': self.hits,
+            'late': self.late,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / claims, 3) if claims else None,
+            'submitted': self.submitted,
+            'wasted': self.wasted,
+            'in_flight_bytes': self._bytes_committed(),
+        }
+
+    def report(self):
+        s = self.stats()
+        rate = "n/a" if s['hit_rate'] is None else f"{s['hit_rate'] * 100:.0f}%"
+        return (f"Planet texture prefetch: {rate} hit rate ({s['hits']} hits, {s['late']} late, {s['misses']} misses), "
+                f"{s['submitted']} builds, {s['wasted']} wasted")
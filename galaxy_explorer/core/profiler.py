@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+import pygame
+import csv
+import json
+import traceback
+from array import array
+from .. import settings
+from . import assets
+
+PHASES = ('events', 'update', 'render')
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = int(round(pct / 100.0 * (len(sorted_values) - 1)))
+    return sorted_values[max(0, min(len(sorted_values) - 1, rank))]
+
+class FrameProfiler:
+    """Per-phase frame timings (ms) kept in a fixed-size ring buffer, labelled by view class.
+
+    Each frame also records the view's draw commands (what render() queued) and
+    draw calls (the pygame calls its RenderQueue flush made for them).
+    """
+
+    def __init__(self, capacity=None, enabled=None):
+        self.capacity = capacity or settings.FRAME_PROFILER_CAPACITY
+        self.enabled = settings.FRAME_PROFILER_ENABLED if enabled is None else enabled
+        self.show_overlay = self.enabled
+        self._samples = {phase: array('d', bytes(8 * self.capacity)) for phase in PHASES}
+        self._frames = array('l', bytes(array('l').itemsize * self.capacity))
+        self._draw_commands = array('l', bytes(array('l').itemsize * self.capacity))
+        self._draw_calls = array('l', bytes(array('l').itemsize * self.capacity))
+        self._views = [None] * self.capacity
+        self._index = 0 # Next slot to write
+        self._count = 0 # Number of valid slots
+        self._overlay_stats = None
+        self._overlay_draws = None
+        self._overlay_stats_age = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.show_overlay = self.enabled
+        print(f"Frame profiler {'enabled' if self.enabled else 'disabled'}.")
+
+    def record(self, frame, view_name, events_ms, update_ms, render_ms, draw_commands=0, draw_calls=0):
+        i = self._index
+        self._samples['events'][i] = events_ms
+        self._samples['update'][i] = update_ms
+        self._samples['render'][i] = render_ms
+        self._frames[i] = frame
+        self._draw_commands[i] = draw_commands
+        self._draw_calls[i] = draw_calls
+        self._views[i] = view_name
+        self._index = (i + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def _ordered_slots(self, window=None):
+        """Ring slot indices from oldest to newest, limited to the last `window` frames."""
+        count = self._count if window is None else min(window, self._count)
+        start = (self._index - count) % self.capacity
+        return [(start + k) % self.capacity for k in range(count)]
+
+    def frame_totals(self, window=None):
+        s = self._samples
+        return [s['events'][i] + s['update'][i] + s['render'][i] for i in self._ordered_slots(window)]
+
+    def stats(self, window=None, view_name=None):
+        """Returns {phase: (p50, p95, p99)} including a 'total' entry."""
+        slots = self._ordered_slots(window)
+        if view_name is not None:
+            slots = [i for i in slots if self._views[i] == view_name]
+        result = {}
+        for phase in PHASES:
+            values = sorted(self._samples[phase][i] for i in slots)
+            result[phase] = tuple(percentile(values, p) for p in (50, 95, 99))
+        totals = sorted(self._samples['events'][i] + self._samples['update'][i] + self._samples['render'][i]
+                        for i in slots)
+        result['total'] = tuple(percentile(totals, p) for p in (50, 95, 99))
+        return result
+
+    def draw_stats(self, window=None, view_name=None):
+        """Mean draw commands and draw calls per frame."""
+        slots = self._ordered_slots(window)
+        if view_name is not None:
+            slots = [i for i in slots if self._views[i] == view_name]
+        if not slots:
+            return {'commands': 0.0, 'calls': 0.0}
+        return {'commands': sum(self._draw_commands[i] for i in slots) / len(slots),
+                'calls': sum(self._draw_calls[i] for i in slots) / len(slots)}
+
+    def rows(self):
+        for i in self._ordered_slots():
+            yield (self._frames[i], self._views[i],
+                   self._samples['events'][i], self._samples['update'][i], self._samples['render'][i])
+
+    # --- Overlay ---
+    def draw_overlay(self, surface):
+        """Draws rolling percentiles and a frame-time graph. Returns the rect it covered."""
+        font = assets.get_small_font()
+        if not font or self._count == 0:
+            return None
+
+        window = settings.FRAME_PROFILER_OVERLAY_WINDOW
+        # Percentiles are recomputed a few times per second, not every frame
+        if self._overlay_stats is None or self._overlay_stats_age >= 10:
+            self._overlay_stats = self.stats(window)
+            self._overlay_draws = self.draw_stats(window)
+            self._overlay_stats_age = 0
+        self._overlay_stats_age += 1
+
+        graph_w, graph_h = window, 60
+        panel = pygame.Rect(surface.get_width() - graph_w - 20, 10, graph_w + 10, 18 * 6 + graph_h + 10)
+        pygame.draw.rect(surface, (0, 0, 0), panel)
+        pygame.draw.rect(surface, settings.GRAY, panel, 1)
+
+        y = panel.top + 4
+        latest_view = self._views[(self._index - 1) % self.capacity]
+        surface.blit(font.render(f"{latest_view}  p50/p95/p99 ms", True, settings.WHITE), (panel.left + 5, y))
+        for phase in PHASES + ('total',):
+            y += 18
+            p50, p95, p99 = self._overlay_stats[phase]
+            line = f"{phase:<7}{p50:6.2f}{p95:7.2f}{p99:7.2f}"
+            surface.blit(font.render(line, True, settings.LIGHT_BLUE), (panel.left + 5, y))
+        y += 18
+        draws = self._overlay_draws
+        line = f"draws  {draws['commands']:5.0f} cmds {draws['calls']:4.0f} calls"
+        surface.blit(font.render(line, True, settings.LIGHT_BLUE), (panel.left + 5, y))
+
+        graph = pygame.Rect(panel.left + 5, y + 22, graph_w, graph_h)
+        budget_ms = 1000.0 / settings.FPS
+        scale = graph_h / (budget_ms * 2) # Graph spans two frame budgets
+        for x, total in enumerate(self.frame_totals(window)):
+            bar_h = min(graph_h, int(total * scale))
+            color = settings.GREEN if total <= budget_ms else settings.RED
+            pygame.draw.line(surface, color, (graph.left + x, graph.bottom), (graph.left + x, graph.bottom - bar_h))
+        budget_y = graph.bottom - int(budget_ms * scale)
+        pygame.draw.line(surface, settings.YELLOW, (graph.left, budget_y), (graph.right, budget_y))
+        return panel
+
+    # --- Export ---
+    def dump(self, path):
+        """Writes all buffered frames to `path` as CSV or JSON (chosen by extension)."""
+        if self._count == 0:
+            return False
+        try:
+            if path.lower().endswith('.json'):
+                view_names = sorted({v for v in self._views if v is not None})
+                data = {
+                    'frames': [dict(zip(('frame', 'view') + PHASES, row)) for row in self.rows()],
+                    'summary': {name: self.stats(view_name=name) for name in view_names},
+                    'draws': {name: self.draw_stats(view_name=name) for name in view_names},
+                }
+                with open(path, 'w') as f:
+                    json.dump(data, f, indent=1)
+            else:
+                with open(path, 'w', newline='') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(('frame', 'view') + tuple(f"{p}_ms" for p in PHASES))
+                    for frame, view, *phase_ms in self.rows():
+                        writer.writerow([frame, view] + [f"{ms:.4f}" for ms in phase_ms])
+            print(f"Frame profile written to {path} ({self._count} frames).")
+            return True
+        except Exception as e:
+            print(f"Failed to write frame profile to {path}: {e}")
+            traceback.print_exc()
+            return False
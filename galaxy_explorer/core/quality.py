@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from .. import settings
+
+# Current quality level (index into settings.QUALITY_LEVELS)
+_LEVEL = settings.QUALITY_START_LEVEL
+
+def get(param):
+    """Detail parameter for the current quality level."""
+    return settings.QUALITY_LEVELS[_LEVEL][param]
+
+def get_level():
+    return _LEVEL
+
+def set_level(level):
+    global _LEVEL
+    _LEVEL = max(0, min(len(settings.QUALITY_LEVELS) - 1, int(level)))
+
+def level_name(level=None):
+    return settings.QUALITY_LEVELS[_LEVEL if level is None else level]['name']
+
+class QualityController:
+    """Steps the global quality level to hold the FPS target.
+
+    Frame work time (excluding the FPS cap sleep) is collected in windows of
+    QUALITY_WINDOW_FRAMES. A window whose p90 exceeds QUALITY_DOWN_THRESHOLD of
+    the frame budget drops one level immediately; rising a level needs
+    QUALITY_UP_WINDOWS consecutive windows under QUALITY_UP_THRESHOLD.
+    """
+
+    def __init__(self, adaptive=None):
+        self.adaptive = settings.ADAPTIVE_QUALITY if adaptive is None else adaptive
+        self._window = []
+        self._good_windows = 0
+
+    def record_frame(self, frame_ms):
+        if not self.adaptive:
+            return
+        self._window.append(frame_ms)
+        if len(self._window) >= settings.QUALITY_WINDOW_FRAMES:
+            self._evaluate()
+            self._window = []
+
+    def _evaluate(self):
+        budget_ms = 1000.0 / settings.FPS
+        ordered = sorted(self._window)
+        p90 = ordered[int(len(ordered) * 0.9) - 1]
+        level = get_level()
+
+        if p90 > budget_ms * settings.QUALITY_DOWN_THRESHOLD:
+            self._good_windows = 0
+            if level > 0:
+                self._change_level(level - 1, p90)
+        elif p90 < budget_ms * settings.QUALITY_UP_THRESHOLD:
+            self._good_windows += 1
+            if self._good_windows >= settings.QUALITY_UP_WINDOWS and level < len(settings.QUALITY_LEVELS) - 1:
+                self._good_windows = 0
+                self._change_level(level + 1, p90)
+        else:
+            self._good_windows = 0
+
+    def _change_level(self, new_level, p90):
+        old_name = level_name()
+        set_level(new_level)
+        print(f"Quality: {old_name} -> {level_name()} (p90 frame work {p90:.1f} ms)")
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+from operator import itemgetter
+import pygame
+from . import assets, utils
+
+# Draw order, back to front. Commands on the same layer keep their submission order.
+LAYER_BACKGROUND = 0
+LAYER_STARS = 10
+LAYER_WORLD = 20
+LAYER_PARTICLES = 30
+LAYER_SHIPS = 40
+LAYER_OVERLAY = 50
+LAYER_HUD = 60
+
+# pygame-ce's fblits skips building the list of rects blits() would return
+HAS_FBLITS = hasattr(pygame.Surface, 'fblits')
+
+_BLITS = 0
+_PLAIN_BLITS = 1 # (surface, dest) only: eligible for fblits
+_DRAW = 2
+_SCALED_BLITS = 3 # Plain, and already at the canvas's render scale
+_layer_of = itemgetter(0)
+
+# Dot sprites are tiny and looked up per dot, so they live in a plain dict rather than the
+# locked LRU in assets; colorkeyed (not per-pixel alpha) because that blits about twice as fast
+_DOT_SPRITES = {}
+_DOT_SPRITES_MAX = 4096
+
+def get_dot_sprite(radius, color):
+    """Cached sprite of a filled circle, what pygame.draw.circle(surface, color, center, radius) would draw."""
+    key = (radius, color)
+    sprite = _DOT_SPRITES.get(key)
+    if sprite is None:
+        if len(_DOT_SPRITES) >= _DOT_SPRITES_MAX:
+            _DOT_SPRITES.clear()
+        colorkey = (0, 0, 0) if tuple(color[:3]) != (0, 0, 0) else (255, 0, 255)
+        sprite = pygame.Surface((radius * 2 + 1, radius * 2 + 1))
+        sprite.fill(colorkey)
+        pygame.draw.circle(sprite, color, (radius, radius), radius)
+        sprite.set_colorkey(colorkey)
+        sprite = _DOT_SPRITES[key] = assets.to_display_format(sprite, alpha=False)
+    return sprite
+
+def dot_blits(dots, offset=(0, 0), canvas=None):
+    """[(sprite, dest)] for (center, radius, color) dots, centers moved by offset.
+    With a scaled canvas they are already at its render scale: queue them with blits(..., scaled=True)."""
+    get = _DOT_SPRITES.get
+    ox, oy = offset
+    items = []
+    if canvas is None or not canvas.scaled:
+        for (x, y), radius, color in dots:
+            sprite = get((radius, color)) or get_dot_sprite(radius, color)
+            items.append((sprite, (int(x + ox) - radius, int(y + oy) - radius)))
+        return items
+    s = canvas.scale
+    scaled = {} # (radius, color) -> (render-scale sprite, its half size)
+    for (x, y), radius, color in dots:
+        key = (radius, color)
+        entry = scaled.get(key)
+        if entry is None:
+            sprite = canvas.sprite(get(key) or get_dot_sprite(radius, color))
+            entry = scaled[key] = (sprite, sprite.get_width() // 2)
+        items.append((entry[0], (int((x + ox) * s) - entry[1], int((y + oy) * s) - entry[1])))
+    return items
+
+class RenderQueue:
+    """Draw commands collected during a view's render(), issued in layer order by flush().
+
+    blit() and blits() queue sprites; draw() queues anything else (a callable
+    taking the target canvas) for primitives and text that don't batch.
+    flush() sorts by layer and turns each run of consecutive sprites into one
+    Surface.fblits() call where pygame has it (and no sprite needs an area or
+    blend flags), otherwise one Surface.blits() call. It draws on a
+    core.canvas.Canvas, so positions are logical whatever the render scale.
+
+    commands counts what was queued and calls the pygame calls flush() made,
+    both for the last flushed frame.
+    """
+
+    def __init__(self):
+        self._commands = [] # (layer, kind, payload)
+        self._pending = 0
+        self.commands = 0
+        self.calls = 0
+
+    def blit(self, surface, dest, layer=LAYER_WORLD, area=None, special_flags=0):
+        if area is None and not special_flags:
+            self._commands.append((layer, _PLAIN_BLITS, ((surface, dest),)))
+        else:
+            self._commands.append((layer, _BLITS, ((surface, dest, area, special_flags),)))
+        self._pending += 1
+
+    def blits(self, items, layer=LAYER_WORLD, scaled=False):
+        """Queues a sequence of (surface, dest) pairs. scaled: they are already at the render scale
+        of the canvas this queue is flushed to (e.g. from dot_blits with that canvas)."""
+        items = tuple(items)
+        if items:
+            self._commands.append((layer, _SCALED_BLITS if scaled else _PLAIN_BLITS, items))
+            self._pending += len(items)
+
+    def blit_rotated(self, surface, angle, center, layer=LAYER_WORLD):
+        """Queues surface rotated by angle degrees, centred on center (see Canvas.blit_rotated)."""
+        self.draw(lambda canvas: canvas.blit_rotated(surface, angle, center), layer)
+
+    def draw(self, fn, layer=LAYER_WORLD):
+        """Queues fn(canvas), e.g. lambda c: c.draw_circle(color, center, radius)."""
+        self._commands.append((layer, _DRAW, fn))
+        self._pending += 1
+
+    def text(self, text, font_type, color, pos, layer=LAYER_HUD):
+        """Queues cached text (see utils.render_text) with its top-left at pos."""
+        surface = utils.render_text(text, font_type, color)
+        if surface:
+            self.blit(surface, pos, layer)
+
+    def clear(self):
+        self._commands = []
+        self._pending = 0
+
+    def flush(self, canvas):
+        commands = self._commands
+        commands.sort(key=_layer_of) # Stable: same-layer commands stay in submission order
+        self.commands = self._pending
+        self.calls = 0
+        map_blits = canvas.map_blits if canvas.scaled else None
+        run = []
+        plain = True
+        for _, kind, payload in commands:
+            if kind == _DRAW:
+                self._issue(canvas, run, plain)
+                run = []
+                plain = True
+                payload(canvas)
+                self.calls += 1
+            else:
+                if map_blits and kind != _SCALED_BLITS:
+                    payload = map_blits(payload, kind == _PLAIN_BLITS)
+                run.extend(payload)
+                plain = plain and kind != _BLITS
+        self._issue(canvas, run, plain)
+        self.clear()
+
+    def _issue(self, canvas, run, plain):
+        if not run:
+            return
+        surface = canvas.surface
+        if plain and HAS_FBLITS:
+            surface.fblits(run)
+        else:
+            surface.blits(run, False)
+        self.calls += 1
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+import pygame
+import gzip
+import struct
+from .. import settings
+from .input_state import KeyState
+
+# File layout (gzip-compressed):
+#   header  : magic, format version, RNG seed, FPS, screen width, screen height
+#   frames  : dt_ms, mouse x, mouse y, pressed-key bitmask, event count, state checksum
+#             followed by `event count` event records (kind, key/button, x, y)
+REPLAY_MAGIC = b'GXRP'
+REPLAY_VERSION = 1
+_HEADER = struct.Struct('<4sHQHHH')
+_FRAME = struct.Struct('<HhhHBI')
+_EVENT = struct.Struct('<BIhh')
+
+# Keys the game polls through key.get_pressed(); bit i of the mask is TRACKED_KEYS[i]
+TRACKED_KEYS = (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d, pygame.K_e,
+                pygame.K_SPACE, pygame.K_LSHIFT, pygame.K_RSHIFT)
+
+# Event kinds that can affect game state; everything else is dropped while recording
+_EVENT_KINDS = (pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+
+def _clamp16(v):
+    return max(-32768, min(32767, int(v)))
+
+def keys_to_mask(keys_pressed):
+    mask = 0
+    for bit, key in enumerate(TRACKED_KEYS):
+        if keys_pressed[key]:
+            mask |= 1 << bit
+    return mask
+
+def mask_to_keys(mask):
+    return KeyState(key for bit, key in enumerate(TRACKED_KEYS) if mask & (1 << bit))
+
+def _encode_event(event):
+    kind = _EVENT_KINDS.index(event.type)
+    code = getattr(event, 'key', None)
+    if code is None:
+        code = getattr(event, 'button', 0)
+    x, y = getattr(event, 'pos', (0, 0))
+    return _EVENT.pack(kind, code, _clamp16(x), _clamp16(y))
+
+def _decode_event(kind, code, x, y):
+    event_type = _EVENT_KINDS[kind]
+    if event_type in (pygame.KEYDOWN, pygame.KEYUP):
+        return pygame.event.Event(event_type, key=code, mod=0, unicode='', scancode=0)
+    if event_type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        return pygame.event.Event(event_type, button=code, pos=(x, y))
+    return pygame.event.Event(event_type)
+
+class InputRecorder:
+    """Writes the per-frame input stream (plus RNG seed) of a live session."""
+
+    def __init__(self, path, seed):
+        self.path = path
+        self.frames = 0
+        self._file = gzip.open(path, 'wb')
+        self._file.write(_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, seed, settings.FPS,
+                                      settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
+
+    def capture(self, events, mouse_pos, keys_pressed):
+        """Normalizes live input to exactly what a replay can reproduce."""
+        events = [e for e in events if e.type in _EVENT_KINDS]
+        mouse_pos = (_clamp16(mouse_pos[0]), _clamp16(mouse_pos[1]))
+        return events, mouse_pos, mask_to_keys(keys_to_mask(keys_pressed))
+
+    def write_frame(self, dt_ms, events, mouse_pos, keys_pressed, checksum):
+        events = events[:255]
+        self._file.write(_FRAME.pack(max(0, min(65535, int(dt_ms))), mouse_pos[0], mouse_pos[1],
+                                     keys_to_mask(keys_pressed), len(events), checksum & 0xFFFFFFFF))
+        for event in events:
+            self._file.write(_encode_event(event))
+        self.frames += 1
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+            print(f"Recorded {self.frames} frames to {self.path}.")
+
+class ReplayFrame:
+    __slots__ = ('dt_ms', 'events', 'mouse_pos', 'keys', 'checksum')
+
+    def __init__(self, dt_ms, events, mouse_pos, keys, checksum):
+        self.dt_ms = dt_ms
+        self.events = events
+        self.mouse_pos = mouse_pos
+        self.keys = keys
+        self.checksum = checksum
+
+class InputReplay:
+    """Reads a recording made by InputRecorder. Iterating yields ReplayFrame objects."""
+
+    def __init__(self, path):
+        self.path = path
+        with gzip.open(path, 'rb') as f:
+            self._data = f.read()
+        magic, version, self.seed, self.fps, width, height = _HEADER.unpack_from(self._data, 0)
+        self.screen_size = (width, height)
+        if magic != REPLAY_MAGIC:
+            raise ValueError(f"{path} is not a replay file")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"Unsupported replay version {version} in {path}")
+
+    def __iter__(self):
+        data = self._data
+        offset = _HEADER.size
+        while offset + _FRAME.size <= len(data):
+            dt_ms, mx, my, mask, n_events, checksum = _FRAME.unpack_from(data, offset)
+            offset += _FRAME.size
+            events = []
+            for _ in range(n_events):
+                events.append(_decode_event(*_EVENT.unpack_from(data, offset)))
+                offset += _EVENT.size
+            yield ReplayFrame(dt_ms, events, (mx, my), mask_to_keys(mask), checksum)
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+import os
+import struct
+import threading
+import time
+import traceback
+from array import array
+from collections import namedtuple
+import pygame
+from .. import settings
+from ..views import registry
+
+# Layout (little-endian). The world itself is not stored: systems regenerate from the
+# game seed, so a save only records the seed plus what has changed since generation.
+#   header   magic, version, game seed, world identity (0 = built-in galaxy, else the
+#            world file's WorldFile.identity), frame count, view state
+#   view     system, planet, region index (-1 = none)
+#   ship     pos x/y, angle, velocity x/y
+#   char     pos x/y, world scroll
+#   systems  count, then per generated system: index, planet count, and an
+#            array('f') of (orbit angle, rotation angle) per planet
+MAGIC = b'GXSV'
+# 2: 32-bit system indices and count, for world files with more than 32767 systems
+# 3: world identity, so a save is never applied to a different galaxy
+VERSION = 3
+_HEADER = struct.Struct('<4sHQIIB')
+_VIEW = struct.Struct('<ihh')
+_SHIP = struct.Struct('<5f')
+_CHAR = struct.Struct('<3f')
+_COUNT = struct.Struct('<I')
+_SYSTEM = struct.Struct('<IB')
+
+# View states a save can resume into, by code
+_STATES = (settings.GALAXY_VIEW, settings.STAR_SYSTEM_VIEW, settings.PLANET_OVERHEAD_VIEW,
+           settings.GROUND_VIEW, settings.HYPERSPACE_TRANSITION)
+
+SaveGame = namedtuple('SaveGame', ['seed', 'world', 'frame_count', 'state', 'system_idx', 'planet_idx', 'region_idx',
+                                   'ship', 'char', 'systems'])
+
+class SaveError(Exception):
+    pass
+
+def _index(value):
+    return -1 if value is None else value
+
+def world_identity(systems):
+    """The identity a save records for the game's star_systems (see the layout above)."""
+    world = getattr(systems, 'world', None) # World file galaxy (MappedGalaxy)
+    return 0 if world is None else world.identity
+
+def _generated_systems(systems):
+    if hasattr(systems, 'generated_items'): # World file galaxy: don't decode every record to find them
+        return systems.generated_items()
+    return [(i, system) for i, system in enumerate(systems) if system.is_generated]
+
+def capture(game):
+    """Packs the game's state into bytes. Cheap enough to run between frames."""
+    ctx = game.game_context
+    view_name = registry.get_state_name(game.current_view)
+    if view_name not in _STATES:
+        view_name = settings.GALAXY_VIEW
+    system_idx = ctx['current_star_system_idx']
+    if view_name == settings.HYPERSPACE_TRANSITION:
+        system_idx = game.current_view.target_system_idx # Resume at the destination
+
+    ship = ctx['player_ship']
+    char = ctx['player_char']
+    parts = [
+        _HEADER.pack(MAGIC, VERSION, game.seed, world_identity(ctx['star_systems']), game.frame_count,
+                     _STATES.index(view_name)),
+        _VIEW.pack(system_idx, _index(ctx['current_planet_idx']), _index(ctx['current_region_idx'])),
+        _SHIP.pack(ship.pos.x, ship.pos.y, ship.angle, ship.velocity.x, ship.velocity.y),
+        _CHAR.pack(char.pos.x, char.pos.y, char.world_scroll),
+    ]
+
+    # Systems never visited are still exactly as generated; they need no entry
+    generated = _generated_systems(ctx['star_systems'])
+    parts.append(_COUNT.pack(len(generated)))
+    for i, system in generated:
+        angles = array('f')
+        for planet in system.planets:
+            angles.append(planet['angle'])
+            angles.append(planet['rotation_angle'])
+        parts.append(_SYSTEM.pack(i, len(system.planets)))
+        parts.append(angles.tobytes())
+    return b''.join(parts)
+
+def parse(data):
+    try:
+        magic, version, seed, world, frame_count, state_code = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise SaveError("not a Galaxy Explorer save")
+        if version != VERSION:
+            raise SaveError(f"unsupported save version {version}")
+        offset = _HEADER.size
+        system_idx, planet_idx, region_idx = _VIEW.unpack_from(data, offset); offset += _VIEW.size
+        ship = _SHIP.unpack_from(data, offset); offset += _SHIP.size
+        char = _CHAR.unpack_from(data, offset); offset += _CHAR.size
+        (count,) = _COUNT.unpack_from(data, offset); offset += _COUNT.size
+        systems = {}
+        for _ in range(count):
+            idx, n_planets = _SYSTEM.unpack_from(data, offset); offset += _SYSTEM.size
+            angles = array('f')
+            angles.frombytes(data[offset:offset + n_planets * 2 * angles.itemsize])
+            if len(angles) != n_planets * 2:
+                raise SaveError("truncated planet data")
+            offset += n_planets * 2 * angles.itemsize
+            systems[idx] = angles
+    except struct.error as e:
+        raise SaveError(f"truncated save: {e}")
+    if state_code >= len(_STATES):
+        raise SaveError(f"unknown view state {state_code}")
+    return SaveGame(seed, world, frame_count, _STATES[state_code], system_idx,
+                    None if planet_idx < 0 else planet_idx, None if region_idx < 0 else region_idx,
+                    ship, char, systems)
+
+def read(path, world=None):
+    """Parses the save at path; with world (a world identity), rejects a save made in another galaxy."""
+    with open(path, 'rb') as f:
+        save = parse(f.read())
+    if world is not None and save.world != world:
+        raise SaveError("the save belongs to a different galaxy")
+    return save
+
+def write(path, data):
+    """Writes atomically, so a crash mid-write never leaves a half-written save."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def restore(game, save):
+    """Applies a save to a Game constructed with save.seed. Only systems with saved deltas are generated.
+    Everything is checked before anything changes, so on SaveError the game is left as it was."""
+    ctx = game.game_context
+    systems = ctx['star_systems']
+    if save.world != world_identity(systems):
+        raise SaveError("the save belongs to a different galaxy")
+    for idx, angles in save.systems.items():
+        if not (0 <= idx < len(systems)):
+            raise SaveError(f"system index {idx} out of range")
+        if len(systems[idx].planets) * 2 != len(angles):
+            raise SaveError(f"planet count mismatch for {systems[idx].name}")
+    if not (0 <= save.system_idx < len(systems)):
+        raise SaveError(f"system index {save.system_idx} out of range")
+    planets = systems[save.system_idx].planets
+    if save.planet_idx is not None:
+        if save.planet_idx >= len(planets):
+            raise SaveError(f"planet index {save.planet_idx} out of range")
+        if save.region_idx is not None and save.region_idx >= len(planets[save.planet_idx]['regions']):
+            raise SaveError(f"region index {save.region_idx} out of range")
+
+    for idx, angles in save.systems.items():
+        for i, planet in enumerate(systems[idx].planets):
+            planet['angle'] = angles[2 * i]
+            planet['rotation_angle'] = angles[2 * i + 1]
+    game.frame_count = save.frame_count
+    ctx['current_planet_idx'] = save.planet_idx
+    ctx['current_region_idx'] = save.region_idx
+
+    if save.state == settings.HYPERSPACE_TRANSITION:
+        game.transition_to_state(settings.STAR_SYSTEM_VIEW, {'system_idx': save.system_idx, 'from_hyperspace': True})
+        return
+    ctx['current_star_system_idx'] = save.system_idx
+    ctx['current_star_system'] = systems[save.system_idx]
+    game.transition_to_state(save.state, {'system_idx': save.system_idx})
+
+    # Views place the player on entry; the saved pose wins
+    ship = ctx['player_ship']
+    ship.pos = pygame.Vector2(save.ship[0], save.ship[1])
+    ship.angle = save.ship[2]
+    ship.velocity = pygame.Vector2(save.ship[3], save.ship[4])
+    ship.update_rect()
+    if save.state == settings.GROUND_VIEW:
+        char = ctx['player_char']
+        char.pos = pygame.Vector2(save.char[0], save.char[1])
+        char.world_scroll = save.char[2]
+        char.rect.center = (int(char.pos.x + char.world_scroll), int(char.pos.y))
+
+class Autosaver:
+    """Saves every AUTOSAVE_INTERVAL_S without stalling a frame.
+
+    The state is packed on the main thread (well under a millisecond, and
+    consistent because nothing else runs); the file write happens on a
+    background thread. A save is skipped while the previous write is still
+    in flight.
+    """
+
+    def __init__(self, path, interval_s=None):
+        self.path = path
+        self.interval_s = settings.AUTOSAVE_INTERVAL_S if interval_s is None else interval_s
+        self._last_save = time.monotonic()
+        self._writer = None
+
+    def tick(self, game):
+        if time.monotonic() - self._last_save >= self.interval_s:
+            self.save(game)
+
+    def save(self, game, wait=False):
+        if self._writer is not None and self._writer.is_alive():
+            if not wait:
+                return
+            self._writer.join()
+        game.sync_simulation() # No threaded update may run while the state is read
+        t_start = time.perf_counter()
+        self._last_save = time.monotonic()
+        try:
+            data = capture(game)
+        except struct.error as e: # A value the format can't hold; losing one save beats crashing the game
+            print(f"Autosave skipped: state does not fit the save format ({e}).")
+            return
+        capture_ms = (time.perf_counter() - t_start) * 1000.0
+        self._writer = threading.Thread(target=self._write, args=(data, capture_ms), name="autosave", daemon=True)
+        self._writer.start()
+        if wait:
+            self._writer.join()
+
+    def _write(self, data, capture_ms):
+        try:
+            write(self.path, data)
+            print(f"Saved {len(data)} bytes to {self.path} (capture {capture_ms:.2f} ms).")
+        except Exception as e:
+            print(f"Failed to save to {self.path}: {e}")
+            traceback.print_exc()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import queue
+import threading
+import traceback
+
+class SnapshotBuffer:
+    """Double buffer of render snapshots.
+
+    The simulation thread publishes into the back slot and swaps; the main
+    thread only ever reads the front slot. Snapshots are immutable, so a
+    reader can keep using one after it has been swapped out.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._front = (None, None) # (owner view, snapshot)
+        self._back = (None, None)
+
+    def publish(self, owner, snapshot):
+        with self._lock:
+            self._back = (owner, snapshot)
+            self._front, self._back = self._back, self._front
+
+    def front(self, owner):
+        """Latest snapshot published by `owner`, or None."""
+        with self._lock:
+            front_owner, snapshot = self._front
+        return snapshot if front_owner is owner else None
+
+class SimulationThread:
+    """Runs view handle_event/update off the main thread, one frame at a time.
+
+    submit() hands over a frame's input and returns immediately; wait() blocks
+    until that frame's update has finished and re-raises any error from it.
+    Only one frame is ever in flight, so simulation runs at most one frame
+    ahead of rendering.
+    """
+
+    def __init__(self):
+        self.buffer = SnapshotBuffer()
+        self._work = queue.Queue(maxsize=1)
+        self._idle = threading.Event()
+        self._idle.set()
+        self._error = None
+        self._thread = threading.Thread(target=self._loop, name="simulation", daemon=True)
+        self._thread.start()
+
+    def submit(self, view, dt, events, mouse_pos, keys_pressed, frame_count):
+        self.wait()
+        if self.buffer.front(view) is None:
+            # First threaded frame for this view: publish from the main thread while nothing runs
+            self.buffer.publish(view, view.make_snapshot())
+        self._idle.clear()
+        self._work.put((view, dt, list(events), mouse_pos, keys_pressed, frame_count))
+
+    def wait(self):
+        self._idle.wait()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _loop(self):
+        while True:
+            item = self._work.get()
+            if item is None:
+                break
+            view, dt, events, mouse_pos, keys_pressed, frame_count = item
+            try:
+                for event in events:
+                    view.handle_event(event, mouse_pos, keys_pressed)
+                view.update(dt, mouse_pos, keys_pressed, frame_count)
+                self.buffer.publish(view, view.make_snapshot())
+            except Exception as e:
+                traceback.print_exc()
+                self._error = e
+            finally:
+                self._idle.set()
+
+    def stop(self):
+        self._idle.wait()
+        self._work.put(None)
+        self._thread.join(timeout=1.0)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import json
+import time
+import traceback
+
+class StartupTimeline:
+    """Wall-clock timeline of startup steps, measured from when this module was imported."""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.steps = [] # (name, start_ms, duration_ms)
+        self.finished = False
+
+    @contextlib.contextmanager
+    def step(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.steps.append((name, (start - self.t0) * 1000.0, (end - start) * 1000.0))
+
+    def mark(self, name):
+        """Records a zero-length milestone (e.g. first frame presented)."""
+        self.steps.append((name, (time.perf_counter() - self.t0) * 1000.0, 0.0))
+
+    def finish(self, name="first frame presented"):
+        if not self.finished:
+            self.mark(name)
+            self.finished = True
+
+    def total_ms(self):
+        return max((start + duration for _, start, duration in self.steps), default=0.0)
+
+    def report(self):
+        lines = ["Startup timeline (ms):"]
+        for name, start, duration in sorted(self.steps, key=lambda s: s[1]):
+            lines.append(f"  {start:9.1f} +{duration:8.1f}  {name}")
+        lines.append(f"  {self.total_ms():9.1f}            total")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        try:
+            with open(path, 'w') as f:
+                json.dump({
+                    'total_ms': round(self.total_ms(), 3),
+                    'steps': [{'name': name, 'start_ms': round(start, 3), 'duration_ms': round(duration, 3)}
+                              for name, start, duration in sorted(self.steps, key=lambda s: s[1])],
+                }, f, indent=1)
+            print(f"Startup timeline written to {path}.")
+        except Exception as e:
+            print(f"Failed to write startup timeline to {path}: {e}")
+            traceback.print_exc()
+
+# Shared by main.py (init steps) and the view registry (lazy view imports)
+TIMELINE = StartupTimeline()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import pygame
+import math
+import random
+import time
+from array import array
+from .. import settings
+
+STREAK_COLORS = (settings.WHITE, settings.LIGHT_BLUE, (200, 200, 255))
+
+class StreakField:
+    """Persistent hyperspace streaks stored as flat arrays (one slot per streak)."""
+
+    def __init__(self, count, center, max_radius, budget_ms=None, rng=None):
+        rng = rng or random
+        self.count = max(0, int(count))
+        self.center = (float(center[0]), float(center[1]))
+        self.max_radius = float(max_radius)
+        self.budget_ms = settings.HYPERSPACE_STREAK_BUDGET_MS if budget_ms is None else budget_ms
+
+        # Per-streak attributes; generated once, never reallocated
+        self.angle = array('f', (rng.uniform(0, math.tau) for _ in range(self.count)))
+        self.speed = array('f', (rng.uniform(0.5, 1.5) for _ in range(self.count)))
+        self.length = array('f', (rng.uniform(0.1, 1.0) for _ in range(self.count)))
+        self.color_idx = array('B', (rng.randrange(len(STREAK_COLORS)) for _ in range(self.count)))
+        self.dist = array('f', (rng.uniform(0, self.max_radius) for _ in range(self.count)))
+        # Unit direction cached from angle so drawing never calls cos/sin
+        self.dir_x = array('f', map(math.cos, self.angle))
+        self.dir_y = array('f', map(math.sin, self.angle))
+
+        # Number of streaks drawn per frame; shrinks/grows to stay inside budget_ms
+        self.active_count = self.count
+
+    def advance(self, anim_progress):
+        """Move every streak outward in one pass, wrapping at max_radius."""
+        step = self.max_radius * 0.02 * (0.25 + anim_progress)
+        limit = self.max_radius
+        moved = [d + s * step for d, s in zip(self.dist, self.speed)]
+        self.dist = array('f', [d - limit if d > limit else d for d in moved])
+
+    def draw(self, canvas, anim_progress, limit=None):
+        """Draws up to active_count (and at most limit) streaks on a Canvas. Returns the number actually drawn."""
+        length_scale = anim_progress * settings.SCREEN_WIDTH * 1.5
+        line_width = canvas.map_length(max(1, int(anim_progress * 3 + 1)))
+        if length_scale <= 2 or self.count == 0:
+            return 0
+
+        # Straight onto the render surface: a canvas call per line would cost more than the line
+        surface, s = canvas.surface, canvas.scale
+        cx, cy = self.center
+        cx, cy = cx * s, cy * s
+        dist, length = self.dist, self.length
+        dir_x, dir_y, color_idx = self.dir_x, self.dir_y, self.color_idx
+        draw_line = pygame.draw.line
+        perf_counter = time.perf_counter
+        deadline = perf_counter() + self.budget_ms / 1000.0
+
+        n = self.active_count if limit is None else min(self.active_count, limit)
+        drawn = n
+        for i in range(n):
+            ln = length[i] * length_scale
+            if ln > 2:
+                d = dist[i] * s
+                ln *= s
+                dx, dy = dir_x[i], dir_y[i]
+                draw_line(surface, STREAK_COLORS[color_idx[i]],
+                          (cx + dx * d, cy + dy * d),
+                          (cx + dx * (d + ln), cy + dy * (d + ln)), line_width)
+            if i & 63 == 63 and perf_counter() > deadline:
+                drawn = i + 1
+                break
+
+        # Adapt the streak count for the next frame
+        if drawn < n:
+            self.active_count = max(64, int(drawn * 0.9))
+        elif self.active_count < self.count:
+            self.active_count = min(self.count, int(self.active_count * 1.1) + 1)
+        return drawn
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import queue
+import threading
+import time
+import traceback
+import pygame
+from .. import settings
+from . import utils
+
+class TextureJob:
+    """Builds a series of increasingly detailed surfaces on the texture worker thread.
+
+    Each builder is called as builder(job) and returns a Surface, or None if it
+    noticed job.cancelled and gave up. The main thread poll()s for the newest
+    finished level; levels are never handed out twice or out of order.
+    Levels are numbered from first_level, so a job can resume a series another
+    job started.
+    """
+
+    def __init__(self, name, builders, first_level=0):
+        self.name = name
+        self.first_level = first_level
+        self.level_count = first_level + len(builders)
+        self.cancelled = False
+        self.done = False
+        self.build_ms = []
+        self._builders = builders
+        self._lock = threading.Lock()
+        self._latest = None # (level, surface)
+        self._taken_level = -1
+
+    def run(self):
+        try:
+            for level, build in enumerate(self._builders, self.first_level):
+                if self.cancelled:
+                    return
+                t_start = time.perf_counter()
+                surface = build(self)
+                if surface is None or self.cancelled:
+                    return
+                self.build_ms.append((time.perf_counter() - t_start) * 1000.0)
+                with self._lock:
+                    self._latest = (level, surface)
+            self.done = True
+        except Exception as e:
+            print(f"Error building texture {self.name}: {e}")
+            traceback.print_exc()
+            self.cancelled = True
+        finally:
+            self._builders = None # Drop references to game data
+
+    def poll(self):
+        """(level, surface) for the newest level not yet taken, or None."""
+        with self._lock:
+            latest = self._latest
+            if latest is None or latest[0] <= self._taken_level:
+                return None
+            self._taken_level = latest[0]
+            self._latest = None
+            return latest
+
+    def cancel(self):
+        self.cancelled = True
+
+class TextureWorker(threading.Thread):
+    """One daemon thread that runs TextureJobs in submission order. Cancelled jobs are skipped."""
+
+    def __init__(self):
+        super().__init__(name="texture-worker", daemon=True)
+        self._jobs = queue.Queue()
+
+    def submit(self, job):
+        self._jobs.put(job)
+        return job
+
+    def stop(self):
+        self._jobs.put(None)
+        self.join()
+
+    def run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            if not job.cancelled:
+                job.run()
+
+_worker = None
+
+def submit(job):
+    global _worker
+    if _worker is None:
+        _worker = TextureWorker()
+        _worker.start()
+    return _worker.submit(job)
+
+def shutdown():
+    global _worker
+    if _worker is not None:
+        _worker.stop()
+        _worker = None
+
+def planet_texture_job(planet_data, scale, first_level=0):
+    """Overhead texture for a planet at each PLANET_TEXTURE_LEVELS fraction of full resolution.
+
+    Reduced levels are scaled up to the full texture size, so callers can
+    swap levels without changing any geometry.
+    """
+    full_size = utils.planet_texture_size(planet_data, scale)
+
+    def builder(fraction):
+        def build(job):
+            texture = utils.create_planet_texture(planet_data, scale * fraction, cancelled=lambda: job.cancelled)
+            if texture is not None and texture.get_size() != full_size:
+                texture = pygame.transform.smoothscale(texture, full_size)
+            return texture
+        return build
+
+    return TextureJob(f"planet r{planet_data['radius']}",
+                      [builder(fraction) for fraction in settings.PLANET_TEXTURE_LEVELS[first_level:]], first_level)
@@ -4,6 +4,8 @@ import math
 import random
 from .. import settings # For colors, screen dimensions etc.
 from . import assets # For fonts
+from . import quality # Detail parameters for the current quality level
+from .canvas import Canvas # Logical-coordinate drawing for the baked backdrop
 
 # --- General Utilities ---
 def lerp(a, b, t):
@@ -21,6 +23,8 @@ def lerp_color(color1, color2, t):
     b = max(0, min(255, b))
     return (r, g, b)
 
+surface_bytes = assets.surface_bytes
+
 def get_rotated_point(center_x, center_y, angle_degrees, radius):
     """Calculate point on circle"""
     angle_radians = math.radians(angle_degrees)
@@ -28,22 +32,65 @@ def get_rotated_point(center_x, center_y, angle_degrees, radius):
     y = center_y + radius * math.sin(angle_radians)
     return int(x), int(y)
 
+# --- Dirty Rectangles ---
+def merge_dirty_rects(rects, bounds, full_redraw_ratio):
+    """Clips and merges overlapping rects where that adds no area. Returns None when a full redraw is cheaper."""
+    if rects is None:
+        return None
+
+    merged = []
+    # Elements marked this frame and last frame are often the same rect: merge each once
+    for rect in dict.fromkeys(tuple(r) for r in rects):
+        rect = bounds.clip(rect)
+        if rect.width <= 0 or rect.height <= 0:
+            continue
+        # Absorb an overlapping rect while the union covers no more than the two did apart, repeating
+        # until stable. Overlaps whose union would be mostly new area stay separate, so a ring of
+        # small rects never snowballs into its bounding box
+        absorbed = True
+        while absorbed:
+            absorbed = False
+            for i in rect.collidelistall(merged):
+                other = merged[i]
+                union = rect.union(other)
+                if union.width * union.height <= rect.width * rect.height + other.width * other.height:
+                    rect = union
+                    merged.pop(i)
+                    absorbed = True
+                    break
+        merged.append(rect)
+
+    dirty_area = sum(r.width * r.height for r in merged)
+    if dirty_area > bounds.width * bounds.height * full_redraw_ratio:
+        return None
+    return merged
+
 # --- Text Drawing ---
+def render_text(text, font_type, color):
+    """Returns a cached rendered text surface, or None if the font is unavailable."""
+    def _render():
+        font = None
+        if font_type == "main":
+            font = assets.get_main_font()
+        elif font_type == "small":
+            font = assets.get_small_font()
+        if not font:
+            return None
+        return font.render(text, True, color)
+
+    return assets.get_surface(('text', text, font_type, tuple(color)), _render)
+
 def draw_text(text, font_type, color, surface, x, y):
-    font = None
-    if font_type == "main":
-        font = assets.get_main_font()
-    elif font_type == "small":
-        font = assets.get_small_font()
-    
-    if font:
-        try:
-            textobj = font.render(text, True, color)
-            textrect = textobj.get_rect()
-            textrect.topleft = (x, y)
-            surface.blit(textobj, textrect)
-        except Exception as e:
-            print(f"Error rendering text '{text}': {e}")
+    try:
+        textobj = render_text(text, font_type, color)
+    except Exception as e:
+        print(f"Error rendering text '{text}': {e}")
+        return
+
+    if textobj:
+        textrect = textobj.get_rect()
+        textrect.topleft = (x, y)
+        surface.blit(textobj, textrect)
     else:
         print(f"Font '{font_type}' not available for text: {text}")
 
@@ -90,24 +137,34 @@ def init_twinkle_stars():
                 'hi'    : random.randint(170, 255)
             })
 
-def draw_twinkling_stars(surface, frame_count):
-    """Draw tiny stars whose brightness oscillates sinusoidally."""
+def get_twinkle_star_rects():
+    """Screen rects covered by the twinkling stars (for dirty-rect reporting)."""
     if not _TWINKLE_STARS_DATA:
         init_twinkle_stars()
-        
-    for s in _TWINKLE_STARS_DATA:
+    return [pygame.Rect(s['pos'][0] - s['size'] - 1, s['pos'][1] - s['size'] - 1,
+                        s['size'] * 2 + 2, s['size'] * 2 + 2) for s in _TWINKLE_STARS_DATA]
+
+def twinkling_star_dots(frame_count, hidden=None):
+    """(pos, size, color) of tiny stars whose brightness oscillates sinusoidally. Indices in `hidden` are skipped."""
+    if not _TWINKLE_STARS_DATA:
+        init_twinkle_stars()
+
+    dots = []
+    for i, s in enumerate(_TWINKLE_STARS_DATA[:quality.get('twinkle_stars')]):
+        if hidden and i in hidden:
+            continue
         t = (math.sin(frame_count * s['speed'] + s['phase']) + 1) * 0.5
         c = int(s['lo'] + (s['hi'] - s['lo']) * t)
-        pygame.draw.circle(surface, (c, c, c), s['pos'], s['size'])
+        dots.append((s['pos'], s['size'], (c, c, c)))
+    return dots
 
 # --- Planet Rendering Specifics ---
-def draw_shaded_planet_simple(surface, planet_data, planet_pos):
-    """ Draws a planet with simple overall radial gradient shading """
-    radius = planet_data['radius']
-    center_color = planet_data['color']
-
-    if radius < 1: return
+def get_shaded_planet_sprite(radius, center_color):
+    """ Returns a cached sprite of a planet/star with simple radial gradient shading """
+    return assets.get_surface(('shaded', radius, tuple(center_color)),
+                              lambda: _build_shaded_planet_sprite(radius, center_color))
 
+def _build_shaded_planet_sprite(radius, center_color):
     darkening_factor = 0.3
     edge_color = (
         max(0, min(255, int(center_color[0] * darkening_factor))),
@@ -115,32 +172,164 @@ def draw_shaded_planet_simple(surface, planet_data, planet_pos):
         max(0, min(255, int(center_color[2] * darkening_factor)))
     )
 
+    size = radius * 2 + 2
+    sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+    sprite_center = (radius + 1, radius + 1)
     for current_radius in range(radius, 0, -1):
-        if radius == 0: t = 0
-        else: t = current_radius / radius
+        t = current_radius / radius
         interpolated_color = lerp_color(center_color, edge_color, 1.0 - t) # Invert t for correct gradient
-        try:
-             if radius > 5:
-                 pygame.draw.circle(surface, interpolated_color, planet_pos, current_radius)
-             elif current_radius % 2 == 0: # Optimization for small planets
-                  pygame.draw.circle(surface, interpolated_color, planet_pos, current_radius)
-        except Exception: pass # Ignore minor drawing errors if any
+        if radius > 5 or current_radius % 2 == 0: # Optimization for small planets
+            pygame.draw.circle(sprite, interpolated_color, sprite_center, current_radius)
+    return sprite
+
+def shaded_planet_blit(planet_data, planet_pos):
+    """ (sprite, dest) for a planet with simple overall radial gradient shading, or None if it is too small """
+    radius = int(planet_data['radius'])
+    if radius < 1: return None
 
-def draw_planet_light_and_shadow(surface, center, planet_draw_radius, orbit_angle_deg):
+    sprite = get_shaded_planet_sprite(radius, planet_data['color'])
+    return sprite, (int(planet_pos[0]) - radius - 1, int(planet_pos[1]) - radius - 1)
+
+def draw_shaded_planet_simple(surface, planet_data, planet_pos):
+    """ Draws a planet with simple overall radial gradient shading """
+    item = shaded_planet_blit(planet_data, planet_pos)
+    if item:
+        surface.blit(*item)
+
+def get_star_glow_sprite(star_radius, star_color):
+    """ Returns a cached additive glow sprite for a star (blit with BLEND_RGBA_ADD) """
+    glow_radius = int(star_radius * 1.5)
+    if glow_radius <= 0: return None
+
+    glow_step = quality.get('star_glow_step')
+    return assets.get_surface(('glow', glow_radius, tuple(star_color), glow_step),
+                              lambda: _build_star_glow_sprite(glow_radius, star_color, glow_step))
+
+def _build_star_glow_sprite(glow_radius, star_color, glow_step):
+    glow_surf = pygame.Surface((glow_radius * 2, glow_radius * 2), pygame.SRCALPHA)
+    glow_edge_color = lerp_color(star_color, settings.WHITE, 0.3)
+    for i_glow in range(glow_radius, 0, -glow_step):
+        t = i_glow / glow_radius
+        alpha = max(0, min(255, int(120 * (1 - t**0.5))))
+        current_glow_color = lerp_color(star_color, glow_edge_color, 1 - t)
+        pygame.draw.circle(glow_surf, (*current_glow_color, alpha), (glow_radius, glow_radius), i_glow)
+    return glow_surf
+
+def draw_lock_cross(surface, pos, size=10, width=3):
+    """Red 'X' drawn over the cursor while the ship's orientation is locked."""
+    x, y = pos
+    surface.draw_line(settings.RED, (x - size, y - size), (x + size, y + size), width)
+    surface.draw_line(settings.RED, (x - size, y + size), (x + size, y - size), width)
+
+# --- Star System Backdrop ---
+def ring_visible(center, radius, rect):
+    """ True if a circle outline of the given radius around center passes through rect """
+    cx, cy = center
+    near_x = min(max(cx, rect.left), rect.right)
+    near_y = min(max(cy, rect.top), rect.bottom)
+    far_x = max(abs(cx - rect.left), abs(cx - rect.right))
+    far_y = max(abs(cy - rect.top), abs(cy - rect.bottom))
+    return (near_x - cx) ** 2 + (near_y - cy) ** 2 <= radius * radius <= far_x * far_x + far_y * far_y
+
+def draw_jump_gate(surface, gate_pos, hovered):
+    gate_render_rect = pygame.Rect(0,0,40,60)
+    gate_render_rect.center = gate_pos
+
+    gate_color = settings.PURPLE
+    outline_color = settings.WHITE
+    if hovered:
+        gate_color = settings.LIGHT_BLUE
+        outline_color = settings.YELLOW
+        surface.draw_rect(outline_color, gate_render_rect.inflate(6,6), 3)
+
+    surface.draw_rect(gate_color, gate_render_rect)
+    surface.draw_rect(outline_color, gate_render_rect, 2)
+    draw_text("EXIT", "small", settings.WHITE, surface,
+              gate_render_rect.centerx - 15, gate_render_rect.centery - 8)
+    return gate_render_rect
+
+def get_system_backdrop(star_system, size):
+    """ Returns the static layers of a star system (star, glow, orbit rings, gate, name) baked into one
+    display-format surface. Keyed by system and size, so a system change or resize gets a new one. """
+    key = ('backdrop', star_system.name, star_system.seed, tuple(size), quality.get('star_glow_step'))
+    return assets.get_surface(key, lambda: _build_system_backdrop(star_system, size), alpha=False)
+
+def get_system_backdrop_occluders(star_system, size, offset=(0, 0)):
+    """ Rects of the backdrop's opaque elements; twinkling stars under them are not drawn.
+    offset is the camera position for systems drawn with draw_system_layers instead of the backdrop. """
+    center = (size[0] // 2 - offset[0], size[1] // 2 - offset[1])
+    radius = star_system.star_radius
+    gate_rect = pygame.Rect(0, 0, 40, 60)
+    gate_rect.center = star_system.jump_gate_pos
+    gate_rect.move_ip(-offset[0], -offset[1])
+    name_surf = render_text(f"System: {star_system.name}", "main", settings.WHITE)
+    rects = [pygame.Rect(center[0] - radius, center[1] - radius, radius * 2, radius * 2), gate_rect.inflate(8, 8)]
+    if name_surf:
+        rects.append(name_surf.get_rect(topleft=(10, 10)))
+    return rects
+
+def _build_system_backdrop(star_system, size):
+    backdrop = pygame.Surface(size)
+    target = Canvas(backdrop)
+    draw_system_layers(target, star_system)
+    draw_text(f"System: {star_system.name}", "main", settings.WHITE, target, 10, 10)
+    return backdrop
+
+def draw_system_layers(surface, star_system, offset=(0, 0)):
+    """ Draws the static world layers of a star system (star, glow, orbit rings, idle gate) over black on a
+    Canvas, with the camera at offset. Orbit rings and the gate that miss the canvas are skipped, so in a
+    system many screens wide the cost follows what is on screen. """
+    size = surface.get_size()
+    view = surface.get_rect()
+    center = (size[0] // 2 - offset[0], size[1] // 2 - offset[1])
+    surface.fill(settings.BLACK)
+
+    draw_shaded_planet_simple(surface, {'radius': star_system.star_radius, 'color': star_system.star_color}, center)
+    star_glow_surf = get_star_glow_sprite(star_system.star_radius, star_system.star_color)
+    if star_glow_surf:
+        star_glow_radius = star_glow_surf.get_width() // 2
+        surface.blit(star_glow_surf, (center[0] - star_glow_radius, center[1] - star_glow_radius),
+                     special_flags=pygame.BLEND_RGBA_ADD)
+
+    for planet_data in star_system.planets:
+        if ring_visible(center, planet_data['orbit_radius'], view):
+            surface.draw_circle(settings.DARK_GRAY, center, planet_data['orbit_radius'], 1)
+
+    gate_pos = star_system.jump_gate_pos
+    gate_pos = (gate_pos[0] - offset[0], gate_pos[1] - offset[1])
+    if view.colliderect(pygame.Rect(gate_pos[0] - 25, gate_pos[1] - 35, 50, 70)):
+        draw_jump_gate(surface, gate_pos, hovered=False)
+
+def draw_planet_light_and_shadow(canvas, center, planet_draw_radius, orbit_angle_deg):
+    """ Lights the canvas around a planet, leaving its shadow wedge dark. Drawn at render resolution. """
     glow_color   = (255, 250, 230)
     peak_alpha   = 180
     falloff_pow  = 1.6
-    step         = 4
-
-    max_radius = int(math.hypot(settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
-    light_surface = pygame.Surface((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT), pygame.SRCALPHA)
-
-    for r in range(max_radius, 0, -step):
-        t = r / max_radius
-        alpha = int(peak_alpha * (t ** falloff_pow))
-        if alpha <= 0:
-            continue
-        pygame.draw.circle(light_surface, (*glow_color, alpha), center, r)
+    step         = canvas.map_length(quality.get('light_step'))
+
+    surface = canvas.surface
+    size = surface.get_size()
+    max_radius = int(math.hypot(*size))
+    if canvas.scaled:
+        center, planet_draw_radius = canvas.map_point(center), canvas.map_length(planet_draw_radius)
+
+    def _build_light_gradient():
+        gradient = pygame.Surface(size, pygame.SRCALPHA)
+        for r in range(max_radius, 0, -step):
+            t = r / max_radius
+            alpha = int(peak_alpha * (t ** falloff_pow))
+            if alpha <= 0:
+                continue
+            pygame.draw.circle(gradient, (*glow_color, alpha), center, r)
+        return gradient
+
+    # The radial falloff only depends on the centre; only the shadow wedge moves each frame. The wedge
+    # is cut into a scratch copy cached next to the gradient and restored from it first: its pixels are
+    # either the gradient's or cut to zero, so a per-channel max gives the gradient back
+    center = (int(center[0]), int(center[1]))
+    gradient = assets.get_surface(('light', center, step, size), _build_light_gradient)
+    light_surface = assets.get_surface(('light_scratch', center, step, size), gradient.copy)
+    light_surface.blit(gradient, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
 
     star_to_planet = pygame.Vector2(
         math.cos(math.radians(orbit_angle_deg)),
@@ -174,10 +363,15 @@ def draw_planet_light_and_shadow(surface, center, planet_draw_radius, orbit_angl
 
 
 # --- Planet Texture Generation Specifics ---
-def create_planet_texture(planet_data, scale):
-    radius = planet_data['radius'] * scale
-    diameter = int(radius * 2)
+def planet_texture_size(planet_data, scale):
+    diameter = int(planet_data['radius'] * scale * 2)
     tex_size = int(diameter * 1.1) if diameter > 0 else 10 # Ensure tex_size is reasonable
+    return (tex_size, tex_size)
+
+def create_planet_texture(planet_data, scale, cancelled=None):
+    """Region-colored planet disc. Returns None if cancelled() turns true part way (background builds)."""
+    radius = planet_data['radius'] * scale
+    tex_size = planet_texture_size(planet_data, scale)[0]
     planet_surf = pygame.Surface((tex_size, tex_size), pygame.SRCALPHA)
     surf_center_x = tex_size // 2
     surf_center_y = tex_size // 2
@@ -186,6 +380,8 @@ def create_planet_texture(planet_data, scale):
     if radius < 1: return planet_surf
 
     for region in planet_data['regions']:
+        if cancelled and cancelled():
+            return None
         center_color = region['color']
         darkening_factor = 0.25
         edge_color = (
@@ -205,7 +401,7 @@ def create_planet_texture(planet_data, scale):
         angle_range = (region['end_angle'] - region['start_angle'] + 360) % 360
         if angle_range == 0 and len(planet_data['regions']) == 1: angle_range = 360
         
-        steps = max(5, int(angle_range / 4)) # Ensure at least a few steps for small angles
+        steps = max(5, int(angle_range / quality.get('mask_step_deg'))) # Ensure at least a few steps for small angles
         if steps == 0 and angle_range > 0 : steps = 1 # if angle_range is very small e.g. 1 degree
 
         for step in range(steps + 1):
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import time
+from .. import settings
+from . import planet_textures, utils
+from ..models import asteroids
+
+class SystemWarmupJob:
+    """Incrementally pre-renders everything StarSystemView needs for one system.
+
+    The job is cooperative: run() does as many steps as fit in budget_ms and
+    returns, so it can be ticked from another view's update without a thread.
+    """
+
+    def __init__(self, game_context, system_idx, budget_ms=None):
+        self.game_context = game_context
+        self.system_idx = system_idx
+        self.budget_ms = settings.WARMUP_BUDGET_MS if budget_ms is None else budget_ms
+        self.done = False
+        self.cancelled = False
+        self.steps_done = 0
+        self.time_spent_ms = 0.0
+        self._steps = self._iter_steps()
+
+    def _iter_steps(self):
+        # Materialize the system itself first; later steps read from it
+        star_systems = self.game_context['star_systems']
+        if not (0 <= self.system_idx < len(star_systems)):
+            return
+        star_system = star_systems[self.system_idx]
+        yield
+
+        utils.get_shaded_planet_sprite(star_system.star_radius, star_system.star_color)
+        yield
+        utils.get_star_glow_sprite(star_system.star_radius, star_system.star_color)
+        yield
+        if star_system.fits_screen: # Systems that scroll are drawn without one
+            utils.get_system_backdrop(star_system, (settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
+            yield
+
+        for planet_idx, planet_data in enumerate(star_system.planets):
+            utils.get_shaded_planet_sprite(int(planet_data['radius']), planet_data['color']) # Shown until the mips land
+            planet_textures.request(star_system.seed, planet_idx, planet_data, planet_textures.SYSTEM_LEVEL)
+            yield
+        if star_system.belts:
+            for sprite_idx in range(asteroids.ROCK_SPRITE_COUNT):
+                asteroids.get_rock_sprite(sprite_idx)
+            yield
+
+        # HUD text drawn by StarSystemView
+        utils.render_text(f"System: {star_system.name}", "main", settings.WHITE)
+        yield
+        utils.render_text("EXIT", "small", settings.WHITE)
+        utils.render_text("Press [E] to interact", "small", settings.YELLOW)
+        yield
+
+    def run(self, budget_ms=None):
+        """Runs steps until the budget is spent. Returns True once the job is finished."""
+        if self.done or self.cancelled:
+            return self.done
+
+        budget_ms = self.budget_ms if budget_ms is None else budget_ms
+        start = time.perf_counter()
+        deadline = start + budget_ms / 1000.0
+        try:
+            while True:
+                next(self._steps)
+                self.steps_done += 1
+                if time.perf_counter() >= deadline:
+                    break
+        except StopIteration:
+            self.done = True
+        except Exception as e:
+            print(f"Error warming star system {self.system_idx}: {e}")
+            self.cancelled = True
+        self.time_spent_ms += (time.perf_counter() - start) * 1000.0
+        return self.done
+
+    def cancel(self):
+        if not self.done:
+            self.cancelled = True
+            self._steps.close()
+
+    def report(self):
+        return {
+            'system_idx': self.system_idx,
+            'finished': self.done,
+            'cancelled': self.cancelled,
+            'steps': self.steps_done,
+            'time_ms': round(self.time_spent_ms, 2),
+        }
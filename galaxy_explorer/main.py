@@ -1,25 +1,47 @@
 # -*- coding: utf-8 -*-
+from .core import startup # First, so the startup timeline covers module imports
 import pygame
+import argparse
+import os
+import random
 import sys
+import time
 import traceback
+import zlib
 
 from . import settings
 from .core import assets, utils
-from .models.world import StarSystem
+from .core.canvas import Canvas
+from .core.profiler import FrameProfiler
+from .core.quality import QualityController
+from .core.replay import InputRecorder, InputReplay
+from .core import netsync, savegame, texture_jobs
+from .core.input_state import KeyState
+from .core.memprofile import MemoryTracker
+from .core.prefetch import PlanetTexturePrefetcher
+from .core.sim_thread import SimulationThread
+from .models.world import DEFAULT_STAR_SYSTEMS, StarSystem
+from .models import world_file
+from .models.world_file import MappedGalaxy, WorldFile, WorldFileError
 from .models.ship import PlayerShip
 from .models.player_char import PlayerCharacter
-from .views.galaxy_view import GalaxyView
-from .views.star_system_view import StarSystemView
-from .views.planet_view import PlanetView
-from .views.ground_view import GroundView
-from .views.hyperspace_view import HyperspaceView
+from .views.registry import ViewRegistry
 
+startup.TIMELINE.mark("modules imported")
+
+NO_KEYS = KeyState()
 
 class Game:
-    def __init__(self):
+    def __init__(self, seed=None, recorder=None, startup_profile_path=None, threaded=None, render_scale=None,
+                 memory_report_path=None, world_path=None, window_size=None):
+        timeline = startup.TIMELINE
         print("Initializing Pygame...")
         try:
-            pygame.init()
+            # Only what the first frame needs; the mixer is brought up by play_intro
+            with timeline.step("pygame.display.init"):
+                pygame.display.init()
+            with timeline.step("pygame.font.init"):
+                pygame.font.init()
             print("Pygame Initialized.")
         except Exception as e:
             print(f"!!!!!!!!!!!!!!!!! Pygame Init Failed: {e} !!!!!!!!!!!!!!!!!")
@@ -27,14 +49,36 @@ class Game:
             sys.exit()
 
         print("Initializing Font Module via core.assets...")
-        if not assets.load_fonts():
-             pass
+        with timeline.step("load fonts"):
+            if not assets.load_fonts():
+                 pass
 
         print("Setting Display Mode...")
         try:
-            self.screen = pygame.display.set_mode((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
-            pygame.display.set_caption("Galaxy Explorer")
-            print("Display Mode Set.")
+            # Views draw in logical SCREEN_WIDTH x SCREEN_HEIGHT coordinates on self.canvas, which maps
+            # them onto self.screen: the window itself, or a surface of render_scale x the window's
+            # resolution that is scaled up on present. One scale for both axes keeps circles round;
+            # a window of another aspect ratio shows the frame in self.viewport, between black bars.
+            self.render_scale = max(0.25, min(1.0, settings.RENDER_SCALE if render_scale is None else render_scale))
+            logical_size = (settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT)
+            window_size = tuple(window_size or settings.WINDOW_SIZE or logical_size)
+            scale = self.render_scale * min(window_size[0] / logical_size[0], window_size[1] / logical_size[1])
+            render_size = (max(1, round(logical_size[0] * scale)), max(1, round(logical_size[1] * scale)))
+            fit = min(window_size[0] / render_size[0], window_size[1] / render_size[1])
+            self.viewport = pygame.Rect((0, 0), (round(render_size[0] * fit), round(render_size[1] * fit)))
+            self.viewport.center = (window_size[0] // 2, window_size[1] // 2)
+            with timeline.step("display set_mode"):
+                self.window = pygame.display.set_mode(window_size)
+                pygame.display.set_caption("Galaxy Explorer")
+                self.window.fill(settings.BLACK) # The bars; nothing draws there again
+                if self.viewport.size == render_size: # No scaling: draw straight into the window
+                    self.screen = self.window.subsurface(self.viewport) if self.viewport.size != window_size \
+                        else self.window
+                else:
+                    self.screen = pygame.Surface(render_size).convert()
+                self.canvas = Canvas(self.screen, logical_size)
+            print(f"Display Mode Set ({window_size[0]}x{window_size[1]}, "
+                  f"rendering at {render_size[0]}x{render_size[1]}).")
         except Exception as e:
             print(f"!!!!!!!!!!!!!!!!! Pygame Set Mode Failed: {e} !!!!!!!!!!!!!!!!!")
             traceback.print_exc()
@@ -47,36 +91,61 @@ class Game:
 
         self.running = True
         self.frame_count = 0
+        self._presented_idle = False # The last frame shown was rendered by an idle view
+        self.idle_time_s = 0.0
+        self.idle_wakeups = 0
+        self.profiler = FrameProfiler()
+        self.quality = QualityController()
+        self.recorder = recorder
+        self.autosaver = None # Set by main() for normal play; see core/savegame.py
+        self.net_server = None # Set by main() for --serve / --connect; see core/netsync.py
+        self.net_client = None
+        self.net_report_path = None
+        if memory_report_path is None and settings.MEMORY_TRACKING:
+            memory_report_path = settings.MEMORY_REPORT_PATH
+        # Started before the world is built so generation shows up in the report
+        self.memory = MemoryTracker(memory_report_path) if memory_report_path else None
+        self.startup_profile_path = startup_profile_path
+        threaded = settings.THREADED_SIMULATION if threaded is None else threaded
+        self.sim_thread = SimulationThread() if threaded else None
+
+        # All generation draws from the global RNG; seeding it makes a session reproducible
+        self.seed = seed if seed is not None else int.from_bytes(os.urandom(4), 'little')
+        random.seed(self.seed)
+        print(f"RNG seed: {self.seed}")
 
         print("Initializing Game Context...")
+        with timeline.step("player models"):
+            player_ship = PlayerShip()
+            player_char = PlayerCharacter()
+        world_path = settings.WORLD_FILE if world_path is None else world_path
+        with timeline.step("world generation"):
+            star_systems = (self._open_world_file(world_path) if world_path else None) or self._generate_star_systems()
         self.game_context = {
-            'player_ship': PlayerShip(),
-            'player_char': PlayerCharacter(),
-            'star_systems': self._generate_star_systems(),
+            'player_ship': player_ship,
+            'player_char': player_char,
+            'star_systems': star_systems,
             'current_star_system_idx': 0,
             'current_planet_idx': None,
             'current_region_idx': None,
+            'texture_prefetcher': PlanetTexturePrefetcher(),
         }
         self.game_context['current_star_system'] = \
             self.game_context['star_systems'][self.game_context['current_star_system_idx']]
         print("Game Context Initialized.")
 
         print("Setting initial game view...")
-        self.current_view = GalaxyView(self.game_context)
-        self.current_view.on_enter()
+        with timeline.step("initial view"):
+            self.views = ViewRegistry(self.game_context)
+            self.current_view = self.views.acquire(settings.GALAXY_VIEW, {})
+            self.current_view.on_enter()
         print(f"Initial view set to: {type(self.current_view).__name__}")
 
 
     def _generate_star_systems(self):
         print("Creating Star Systems...")
         try:
-            systems = [
-                StarSystem("Solara Prime", (150, 200), settings.YELLOW, 4),
-                StarSystem("Cygnus X-1", (600, 150), settings.BLUE, 2),
-                StarSystem("Kepler-186f System", (300, 500), settings.RED, 5),
-                StarSystem("Andromeda Gateway", (700, 450), settings.WHITE, 3),
-                StarSystem("Nebula Core", (450, 300), settings.PURPLE, 6),
-            ]
+            systems = [StarSystem(*entry) for entry in DEFAULT_STAR_SYSTEMS]
             print(f"Star Systems Created ({len(systems)} systems).")
             return systems
         except Exception as e:
@@ -85,6 +154,16 @@ class Game:
             pygame.quit()
             sys.exit()
 
+    def _open_world_file(self, path):
+        """Star systems from a compiled world file (compile_world.py), or None to fall back to generation."""
+        try:
+            world = WorldFile(path)
+            print(f"Opened world file {path} ({len(world)} systems).")
+            return MappedGalaxy(world) if len(world) else None
+        except (OSError, WorldFileError) as e:
+            print(f"Cannot open world file {path}: {e}. Generating the default galaxy.")
+            return None
+
     def _handle_intro_events(self):
         """Handle events during the intro. Returns True if intro should be skipped."""
         for event in pygame.event.get():
@@ -114,14 +193,16 @@ class Game:
         delay_3_frames = int(delay_3_time * settings.FPS)
         game_fade_frames = int(game_fade_in_time * settings.FPS)
 
-        # Attempt to play the intro music if available
+        # Attempt to play the intro music if available (the mixer is only initialized here)
         try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
             pygame.mixer.music.load("intro.mp3")
             pygame.mixer.music.play()
         except Exception as e:
             print(f"Failed to play intro music: {e}")
 
-        big_font = pygame.font.SysFont(None, 120)
+        big_font = assets.get_font(120)
         text_surf = big_font.render("Zenith", True, settings.WHITE).convert_alpha()
         text_rect = text_surf.get_rect(center=(settings.SCREEN_WIDTH // 2,
                                               settings.SCREEN_HEIGHT // 2))
@@ -131,144 +212,394 @@ class Game:
 
         for i in range(tri_in_frames):
             if self._handle_intro_events():
-                pygame.mixer.music.stop()
+                self._stop_intro_music()
                 return
             alpha = int(255 * (i / tri_in_frames))
-            self.screen.fill(settings.BLACK)
-            utils.draw_shiny_triangle(self.screen, center, triangle_size,
+            self.canvas.fill(settings.BLACK)
+            utils.draw_shiny_triangle(self.canvas, center, triangle_size,
                                       i / tri_in_frames, alpha)
-            pygame.display.flip()
+            self._flip()
             self.clock.tick(settings.FPS)
 
         for i in range(tri_out_frames):
             if self._handle_intro_events():
-                pygame.mixer.music.stop()
+                self._stop_intro_music()
                 return
             alpha = int(255 * (1 - i / tri_out_frames))
-            self.screen.fill(settings.BLACK)
-            utils.draw_shiny_triangle(self.screen, center, triangle_size,
+            self.canvas.fill(settings.BLACK)
+            utils.draw_shiny_triangle(self.canvas, center, triangle_size,
                                       i / tri_out_frames, alpha)
-            pygame.display.flip()
+            self._flip()
             self.clock.tick(settings.FPS)
 
         for _ in range(delay_1_frames):
             if self._handle_intro_events():
-                pygame.mixer.music.stop()
+                self._stop_intro_music()
                 return
-            self.screen.fill(settings.BLACK)
-            pygame.display.flip()
+            self.canvas.fill(settings.BLACK)
+            self._flip()
             self.clock.tick(settings.FPS)
 
         for i in range(fade_in_frames):
             if self._handle_intro_events():
-                pygame.mixer.music.stop()
+                self._stop_intro_music()
                 return
             alpha = int(255 * (i / fade_in_frames))
             text_surf.set_alpha(alpha)
-            self.screen.fill(settings.BLACK)
-            self.screen.blit(text_surf, text_rect)
-            pygame.display.flip()
+            self.canvas.fill(settings.BLACK)
+            self.canvas.blit(text_surf, text_rect)
+            self._flip()
             self.clock.tick(settings.FPS)
 
         for _ in range(delay_2_frames):
             if self._handle_intro_events():
-                pygame.mixer.music.stop()
+                self._stop_intro_music()
                 return
             text_surf.set_alpha(255)
-            self.screen.fill(settings.BLACK)
-            self.screen.blit(text_surf, text_rect)
-            pygame.display.flip()
+            self.canvas.fill(settings.BLACK)
+            self.canvas.blit(text_surf, text_rect)
+            self._flip()
             self.clock.tick(settings.FPS)
 
         for i in range(fade_out_frames):
             if self._handle_intro_events():
-                pygame.mixer.music.stop()
+                self._stop_intro_music()
                 return
             alpha = int(255 * (1 - i / fade_out_frames))
             text_surf.set_alpha(alpha)
-            self.screen.fill(settings.BLACK)
-            self.screen.blit(text_surf, text_rect)
-            pygame.display.flip()
+            self.canvas.fill(settings.BLACK)
+            self.canvas.blit(text_surf, text_rect)
+            self._flip()
             self.clock.tick(settings.FPS)
 
         for _ in range(delay_3_frames):
             if self._handle_intro_events():
-                pygame.mixer.music.stop()
+                self._stop_intro_music()
                 return
-            self.screen.fill(settings.BLACK)
-            pygame.display.flip()
+            self.canvas.fill(settings.BLACK)
+            self._flip()
             self.clock.tick(settings.FPS)
 
         overlay = pygame.Surface((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
         overlay.fill(settings.BLACK)
         for i in range(game_fade_frames):
             if self._handle_intro_events():
-                pygame.mixer.music.stop()
+                self._stop_intro_music()
                 return
             if self.current_view:
-                self.current_view.update(0, pygame.mouse.get_pos(),
+                self.current_view.update(0, self.mouse_pos(),
                                         pygame.key.get_pressed(), self.frame_count)
-                self.current_view.render(self.screen, pygame.mouse.get_pos(),
+                self.current_view.render(self.canvas, self.mouse_pos(),
                                          self.frame_count)
             alpha = int(255 * (1 - i / game_fade_frames))
             overlay.set_alpha(alpha)
-            self.screen.blit(overlay, (0, 0))
-            pygame.display.flip()
+            self.canvas.blit(overlay, (0, 0))
+            self._flip()
             self.clock.tick(settings.FPS)
             self.frame_count += 1
 
-        pygame.mixer.music.stop()
+        self._stop_intro_music()
+
+    def _stop_intro_music(self):
+        if pygame.mixer.get_init():
+            pygame.mixer.music.stop()
+
+    def _flip(self):
+        self._scale_to_window()
+        pygame.display.flip()
+        self._note_frame_presented()
+
+    def _scale_to_window(self, rects=None):
+        """Scales the render surface up into the window's viewport; with rects (logical), only the parts
+        under them. Returns the window rects that changed."""
+        viewport = self.viewport
+        if self.screen.get_size() == viewport.size: # Drawn in place
+            return [self.canvas.map_rect(r).inflate(2, 2).move(viewport.topleft) for r in rects] if rects else None
+        scale = pygame.transform.smoothscale if settings.RENDER_SCALE_SMOOTH else pygame.transform.scale
+        if not rects:
+            scale(self.screen, viewport.size, self.window.subsurface(viewport))
+            return None
+        render_rect = self.screen.get_rect()
+        # The viewport keeps the render surface's aspect, so this is one scale up to rounding
+        scale_x = viewport.width / render_rect.width
+        scale_y = viewport.height / render_rect.height
+        updated = []
+        for rect in rects:
+            # One render pixel of padding: the filter reads its neighbours, and rounding may round in
+            source = self.canvas.map_rect(rect).inflate(2, 2).clip(render_rect)
+            if not source:
+                continue
+            left, top = round(source.left * scale_x), round(source.top * scale_y)
+            target = pygame.Rect(left + viewport.left, top + viewport.top,
+                                 round(source.right * scale_x) - left, round(source.bottom * scale_y) - top)
+            scale(self.screen.subsurface(source), target.size, self.window.subsurface(target))
+            updated.append(target)
+        return updated
+
+    def to_internal(self, window_pos):
+        """Maps a window position (mouse) into the logical coordinates views use. Positions on the
+        bars around the viewport land outside the logical screen."""
+        if self.window.get_size() == self.canvas.get_size():
+            return window_pos
+        scale = self.viewport.width / settings.SCREEN_WIDTH
+        return (int((window_pos[0] - self.viewport.left) / scale), int((window_pos[1] - self.viewport.top) / scale))
+
+    def mouse_pos(self):
+        return self.to_internal(pygame.mouse.get_pos())
+
+    def poll_events(self):
+        """pygame.event.get() with mouse event positions mapped into logical coordinates."""
+        events = pygame.event.get()
+        if self.window.get_size() == self.canvas.get_size():
+            return events
+        mapped = []
+        for event in events:
+            if hasattr(event, 'pos'):
+                attrs = dict(event.dict)
+                attrs['pos'] = self.to_internal(event.pos)
+                event = pygame.event.Event(event.type, attrs)
+            mapped.append(event)
+        return mapped
+
+    def _note_frame_presented(self):
+        if not startup.TIMELINE.finished:
+            startup.TIMELINE.finish()
+            print(startup.TIMELINE.report())
+            if self.startup_profile_path:
+                startup.TIMELINE.dump(self.startup_profile_path)
 
     def run(self):
-        self.play_intro()
+        if self.recorder:
+            print(f"Recording input to {self.recorder.path} (intro skipped).")
+            # Quality level changes particle counts (and so RNG use); pin it so replays match
+            self.quality.adaptive = False
+        else:
+            self.play_intro()
         print("Entering Main Game Loop...")
         while self.running:
-            dt = self.clock.tick(settings.FPS) / 1000.0
-            self.frame_count += 1
-            
-            mouse_pos = pygame.mouse.get_pos()
-            keys_pressed = pygame.key.get_pressed()
-
-            try:
-                events = pygame.event.get()
-                for event in events:
-                    if event.type == pygame.QUIT:
-                        self.running = False
-                    if event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_ESCAPE:
-                            self.running = False
-                    
-                    if self.current_view:
-                        self.current_view.handle_event(event, mouse_pos, keys_pressed)
-            except Exception as e:
-                print(f"Event Handling Error: {e}"); traceback.print_exc(); self.running = False
-
-            try:
-                if self.current_view:
-                    self.current_view.update(dt, mouse_pos, keys_pressed, self.frame_count)
-            except Exception as e:
-                print(f"Update Logic Error ({type(self.current_view).__name__}): {e}"); traceback.print_exc(); self.running = False
-
-            try:
-                if self.current_view:
-                    self.current_view.render(self.screen, mouse_pos, self.frame_count) # MODIFIED: Passed mouse_pos
-                pygame.display.flip()
-            except Exception as e:
-                print(f"Drawing/Flip Error ({type(self.current_view).__name__}): {e}"); traceback.print_exc(); self.running = False
-
-            if self.current_view and self.current_view.next_state_request:
-                next_state_name, params = self.current_view.next_state_request
-                self.current_view.next_state_request = None
-                self.transition_to_state(next_state_name, params)
+            if self._can_idle():
+                woke = self._wait_for_input()
+                self.clock.tick() # Time spent asleep is not frame time
+                if not woke:
+                    if self.autosaver:
+                        self.autosaver.tick(self)
+                    continue
+                dt_ms = round(1000 / settings.FPS)
+            else:
+                dt_ms = self.clock.tick(settings.FPS)
+            t_work_start = time.perf_counter()
+            if self.recorder:
+                events, mouse_pos, keys_pressed = self.recorder.capture(
+                    self.poll_events(), self.mouse_pos(), pygame.key.get_pressed())
+                self.run_frame(dt_ms / 1000.0, events, mouse_pos, keys_pressed)
+                self.recorder.write_frame(dt_ms, events, mouse_pos, keys_pressed, self.state_checksum())
+            else:
+                self.run_frame(dt_ms / 1000.0)
+            self.quality.record_frame((time.perf_counter() - t_work_start) * 1000.0)
+            if self.autosaver:
+                self.autosaver.tick(self)
+            self._presented_idle = self.current_view is not None and self.current_view.is_idle()
         
+        if self.recorder:
+            self.recorder.close()
+        self.quit()
+
+    def _can_idle(self):
+        """True if the screen is up to date and stays so until input: an idle view presented the last frame.
+        Sync sessions tick every frame, and the profiler keeps measuring, so neither idles."""
+        return (settings.IDLE_WAIT and self._presented_idle and self.current_view is not None
+                and self.current_view.is_idle() and not self.net_server and not self.net_client
+                and not self.profiler.enabled)
+
+    def _wait_for_input(self):
+        """Sleeps until an event arrives (True) or IDLE_WAIT_TIMEOUT_MS passes (False).
+        Events are left queued, in order, for the next frame to poll."""
+        t_start = time.perf_counter()
+        event = pygame.event.wait(settings.IDLE_WAIT_TIMEOUT_MS)
+        self.idle_time_s += time.perf_counter() - t_start
+        if event.type == pygame.NOEVENT:
+            return False
+        for queued in [event] + pygame.event.get():
+            pygame.event.post(queued)
+        self.idle_wakeups += 1
+        return True
+
+    def run_replay(self, replay):
+        """Feeds a recording through run_frame at uncapped speed. Returns the first diverging frame or None."""
+        print(f"Replaying {replay.path} (seed {replay.seed})...")
+        first_divergence = None
+        frames = 0
+        t_start = time.perf_counter()
+        for frame in replay:
+            if not self.running:
+                break
+            pygame.event.pump() # Keep the window responsive; recorded events drive the game
+            self.run_frame(frame.dt_ms / 1000.0, frame.events, frame.mouse_pos, frame.keys)
+            frames += 1
+            if first_divergence is None and self.state_checksum() != frame.checksum:
+                first_divergence = frames
+                print(f"Warning: replay diverged from the recording at frame {frames}.")
+        elapsed = time.perf_counter() - t_start
+        fps = frames / elapsed if elapsed > 0 else 0.0
+        print(f"Replay finished: {frames} frames in {elapsed:.2f}s ({fps:.1f} FPS), "
+              f"{'in sync' if first_divergence is None else 'DIVERGED'}.")
+        self.quit()
+        return first_divergence
+
+    def quit(self):
         print("Exiting game loop.")
+        if self.autosaver:
+            self.autosaver.save(self, wait=True)
+        if self.sim_thread:
+            self.sim_thread.stop()
+        texture_jobs.shutdown()
+        for endpoint, role in ((self.net_server, "server"), (self.net_client, "client")):
+            if endpoint:
+                print(f"Sync {role}: {endpoint.report()}")
+                if self.net_report_path:
+                    endpoint.write_tick_report(self.net_report_path)
+                endpoint.close()
+        if settings.FRAME_PROFILER_DUMP_PATH:
+            self.profiler.dump(settings.FRAME_PROFILER_DUMP_PATH)
+        if self.idle_wakeups or self.idle_time_s:
+            print(f"Idle: {self.idle_time_s:.1f}s asleep, woken {self.idle_wakeups} times by input.")
+        print(assets.surface_stats_report())
+        print(self.game_context['texture_prefetcher'].report())
+        if self.memory:
+            self.memory.write_report(self)
         pygame.quit()
         print("Pygame quit successfully.")
         sys.exit()
 
+    def state_checksum(self):
+        """Cheap fingerprint of simulation state, used to check that a replay stays in sync."""
+        self.sync_simulation() # Same state a serial frame would end in, so recordings work in either mode
+        ship = self.game_context['player_ship']
+        char = self.game_context['player_char']
+        state = (type(self.current_view).__name__, self.frame_count,
+                 round(ship.pos.x, 3), round(ship.pos.y, 3), round(ship.angle, 3),
+                 round(char.pos.x, 3), round(char.pos.y, 3), round(char.world_scroll, 3),
+                 self.game_context['current_star_system_idx'],
+                 self.game_context['current_planet_idx'], self.game_context['current_region_idx'])
+        return zlib.crc32(repr(state).encode())
+
+    def run_frame(self, dt, events=None, mouse_pos=None, keys_pressed=None):
+        """Runs one frame (events, update, render + present). Inputs default to the live pygame state."""
+        self.frame_count += 1
+        profiler = self.profiler if self.profiler.enabled else None
+        if profiler: t_frame_start = time.perf_counter()
+        
+        if mouse_pos is None: mouse_pos = self.mouse_pos()
+        if keys_pressed is None: keys_pressed = pygame.key.get_pressed()
+
+        # The previous frame's threaded update must finish before anything else touches view state;
+        # a transition it requested is applied now, on the main thread
+        self.sync_simulation()
+        if self.net_server:
+            self.net_server.publish(self) # The state the last frame ended in, consistent in threaded mode too
+        spectating = self.net_client is not None
+        if spectating:
+            keys_pressed = NO_KEYS # Views animate, but the server's state replaces anything they simulate
+        threaded = (self.sim_thread is not None and self.current_view is not None
+                    and self.current_view.supports_threaded_update and not spectating)
+        if self.current_view:
+            self.current_view.snapshot_buffer = self.sim_thread.buffer if threaded else None
+
+        try:
+            if events is None: events = self.poll_events()
+            for event in events:
+                if event.type == pygame.QUIT:
+                    self.running = False
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        self.running = False
+                    elif event.key == settings.PROFILER_TOGGLE_KEY:
+                        self.profiler.toggle()
+                        if self.current_view: self.current_view.mark_full_redraw()
+                
+                if self.current_view and not threaded and not spectating: # Threaded views get their events on the sim thread
+                    self.current_view.handle_event(event, mouse_pos, keys_pressed)
+        except Exception as e:
+            print(f"Event Handling Error: {e}"); traceback.print_exc(); self.running = False
+        if profiler: t_events_end = time.perf_counter()
+
+        try:
+            if threaded:
+                # Runs while this thread renders the snapshot published by the previous update
+                self.sim_thread.submit(self.current_view, dt, events, mouse_pos, keys_pressed, self.frame_count)
+            elif self.current_view:
+                self.current_view.update(dt, mouse_pos, keys_pressed, self.frame_count)
+            if spectating:
+                self.net_client.apply(self)
+        except Exception as e:
+            print(f"Update Logic Error ({type(self.current_view).__name__}): {e}"); traceback.print_exc(); self.running = False
+        if profiler: t_update_end = t_render_end = t_present_start = time.perf_counter()
+
+        try:
+            if self.current_view:
+                self.current_view.render(self.canvas, mouse_pos, self.frame_count) # MODIFIED: Passed mouse_pos
+            if profiler:
+                # Overlay drawing is kept out of the measured render time
+                t_render_end = time.perf_counter()
+                if profiler.show_overlay:
+                    overlay_rect = profiler.draw_overlay(self.screen) # At render resolution, not through the canvas
+                    if overlay_rect and self.current_view:
+                        self.current_view.mark_dirty(self.canvas.unmap_rect(overlay_rect))
+                t_present_start = time.perf_counter()
+            self._present()
+        except Exception as e:
+            print(f"Drawing/Flip Error ({type(self.current_view).__name__}): {e}"); traceback.print_exc(); self.running = False
+        if profiler:
+            t_present_end = time.perf_counter()
+            queue = self.current_view.render_queue if self.current_view else None
+            profiler.record(self.frame_count, type(self.current_view).__name__,
+                            (t_events_end - t_frame_start) * 1000.0,
+                            (t_update_end - t_events_end) * 1000.0,
+                            ((t_render_end - t_update_end) + (t_present_end - t_present_start)) * 1000.0,
+                            queue.commands if queue else 0, queue.calls if queue else 0)
+
+        if not threaded:
+            self._apply_state_request()
+        if self.memory:
+            self.memory.tick(self)
+
+    def sync_simulation(self):
+        """Waits for an in-flight threaded update, then applies the transition it requested."""
+        if not self.sim_thread:
+            return
+        try:
+            self.sim_thread.wait()
+        except Exception as e:
+            print(f"Update Logic Error ({type(self.current_view).__name__}): {e}"); self.running = False
+        self._apply_state_request()
+
+    def _apply_state_request(self):
+        if self.current_view and self.current_view.next_state_request:
+            next_state_name, params = self.current_view.next_state_request
+            self.current_view.next_state_request = None
+            self.transition_to_state(next_state_name, params)
+
+    def _present(self):
+        """Pushes the frame to the display, limited to the view's dirty rects in DIRTY_RECT_MODE."""
+        rects = self.current_view.consume_dirty_rects() if self.current_view else None
+        if settings.DIRTY_RECT_MODE:
+            rects = utils.merge_dirty_rects(rects, self.canvas.get_rect(),
+                                            settings.DIRTY_RECT_FULL_REDRAW_RATIO)
+            if rects is not None:
+                if rects and self.window.get_size() != self.canvas.get_size():
+                    rects = self._scale_to_window(rects)
+                if rects:
+                    pygame.display.update(rects)
+                self._note_frame_presented()
+                return
+        self._flip()
+
     def transition_to_state(self, next_state_name, params):
+        if self.memory and self.current_view:
+            self.memory.checkpoint(self, f"{type(self.current_view).__name__} -> {next_state_name}")
         if self.current_view:
             self.current_view.on_exit()
+            self.current_view.suspend()
 
         print(f"Transitioning from {type(self.current_view).__name__} to {next_state_name} with params {params}")
 
@@ -283,25 +614,95 @@ class Game:
         if 'region_idx' in params and next_state_name == settings.GROUND_VIEW:
             self.game_context['current_region_idx'] = params['region_idx']
 
-        if next_state_name == settings.GALAXY_VIEW:
-            self.current_view = GalaxyView(self.game_context)
-        elif next_state_name == settings.STAR_SYSTEM_VIEW:
-            self.current_view = StarSystemView(self.game_context)
-        elif next_state_name == settings.PLANET_OVERHEAD_VIEW:
-            self.current_view = PlanetView(self.game_context)
-        elif next_state_name == settings.GROUND_VIEW:
-            self.current_view = GroundView(self.game_context)
-        elif next_state_name == settings.HYPERSPACE_TRANSITION:
-            target_idx = params.get('target_system_idx')
-            self.current_view = HyperspaceView(self.game_context, target_idx)
-        else:
+        next_view = self.views.acquire(next_state_name, params)
+        if next_view is None:
             print(f"Error: Unknown state name '{next_state_name}' for transition.")
-            self.current_view = GalaxyView(self.game_context)
+            next_view = self.views.acquire(settings.GALAXY_VIEW, {})
+        self.current_view = next_view
 
         if self.current_view:
             self.current_view.on_enter(params)
+        self.views.enforce_limits(self.current_view)
         print(f"Transition complete. Current view: {type(self.current_view).__name__}")
 
-if __name__ == '__main__':
-    game = Game()
+def parse_window_size(text):
+    """argparse type for WIDTHxHEIGHT."""
+    try:
+        width, height = (int(part) for part in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    if width < 1 or height < 1:
+        raise argparse.ArgumentTypeError(f"window size must be positive, got {text!r}")
+    return (width, height)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Galaxy Explorer")
+    parser.add_argument('--seed', type=int, help="seed for world generation and gameplay randomness")
+    parser.add_argument('--record', metavar='PATH', help="record per-frame input to PATH")
+    parser.add_argument('--replay', metavar='PATH', help="replay a recording at uncapped speed")
+    parser.add_argument('--startup-profile', metavar='PATH', help="write the startup timeline as JSON to PATH")
+    parser.add_argument('--threaded', action='store_true', default=None,
+                        help="run view updates on a simulation thread (see THREADED_SIMULATION)")
+    parser.add_argument('--render-scale', type=float,
+                        help="render resolution as a fraction of the window, 0.25-1.0 (see RENDER_SCALE)")
+    parser.add_argument('--window-size', type=parse_window_size, metavar='WxH',
+                        help="window size in pixels (see WINDOW_SIZE)")
+    parser.add_argument('--resume', action='store_true', help="continue from the save file")
+    parser.add_argument('--save-path', default=settings.SAVE_PATH, help="save file (default: %(default)s)")
+    parser.add_argument('--no-save', action='store_true', help="disable autosave")
+    parser.add_argument('--memory-report', metavar='PATH',
+                        help="track allocations with tracemalloc and write a per-view report to PATH on exit")
+    parser.add_argument('--world', metavar='PATH',
+                        help="play a galaxy compiled by compile_world.py (saves and replays need the same file)")
+    parser.add_argument('--serve', metavar='[HOST:]PORT',
+                        help="publish every tick to --connect clients over UDP (with --replay: a headless driver)")
+    parser.add_argument('--connect', metavar='[HOST:]PORT',
+                        help="spectate a --serve instance; start both with the same --seed/--world")
+    parser.add_argument('--net-report', metavar='PATH', help="write a per-tick sync CSV to PATH on exit")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        replay = InputReplay(args.replay)
+        game = Game(seed=replay.seed, startup_profile_path=args.startup_profile, threaded=args.threaded,
+                    render_scale=args.render_scale, memory_report_path=args.memory_report, world_path=args.world,
+                    window_size=args.window_size)
+        _attach_sync(game, args)
+        game.run_replay(replay)
+        return
+
+    # Recordings always start from a fresh world so they replay from their seed alone
+    save = None
+    if args.resume and not args.record:
+        try:
+            t_load = time.perf_counter()
+            save = savegame.read(args.save_path, world_file.identity(args.world))
+            print(f"Loaded save {args.save_path} in {(time.perf_counter() - t_load) * 1000.0:.2f} ms.")
+        except (OSError, savegame.SaveError) as e:
+            print(f"Cannot resume from {args.save_path}: {e}. Starting a new game.")
+
+    game = Game(seed=save.seed if save else args.seed, startup_profile_path=args.startup_profile,
+                threaded=args.threaded, render_scale=args.render_scale, memory_report_path=args.memory_report,
+                world_path=args.world, window_size=args.window_size)
+    if save:
+        try:
+            savegame.restore(game, save)
+        except savegame.SaveError as e: # restore checks everything first, so the game is still a fresh one
+            print(f"Cannot resume from {args.save_path}: {e}. Starting a new game.")
+    _attach_sync(game, args)
+    if args.record:
+        game.recorder = InputRecorder(args.record, game.seed)
+    elif not args.no_save and not game.net_client:
+        game.autosaver = savegame.Autosaver(args.save_path)
     game.run()
+
+def _attach_sync(game, args):
+    game.net_report_path = args.net_report
+    if args.serve:
+        game.net_server = netsync.SyncServer(netsync.parse_address(args.serve))
+        print(f"Serving state sync on {game.net_server.address[0]}:{game.net_server.address[1]}.")
+    if args.connect:
+        game.net_client = netsync.SyncClient(netsync.parse_address(args.connect))
+        print(f"Spectating {args.connect}.")
+
+if __name__ == '__main__':
+    main()
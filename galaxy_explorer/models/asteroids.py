@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+import math
+import operator
+import random
+from array import array
+import pygame
+from .. import settings
+from ..core import assets
+
+# Pre-rendered rock sprites: every shape at every size. sprite index = shape * len(ROCK_SIZES) + size index
+ROCK_SIZES = (2, 3, 5) # Radius in pixels
+ROCK_SHAPES = 4
+ROCK_SPRITE_COUNT = ROCK_SHAPES * len(ROCK_SIZES)
+ROCK_COLORS = ((120, 110, 100), (95, 90, 85), (140, 125, 105), (105, 100, 110))
+
+def rock_radius(sprite_idx):
+    return ROCK_SIZES[sprite_idx % len(ROCK_SIZES)]
+
+def get_rock_sprite(sprite_idx):
+    return assets.get_surface(('rock', sprite_idx), lambda: _build_rock_sprite(sprite_idx))
+
+def _build_rock_sprite(sprite_idx):
+    shape = sprite_idx // len(ROCK_SIZES)
+    radius = rock_radius(sprite_idx)
+    rng = random.Random(sprite_idx) # Fixed shapes; never touches the game RNG
+    size = radius * 2 + 2
+    sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+    center = (radius + 1, radius + 1)
+    points = []
+    for i in range(7):
+        a = i / 7 * math.tau
+        r = radius * rng.uniform(0.6, 1.0)
+        points.append((center[0] + math.cos(a) * r, center[1] + math.sin(a) * r))
+    color = ROCK_COLORS[shape % len(ROCK_COLORS)]
+    pygame.draw.polygon(sprite, color, points)
+    if radius > 2:
+        highlight = tuple(min(255, c + 50) for c in color)
+        pygame.draw.circle(sprite, highlight, (center[0] - radius // 3, center[1] - radius // 3), max(1, radius // 3))
+    return sprite
+
+class AsteroidBelt:
+    """A belt of rocks on circular orbits, stored as parallel arrays.
+
+    Positions are recomputed from the orbital elements on every update. A
+    uniform grid (spatial hash) over those positions answers proximity
+    queries. It is rebuilt only every ASTEROID_HASH_REBUILD_FRAMES; queries
+    are padded by the farthest a rock can have moved since, so no rock is
+    missed.
+    """
+
+    def __init__(self, center, inner_radius, outer_radius, count, rng):
+        self.center = center
+        self.inner_radius = inner_radius
+        self.outer_radius = outer_radius
+        self.count = count
+
+        self.orbit_radius = array('f', (rng.uniform(inner_radius, outer_radius) for _ in range(count)))
+        self.angle = array('f', (rng.uniform(0, math.tau) for _ in range(count))) # Radians
+        # Whole belt turns one way; inner rocks faster (roughly Keplerian)
+        base_speed = rng.uniform(0.0006, 0.0015) * rng.choice([-1, 1]) # Radians per frame at inner_radius
+        self.speed = array('f', (base_speed * (inner_radius / r) ** 1.5 * rng.uniform(0.9, 1.1)
+                                 for r in self.orbit_radius))
+        self.sprite_idx = array('B', (rng.randrange(ROCK_SPRITE_COUNT) for _ in range(count)))
+        self._max_step_px = max((abs(s) * r for s, r in zip(self.speed, self.orbit_radius)), default=0.0)
+
+        self.x = self.y = None
+        self._update_positions()
+        self._grid = {}
+        self._frames_since_rebuild = 0
+        self._rebuild_hash()
+        self._dirty_rects = None # The ring never moves: computed once
+
+    def _update_positions(self):
+        # New arrays every time (never mutated in place), so render snapshots can hold references
+        cx, cy = self.center
+        self.x = array('f', [cx + v for v in map(operator.mul, self.orbit_radius, map(math.cos, self.angle))])
+        self.y = array('f', [cy + v for v in map(operator.mul, self.orbit_radius, map(math.sin, self.angle))])
+
+    def update(self):
+        tau = math.tau
+        self.angle = array('f', [(a + s) % tau for a, s in zip(self.angle, self.speed)])
+        self._update_positions()
+        self._frames_since_rebuild += 1
+        if self._frames_since_rebuild >= settings.ASTEROID_HASH_REBUILD_FRAMES:
+            self._rebuild_hash()
+
+    # --- Spatial hash ---
+    def _rebuild_hash(self):
+        cell = settings.ASTEROID_HASH_CELL
+        grid = {}
+        for i, (x, y) in enumerate(zip(self.x, self.y)):
+            key = (int(x) // cell, int(y) // cell)
+            bucket = grid.get(key)
+            if bucket is None:
+                grid[key] = [i]
+            else:
+                bucket.append(i)
+        self._grid = grid
+        self._frames_since_rebuild = 0
+
+    def query(self, pos, radius):
+        """Indices of rocks whose outline is within radius of pos, as (index, distance squared) pairs."""
+        cell = settings.ASTEROID_HASH_CELL
+        pad = radius + max(ROCK_SIZES) + self._max_step_px * self._frames_since_rebuild
+        px, py = pos
+        xs, ys, sprite_idx = self.x, self.y, self.sprite_idx
+        found = []
+        for gx in range(int(px - pad) // cell, int(px + pad) // cell + 1):
+            for gy in range(int(py - pad) // cell, int(py + pad) // cell + 1):
+                for i in self._grid.get((gx, gy), ()):
+                    dx = xs[i] - px
+                    dy = ys[i] - py
+                    dist_sq = dx * dx + dy * dy
+                    reach = radius + rock_radius(sprite_idx[i])
+                    if dist_sq <= reach * reach:
+                        found.append((i, dist_sq))
+        return found
+
+    def nearest(self, pos, max_range):
+        """(index, distance) of the closest rock within max_range of pos, or None."""
+        hits = self.query(pos, max_range)
+        if not hits:
+            return None
+        i, dist_sq = min(hits, key=lambda hit: hit[1])
+        return i, math.sqrt(dist_sq)
+
+    def position(self, i):
+        return (self.x[i], self.y[i])
+
+    def bounds(self):
+        r = self.outer_radius + max(ROCK_SIZES) + 1
+        return pygame.Rect(int(self.center[0] - r), int(self.center[1] - r), int(r * 2), int(r * 2))
+
+    def dirty_rects(self):
+        """Rects (world coordinates) covering the ring the rocks can ever be in, one or two per
+        ASTEROID_HASH_CELL-high row. Far less of the screen than bounds(), which includes the hole."""
+        if self._dirty_rects is None:
+            cell = settings.ASTEROID_HASH_CELL
+            cx, cy = self.center
+            margin = max(ROCK_SIZES) + 2 # Sprite reach past a rock's position, after blit truncation
+            outer = self.outer_radius + margin
+            inner = max(0.0, self.inner_radius - margin)
+            rects = []
+            for top in range(math.floor(cy - outer), math.ceil(cy + outer), cell):
+                near = max(0.0, top - cy, cy - top - cell) # Row's closest and farthest distance from the centre
+                far = max(abs(top - cy), abs(top + cell - cy))
+                half = math.sqrt(max(0.0, outer * outer - near * near))
+                left, right = math.floor(cx - half), math.floor(cx + half) + 1
+                if far < inner: # The row crosses the hole: a span either side of it
+                    hole = math.sqrt(inner * inner - far * far)
+                    rects.append(pygame.Rect(left, top, math.floor(cx - hole) + 1 - left, cell))
+                    rects.append(pygame.Rect(math.floor(cx + hole), top, right - math.floor(cx + hole), cell))
+                else:
+                    rects.append(pygame.Rect(left, top, right - left, cell))
+            self._dirty_rects = rects
+        return self._dirty_rects
+
+    # --- Rendering ---
+    def visible_blits(self, view, xs, ys, canvas=None):
+        """[(sprite, dest)] for the rocks inside view (a world rect), at positions from a render snapshot.
+
+        dests are relative to view's top-left. When the view shows most of the
+        belt every rock is tested; otherwise only those in the hash cells under
+        the view, so a belt mostly off screen costs what is visible of it.
+        With a canvas the items are at its render scale, for
+        RenderQueue.blits(..., scaled=True).
+        """
+        sprites = [get_rock_sprite(i) for i in range(ROCK_SPRITE_COUNT)]
+        s = canvas.scale if canvas is not None else 1.0
+        if s != 1.0:
+            sprites = [canvas.sprite(sprite) for sprite in sprites]
+        # Top-left of each sprite relative to the view, folded into one subtraction per axis
+        offsets_x = [view.left * s + sprite.get_width() // 2 for sprite in sprites]
+        offsets_y = [view.top * s + sprite.get_height() // 2 for sprite in sprites]
+        margin = max(ROCK_SIZES) + 1
+        left, top = view.left - margin, view.top - margin
+        right, bottom = view.right + margin, view.bottom + margin
+        bounds = self.bounds()
+        overlap = bounds.clip(view)
+        if overlap.width * overlap.height * 2 >= bounds.width * bounds.height:
+            return [(sprites[k], (x * s - offsets_x[k], y * s - offsets_y[k]))
+                    for k, x, y in zip(self.sprite_idx, xs, ys)
+                    if left < x < right and top < y < bottom]
+        if not overlap:
+            return []
+
+        # The hash may be a frame or two newer than the snapshot in threaded mode: pad for that drift too
+        cell = settings.ASTEROID_HASH_CELL
+        pad = margin + self._max_step_px * (self._frames_since_rebuild + 2)
+        grid = self._grid
+        found = []
+        for gx in range(int(left - pad) // cell, int(right + pad) // cell + 1):
+            for gy in range(int(top - pad) // cell, int(bottom + pad) // cell + 1):
+                found.extend(grid.get((gx, gy), ()))
+        found.sort() # Same draw order (and so the same overlaps) as the full walk
+        sprite_idx = self.sprite_idx
+        items = []
+        for i in found:
+            x, y = xs[i], ys[i]
+            if left < x < right and top < y < bottom:
+                k = sprite_idx[i]
+                items.append((sprites[k], (x * s - offsets_x[k], y * s - offsets_y[k])))
+        return items
+
+    def draw(self, surface, xs, ys):
+        """Batched blit of all on-screen rocks at the given positions (from a render snapshot)."""
+        surface.blits(self.visible_blits(surface.get_rect(), xs, ys), False)
@@ -2,12 +2,13 @@
 import pygame
 import traceback
 from .. import settings
+from ..core import assets
 
 class PlayerCharacter(pygame.sprite.Sprite):
     def __init__(self):
         super().__init__()
         try:
-            self.image = pygame.Surface((20, 40))
+            self.image = assets.to_display_format(pygame.Surface((20, 40)), alpha=False)
             self.image.fill(settings.GREEN)
             self.rect = self.image.get_rect(center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT - 100))
         except Exception as e:
@@ -2,17 +2,31 @@
 import pygame
 import math
 import random
+import struct
 import traceback
 from .. import settings
+from ..core import assets, quality
+
+_FLOAT32 = struct.Struct('f')
+
+def rotated_size(size, angle):
+    """ Size of pygame.transform.rotate() of a surface of size by angle, without rotating anything.
+    Mirrors pygame's own computation (which takes the angle as a C float), so rects match exactly. """
+    w, h = size
+    angle = _FLOAT32.unpack(_FLOAT32.pack(angle))[0]
+    if not math.fmod(angle, 90.0): # pygame turns these losslessly
+        return (w, h) if int(angle // 90) % 2 == 0 else (h, w)
+    radians = angle * 0.01745329251994329
+    s, c = math.sin(radians), math.cos(radians)
+    cx, cy, sx, sy = c * w, c * h, s * w, s * h
+    return (int(max(abs(cx + sy), abs(cx - sy), abs(-cx + sy), abs(-cx - sy))),
+            int(max(abs(sx + cy), abs(sx - cy), abs(-sx + cy), abs(-sx - cy))))
 
 class PlayerShip(pygame.sprite.Sprite):
     def __init__(self):
         super().__init__()
-        self.image_orig = pygame.Surface((30, 20), pygame.SRCALPHA)
-        pygame.draw.polygon(self.image_orig, settings.WHITE, [(0, 0), (30, 10), (0, 20)])
-        pygame.draw.rect(self.image_orig, settings.RED, (25, 8, 5, 4))
-        self.image = self.image_orig
-        self.rect = self.image.get_rect(center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2))
+        self.image_orig = assets.get_surface(('sprite', 'player_ship'), self._build_image)
+        self.rect = self.image_orig.get_rect(center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2))
         self.pos = pygame.Vector2(self.rect.center)
         self.velocity = pygame.Vector2(0, 0)
         self.angle = 0
@@ -23,7 +37,14 @@ class PlayerShip(pygame.sprite.Sprite):
         self.thrust_particles = []
         self.orientation_locked = False # True if shift is held, ship won't orient to mouse
 
-    def update(self, keys, mouse_pos, dt): # dt added for particles
+    @staticmethod
+    def _build_image():
+        image = pygame.Surface((30, 20), pygame.SRCALPHA)
+        pygame.draw.polygon(image, settings.WHITE, [(0, 0), (30, 10), (0, 20)])
+        pygame.draw.rect(image, settings.RED, (25, 8, 5, 4))
+        return image
+
+    def update(self, keys, mouse_pos, dt, bounds=None): # dt added for particles; bounds: wrap-around rect, default the screen
         try:
             # Determine if orientation should be locked (Shift key pressed)
             self.orientation_locked = (keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT])
@@ -43,8 +64,7 @@ class PlayerShip(pygame.sprite.Sprite):
                 self.angle %= 360
             # If orientation_locked is True, self.angle remains unchanged from the previous frame
 
-            self.image = pygame.transform.rotate(self.image_orig, self.angle)
-            self.rect = self.image.get_rect(center=self.pos)
+            self.update_rect() # The image itself is turned where it is drawn (see update_rect)
 
             # Note: Pygame's rotation is clockwise for positive angles.
             # Vector2.rotate expects counter-clockwise.
@@ -83,11 +103,14 @@ class PlayerShip(pygame.sprite.Sprite):
 
             self.pos += self.velocity
 
-            # Screen wrapping
-            if self.pos.x < 0: self.pos.x = settings.SCREEN_WIDTH
-            if self.pos.x > settings.SCREEN_WIDTH: self.pos.x = 0
-            if self.pos.y < 0: self.pos.y = settings.SCREEN_HEIGHT
-            if self.pos.y > settings.SCREEN_HEIGHT: self.pos.y = 0
+            # Screen (or play area) wrapping
+            # (Not left/right: those name the strafe directions used below)
+            min_x, min_y, max_x, max_y = (0, 0, settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT) if bounds is None else \
+                                         (bounds.left, bounds.top, bounds.right, bounds.bottom)
+            if self.pos.x < min_x: self.pos.x = max_x
+            if self.pos.x > max_x: self.pos.x = min_x
+            if self.pos.y < min_y: self.pos.y = max_y
+            if self.pos.y > max_y: self.pos.y = min_y
             self.rect.center = self.pos
 
             # Particle Update (using dt now)
@@ -96,7 +119,7 @@ class PlayerShip(pygame.sprite.Sprite):
                 nozzle_offset = pygame.Vector2(-15, 0).rotate(-self.angle) # Back of the ship
                 particle_pos_base = self.pos + nozzle_offset
                 particle_vel_base = -forward # Opposite to ship's forward
-                for _ in range(2):
+                for _ in range(quality.get('thrust_particles')):
                     # Spread particles slightly and give them velocity away from nozzle
                     particle_vel = particle_vel_base.rotate(random.uniform(-15, 15)) * random.uniform(1.5, 3.0) * 60 # Scale speed
                     self.thrust_particles.append({
@@ -110,7 +133,7 @@ class PlayerShip(pygame.sprite.Sprite):
                 nozzle_offset = pygame.Vector2(5, -10).rotate(-self.angle) # Assumed left side nozzle (top-ish for triangle)
                 particle_pos_base = self.pos + nozzle_offset
                 particle_vel_base = right # Thrust is to the ship's right to move ship right
-                for _ in range(1):
+                for _ in range(quality.get('strafe_particles')):
                     particle_vel = particle_vel_base.rotate(random.uniform(-20, 20)) * random.uniform(1.0, 2.0) * 60
                     self.thrust_particles.append({
                         'pos': particle_pos_base + pygame.Vector2(random.uniform(-1,1), random.uniform(-1,1)),
@@ -122,7 +145,7 @@ class PlayerShip(pygame.sprite.Sprite):
                 nozzle_offset = pygame.Vector2(5, 10).rotate(-self.angle) # Assumed right side nozzle (bottom-ish for triangle)
                 particle_pos_base = self.pos + nozzle_offset
                 particle_vel_base = left # Thrust is to the ship's left to move ship left
-                for _ in range(1):
+                for _ in range(quality.get('strafe_particles')):
                     particle_vel = particle_vel_base.rotate(random.uniform(-20, 20)) * random.uniform(1.0, 2.0) * 60
                     self.thrust_particles.append({
                         'pos': particle_pos_base + pygame.Vector2(random.uniform(-1,1), random.uniform(-1,1)),
@@ -144,10 +167,16 @@ class PlayerShip(pygame.sprite.Sprite):
             print(f"Error in PlayerShip update: {e}")
             traceback.print_exc()
 
-    def draw_particles(self, surface):
-         for p in self.thrust_particles:
-             size = max(1, int(p['life'] * 4 + 1)) # Size based on remaining life
-             pygame.draw.circle(surface, p['color'], p['pos'], size)
+    def particle_snapshot(self):
+        """Immutable (pos, size, color) tuples for drawing the current particles."""
+        return tuple(((p['pos'].x, p['pos'].y), max(1, int(p['life'] * 4 + 1)), p['color']) # Size based on remaining life
+                     for p in self.thrust_particles)
+
+    def update_rect(self):
+        """ Sets rect to the bounds of image_orig turned to angle, centred on pos. Only math, so it is
+        safe on the simulation thread; renderers rotate image_orig themselves (RenderQueue.blit_rotated). """
+        self.rect = pygame.Rect((0, 0), rotated_size(self.image_orig.get_size(), self.angle))
+        self.rect.center = self.pos
 
     def reset_position(self, current_star_system): # Takes current_star_system now
         if current_star_system:
@@ -5,52 +5,147 @@ import math
 import random
 from .. import settings
 from ..core import utils
+from .asteroids import AsteroidBelt, ROCK_SIZES
+
+# Belts draw from their own stream so adding them left planet generation untouched
+_BELT_SEED_SALT = 0x5EB3A17
+
+# Order matters: regions pick from this list with the system's RNG
+BIOME_COLORS = {
+    "Forest": settings.GREEN, "Desert": settings.YELLOW, "Ocean": settings.BLUE,
+    "Mountain": settings.GRAY, "Tundra": settings.WHITE, "Volcanic": settings.RED,
+    "Plains": (144, 238, 144), "Swamp": (85, 107, 47)
+}
+
+# Largest orbit that keeps planets well on screen (with the star at the centre)
+SCREEN_MAX_ORBIT = min(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2) - 40
+
+# The hand-placed galaxy: (name, galaxy_pos, star_color, num_planets)
+DEFAULT_STAR_SYSTEMS = (
+    ("Solara Prime", (150, 200), settings.YELLOW, 4),
+    ("Cygnus X-1", (600, 150), settings.BLUE, 2),
+    ("Kepler-186f System", (300, 500), settings.RED, 5),
+    ("Andromeda Gateway", (700, 450), settings.WHITE, 3),
+    ("Nebula Core", (450, 300), settings.PURPLE, 6),
+)
 
 class StarSystem:
-    def __init__(self, name, galaxy_pos, star_color, num_planets):
+    """A star system generated on first access from its own seed.
+
+    name, galaxy_pos and star_color are known up front (the galaxy map needs
+    nothing else); star, jump gate and planets are generated the first time
+    any of them is read. Each system draws from its own random.Random, so its
+    contents do not depend on the order in which systems are generated.
+    """
+
+    def __init__(self, name, galaxy_pos, star_color, num_planets, seed=None):
         self.name = name
         self.galaxy_pos = pygame.Vector2(galaxy_pos)
         self.star_color = star_color
+        self.num_planets = num_planets
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.is_generated = False
+        self._bounds = None
+
+    @property
+    def star_radius(self):
+        self._ensure_generated()
+        return self._star_radius
+
+    @property
+    def jump_gate_pos(self):
+        self._ensure_generated()
+        return self._jump_gate_pos
+
+    @property
+    def planets(self):
+        self._ensure_generated()
+        return self._planets
+
+    @property
+    def belts(self):
+        self._ensure_generated()
+        if self._belts is None: # Built on first use; the galaxy compiler never needs the rocks
+            self._build_belts(settings.ASTEROID_BELT_SIZE)
+        return self._belts
+
+    @property
+    def belt_slot(self):
+        self._ensure_generated()
+        return self._belt_slot
+
+    @property
+    def fits_screen(self):
+        """True if every orbit fits the window, as all systems did before they could scroll."""
+        return all(p['orbit_radius'] <= SCREEN_MAX_ORBIT for p in self.planets)
+
+    @property
+    def bounds(self):
+        """World rect the ship flies in (and wraps around at). The screen for systems that fit it; otherwise
+        a square around the star reaching STAR_SYSTEM_MARGIN past the outermost planet and the belt."""
+        if self._bounds is None:
+            screen = pygame.Rect(0, 0, settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT)
+            if self.fits_screen:
+                self._bounds = screen
+            else:
+                extent = max([p['orbit_radius'] + p['radius'] for p in self.planets] + [self.belt_slot[1]])
+                extent = int(extent) + settings.STAR_SYSTEM_MARGIN
+                rect = pygame.Rect(0, 0, extent * 2, extent * 2)
+                rect.center = screen.center
+                self._bounds = rect.union(screen) # The jump gate is always placed on the first screen
+        return self._bounds
+
+    def _ensure_generated(self):
+        if not self.is_generated:
+            self._generate(random.Random(self.seed))
+            self.is_generated = True
+
+    def _generate(self, rng):
         # MODIFIED: Star radius made smaller
-        self.star_radius = random.randint(30, 45) 
-        self.planets = []
+        self._star_radius = rng.randint(30, 45) 
+        self._planets = []
 
         attempts = 0
         max_attempts_gate = 500
         center_v = pygame.Vector2(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2)
         
         # Jump Gate Position
-        self.jump_gate_pos = pygame.Vector2(random.randint(100, settings.SCREEN_WIDTH - 100),
-                                            random.randint(100, settings.SCREEN_HEIGHT - 100))
+        self._jump_gate_pos = pygame.Vector2(rng.randint(100, settings.SCREEN_WIDTH - 100),
+                                            rng.randint(100, settings.SCREEN_HEIGHT - 100))
         
-        min_dist_from_star_for_gate = self.star_radius + 280 # Increased slightly due to potentially larger orbits
+        min_dist_from_star_for_gate = self._star_radius + 280 # Increased slightly due to potentially larger orbits
         
         gate_placement_attempts = 0
-        while self.jump_gate_pos.distance_to(center_v) < min_dist_from_star_for_gate and gate_placement_attempts < 100:
-            self.jump_gate_pos = pygame.Vector2(random.randint(100, settings.SCREEN_WIDTH - 100),
-                                              random.randint(100, settings.SCREEN_HEIGHT - 100))
+        while self._jump_gate_pos.distance_to(center_v) < min_dist_from_star_for_gate and gate_placement_attempts < 100:
+            self._jump_gate_pos = pygame.Vector2(rng.randint(100, settings.SCREEN_WIDTH - 100),
+                                              rng.randint(100, settings.SCREEN_HEIGHT - 100))
             gate_placement_attempts += 1
         if gate_placement_attempts >= 100:
-             print(f"  Warning: Could not place jump gate optimally for {name}. Using last position.")
+             print(f"  Warning: Could not place jump gate optimally for {self.name}. Using last position.")
 
 
-        used_radii = {self.star_radius} 
+        used_radii = {self._star_radius} 
         # MODIFIED: min_orbit increased for larger average orbital radius
-        min_orbit = self.star_radius + 90  # Was star_radius + 50
-        max_orbit = min(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2) - 40 # Slightly reduce max orbit to keep planets well on screen
-        
+        min_orbit = self._star_radius + 90  # Was star_radius + 50
         # MODIFIED: planet_separation increased
         planet_separation = 60 # Was 50 
+        # Orbits stay on screen (so existing seeds keep their layout) unless the system asks for more planets
+        # than STAR_SYSTEM_SCREEN_PLANETS; then it grows to hold them all, up to STAR_SYSTEM_MAX_ORBIT,
+        # and the star system view scrolls
+        max_orbit = SCREEN_MAX_ORBIT
+        if self.num_planets > settings.STAR_SYSTEM_SCREEN_PLANETS:
+            max_orbit = min(max(max_orbit, min_orbit + (self.num_planets + 1) * planet_separation),
+                            settings.STAR_SYSTEM_MAX_ORBIT)
 
         available_orbit_space = max_orbit - min_orbit
         max_possible_planets = max(0, int(available_orbit_space / planet_separation)) if planet_separation > 0 else 0
         
-        num_planets_to_create = min(num_planets, max_possible_planets)
-        if num_planets_to_create == 0 and max_possible_planets > 0 and num_planets > 0: 
+        num_planets_to_create = min(self.num_planets, max_possible_planets)
+        if num_planets_to_create == 0 and max_possible_planets > 0 and self.num_planets > 0: 
             num_planets_to_create = 1 
         elif max_possible_planets <= 0: # Use <= 0 to catch cases where available_orbit_space is negative
-            if num_planets > 0 : # Only print warning if planets were requested
-                print(f"  Warning: No possible orbit range for {name} (min_orbit: {min_orbit}, max_orbit: {max_orbit}). Skipping planets.")
+            if self.num_planets > 0 : # Only print warning if planets were requested
+                print(f"  Warning: No possible orbit range for {self.name} (min_orbit: {min_orbit}, max_orbit: {max_orbit}). Skipping planets.")
             num_planets_to_create = 0
         
         placed_planets = 0
@@ -63,16 +158,16 @@ class StarSystem:
         if max_possible_planets > 0 and num_planets_to_create > 0:
             for i in range(max_possible_planets):
                 potential_orbit_slots.append(min_orbit + i * planet_separation)
-        random.shuffle(potential_orbit_slots) # Shuffle to make placement less predictable
+        rng.shuffle(potential_orbit_slots) # Shuffle to make placement less predictable
 
         for i_planet in range(num_planets_to_create):
             if not potential_orbit_slots: # No more slots left
-                print(f"  Warning: Ran out of pre-calculated orbit slots for {name}. Placed {placed_planets}/{num_planets_to_create}.")
+                print(f"  Warning: Ran out of pre-calculated orbit slots for {self.name}. Placed {placed_planets}/{num_planets_to_create}.")
                 break
 
             # Use a slot and add some randomness to it
             base_orbit_r = potential_orbit_slots.pop(0)
-            orbit_r = base_orbit_r + random.randint(0, int(planet_separation * 0.6)) - int(planet_separation * 0.3)
+            orbit_r = base_orbit_r + rng.randint(0, int(planet_separation * 0.6)) - int(planet_separation * 0.3)
             orbit_r = max(min_orbit, min(orbit_r, max_orbit)) # Clamp to valid range
 
             # Ensure this randomized orbit_r doesn't clash *too* badly with already used_radii (less strict check now)
@@ -84,22 +179,22 @@ class StarSystem:
             
             if is_valid_enough and orbit_r not in used_radii : # Check direct collision too
                 used_radii.add(orbit_r)
-                planet_radius = random.randint(10, 25) # Planets can be slightly smaller on average too
-                start_angle = random.uniform(0, 360)
-                orbit_speed = random.uniform(0.008, 0.04) * random.choice([-1, 1]) # Slightly slower orbits
-                color = random.choice([settings.BLUE, settings.GREEN, settings.RED, settings.ORANGE, settings.BROWN, settings.GRAY, settings.PURPLE])
-                num_regions = random.randint(2, 5) # Fewer regions for smaller planets
-                rotation_angle = random.uniform(0, 360)
-                rotation_speed = random.uniform(0.05, 0.4) * random.choice([-1, 1])
-
-                self.planets.append({
+                planet_radius = rng.randint(10, 25) # Planets can be slightly smaller on average too
+                start_angle = rng.uniform(0, 360)
+                orbit_speed = rng.uniform(0.008, 0.04) * rng.choice([-1, 1]) # Slightly slower orbits
+                color = rng.choice([settings.BLUE, settings.GREEN, settings.RED, settings.ORANGE, settings.BROWN, settings.GRAY, settings.PURPLE])
+                num_regions = rng.randint(2, 5) # Fewer regions for smaller planets
+                rotation_angle = rng.uniform(0, 360)
+                rotation_speed = rng.uniform(0.05, 0.4) * rng.choice([-1, 1])
+
+                self._planets.append({
                     'radius': planet_radius,
                     'orbit_radius': orbit_r,
                     'angle': start_angle,
                     'speed': orbit_speed,
                     'color': color, 
                     'num_regions': num_regions,
-                    'regions': self._generate_regions(num_regions),
+                    'regions': self._generate_regions(num_regions, rng),
                     'rotation_angle': rotation_angle,
                     'rotation_speed': rotation_speed,
                 })
@@ -108,28 +203,63 @@ class StarSystem:
                 # Could not place this planet easily, try to re-add a generic slot if any left, or just skip
                 # This simplifies the complex loop structure from before
                 if potential_orbit_slots : potential_orbit_slots.append(base_orbit_r + planet_separation) # Try to add a new slot further out
-                print(f"  Note: Skipped placing a planet for {name} due to orbit conflict or invalid radius. Attempt {i_planet+1}.")
+                print(f"  Note: Skipped placing a planet for {self.name} due to orbit conflict or invalid radius. Attempt {i_planet+1}.")
 
 
         if placed_planets < num_planets_to_create:
-            print(f"  Warning: Only placed {placed_planets}/{num_planets_to_create} planets for {name} due to space/attempts.")
+            print(f"  Warning: Only placed {placed_planets}/{num_planets_to_create} planets for {self.name} due to space/attempts.")
         
         # Ensure planets are sorted by orbit_radius for consistent drawing or logic if needed later
-        self.planets.sort(key=lambda p: p['orbit_radius'])
+        self._planets.sort(key=lambda p: p['orbit_radius'])
 
+        self._belt_slot = self._pick_belt_slot(min_orbit, max_orbit, planet_separation)
+        self._belts = None
 
-    def _generate_regions(self, num_regions):
+    def _pick_belt_slot(self, min_orbit, max_orbit, planet_separation):
+        """(inner, outer) radius for the belt: a free ring between the star's glow, the planets' orbits
+        and max_orbit (so a system that fits the screen keeps its belt on screen), else just outside the outermost orbit."""
+        half_width = planet_separation * 0.3
+        clearance = max(ROCK_SIZES) + 4 # Rocks never graze a planet or the glow
+        # (orbit radius, body radius) from the star out, the star counting its glow (1.5 radii) and some dark
+        # sky beyond it; a gap is the free ring between two neighbours
+        bodies = [(0, self._star_radius * 2)] + [(p['orbit_radius'], p['radius']) for p in self._planets] + [(max_orbit, 0)]
+        gaps = []
+        for (r_in, size_in), (r_out, size_out) in zip(bodies, bodies[1:]):
+            inner, outer = r_in + size_in + clearance, r_out - size_out - clearance
+            if outer - inner > 0:
+                gaps.append((inner, outer))
+        roomy = [gap for gap in gaps if gap[1] - gap[0] >= 2 * half_width]
+        if roomy:
+            inner, outer = random.Random(self.seed ^ _BELT_SEED_SALT).choice(roomy)
+        elif gaps and max_orbit <= SCREEN_MAX_ORBIT:
+            inner, outer = max(gaps, key=lambda gap: gap[1] - gap[0]) # A thinner belt, but on screen
+        else:
+            outermost = max([p['orbit_radius'] for p in self._planets] + [max_orbit])
+            return (outermost + planet_separation - half_width, outermost + planet_separation + half_width)
+        middle, half_width = (inner + outer) / 2, min(half_width, (outer - inner) / 2)
+        return (middle - half_width, middle + half_width)
+
+    def rebuild_belts(self, count):
+        """(Re)creates the system's asteroid belt with count rocks (0 for none)."""
+        self._ensure_generated()
+        self._build_belts(count)
+
+    def _build_belts(self, count):
+        self._belts = []
+        if count > 0:
+            inner, outer = self._belt_slot
+            center = (settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2)
+            rng = random.Random((self.seed ^ _BELT_SEED_SALT) + count)
+            self._belts.append(AsteroidBelt(center, inner, outer, count, rng))
+
+
+    def _generate_regions(self, num_regions, rng):
         regions = []
         if num_regions <= 0: return regions
         
         angle_step = 360.0 / num_regions
         
-        biome_colors = {
-            "Forest": settings.GREEN, "Desert": settings.YELLOW, "Ocean": settings.BLUE,
-            "Mountain": settings.GRAY, "Tundra": settings.WHITE, "Volcanic": settings.RED,
-            "Plains": (144, 238, 144), "Swamp": (85, 107, 47)
-        }
-        available_biomes = list(biome_colors.keys())
+        available_biomes = list(BIOME_COLORS.keys())
         if not available_biomes: return regions
 
         last_biome_name = None
@@ -137,7 +267,7 @@ class StarSystem:
         for i in range(num_regions):
             start_angle = current_angle
             # Add some variation to region sizes
-            angle_slice = angle_step + random.uniform(-angle_step * 0.2, angle_step * 0.2)
+            angle_slice = angle_step + rng.uniform(-angle_step * 0.2, angle_step * 0.2)
             if i == num_regions -1 : # Ensure last region fills up to 360
                 end_angle = 360.0
             else:
@@ -145,15 +275,15 @@ class StarSystem:
             
             current_angle = end_angle # for next iteration
             
-            chosen_biome_name = random.choice(available_biomes)
+            chosen_biome_name = rng.choice(available_biomes)
             if len(available_biomes) > 1 and chosen_biome_name == last_biome_name:
                 temp_available = [b for b in available_biomes if b != last_biome_name]
                 if temp_available:
-                    chosen_biome_name = random.choice(temp_available)
+                    chosen_biome_name = rng.choice(temp_available)
             
             regions.append({
                 'name': chosen_biome_name,
-                'color': biome_colors[chosen_biome_name],
+                'color': BIOME_COLORS[chosen_biome_name],
                 'start_angle': start_angle % 360, # Ensure angles are wrapped
                 'end_angle': end_angle % 360 if end_angle % 360 != 0 else 360.0, # Handle 0/360 consistency
             })
@@ -190,6 +320,10 @@ class StarSystem:
             planet['angle'] = (planet['angle'] + planet['speed']) % 360
             planet['rotation_angle'] = (planet['rotation_angle'] + planet['rotation_speed']) % 360
 
+    def update_belts(self):
+        for belt in self.belts:
+            belt.update()
+
     def get_planet_position(self, planet_index):
         if 0 <= planet_index < len(self.planets):
             planet = self.planets[planet_index]
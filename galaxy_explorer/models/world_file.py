@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+import math
+import mmap
+import shutil
+import struct
+import tempfile
+import zlib
+from array import array
+from collections.abc import Sequence
+import pygame
+from .. import settings
+from .world import BIOME_COLORS, StarSystem
+
+# A pre-generated galaxy (see compile_world.py). Every table is an array of fixed-size
+# records, so any system is found by arithmetic and the file is read through mmap
+# without parsing: opening costs the same for ten systems or a million, and processes
+# reading the same file share its pages.
+# Layout (little-endian):
+#   header   magic, version, galaxy seed, system/planet/region counts, table offsets
+#   systems  name offset+length, galaxy pos, star color, star radius, seed,
+#            jump gate pos, first planet + count, requested planets, belt slot
+#   planets  radius, orbit radius, angle, speed, color, rotation angle/speed,
+#            first region + count
+#   regions  biome index (into BIOMES), start/end angle
+#   names    UTF-8 system names, referenced by offset
+#   grid     galaxy map split into GRID_CELL-pixel cells: per cell, the first of its
+#            entries (plus an end marker); entries are system index + galaxy pos,
+#            ordered by cell, so hover and click tests only read nearby cells
+#   map      the galaxy map with every system drawn on it, raw RGB
+MAGIC = b'GXWF'
+VERSION = 2
+_HEADER = struct.Struct('<4sHQ3I4Q3H2Q2HQ')
+_SYSTEM = struct.Struct('<IH2f3BBI2hIBB2f')
+_PLANET = struct.Struct('<Bhff3BffIB')
+_REGION = struct.Struct('<Bff')
+_GRID_ENTRY = struct.Struct('<I2f')
+GRID_CELL = 16
+MAP_DOT_RADIUS = 8 # Radius every system is drawn at on the galaxy map
+
+BIOMES = tuple(BIOME_COLORS)
+
+class WorldFileError(Exception):
+    pass
+
+def draw_map_dot(surface, system):
+    """A system as the galaxy map shows it when it is neither hovered nor selected."""
+    pygame.draw.circle(surface, tuple(system.star_color), (int(system.galaxy_pos.x), int(system.galaxy_pos.y)),
+                       MAP_DOT_RADIUS)
+
+def write_world(path, systems, seed=0):
+    """Writes StarSystems (any iterable; each is generated, packed, then dropped) to path.
+
+    Returns (system count, planet count, region count, file size in bytes).
+    """
+    counts = [0, 0, 0] # systems, planets, regions
+    map_size = (settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT)
+    grid_cols, grid_rows = -(-map_size[0] // GRID_CELL), -(-map_size[1] // GRID_CELL)
+    galaxy_map = pygame.Surface(map_size)
+    system_cells = array('I')
+    xs, ys = array('f'), array('f')
+    with tempfile.TemporaryFile() as system_table, tempfile.TemporaryFile() as planet_table, \
+         tempfile.TemporaryFile() as region_table, tempfile.TemporaryFile() as names:
+        name_offset = 0
+        for system in systems:
+            name = system.name.encode('utf-8')
+            planets = system.planets
+            belt_inner, belt_outer = system.belt_slot
+            system_table.write(_SYSTEM.pack(
+                name_offset, len(name), system.galaxy_pos.x, system.galaxy_pos.y, *system.star_color,
+                system.star_radius, system.seed, int(system.jump_gate_pos.x), int(system.jump_gate_pos.y),
+                counts[1], len(planets), system.num_planets, belt_inner, belt_outer))
+            names.write(name)
+            name_offset += len(name)
+            x, y = system.galaxy_pos
+            col = min(max(int(x) // GRID_CELL, 0), grid_cols - 1)
+            row = min(max(int(y) // GRID_CELL, 0), grid_rows - 1)
+            system_cells.append(row * grid_cols + col)
+            xs.append(x)
+            ys.append(y)
+            draw_map_dot(galaxy_map, system)
+            for planet in planets:
+                regions = planet['regions']
+                planet_table.write(_PLANET.pack(
+                    planet['radius'], planet['orbit_radius'], planet['angle'], planet['speed'], *planet['color'],
+                    planet['rotation_angle'], planet['rotation_speed'], counts[2], len(regions)))
+                for region in regions:
+                    region_table.write(_REGION.pack(BIOMES.index(region['name']),
+                                                    region['start_angle'], region['end_angle']))
+                counts[2] += len(regions)
+            counts[1] += len(planets)
+            counts[0] += 1
+
+        # Counting sort of the systems by cell
+        cell_starts = array('I', bytes(4 * (grid_cols * grid_rows + 1)))
+        for cell in system_cells:
+            cell_starts[cell + 1] += 1
+        for cell in range(grid_cols * grid_rows):
+            cell_starts[cell + 1] += cell_starts[cell]
+        slots = array('I', cell_starts)
+        entries = bytearray(_GRID_ENTRY.size * counts[0])
+        for idx, cell in enumerate(system_cells):
+            _GRID_ENTRY.pack_into(entries, slots[cell] * _GRID_ENTRY.size, idx, xs[idx], ys[idx])
+            slots[cell] += 1
+        map_pixels = pygame.image.tobytes(galaxy_map, 'RGB')
+
+        offsets = []
+        position = _HEADER.size
+        for table in (system_table, planet_table, region_table, names):
+            offsets.append(position)
+            position += table.tell()
+        grid_at = position
+        entries_at = grid_at + len(cell_starts) * cell_starts.itemsize
+        map_at = entries_at + len(entries)
+        position = map_at + len(map_pixels)
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, seed, *counts, *offsets, GRID_CELL, grid_cols, grid_rows,
+                                 grid_at, entries_at, *map_size, map_at))
+            for table in (system_table, planet_table, region_table, names):
+                table.seek(0)
+                shutil.copyfileobj(table, f)
+            f.write(struct.pack(f'<{len(cell_starts)}I', *cell_starts))
+            f.write(entries)
+            f.write(map_pixels)
+    return counts[0], counts[1], counts[2], position
+
+class WorldFile:
+    """Read-only, memory-mapped view of a compiled galaxy. Records are decoded only when asked for."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError: # Empty file
+                raise WorldFileError(f"{path} is empty")
+        try:
+            (magic, version, self.seed, self.system_count, self.planet_count, self.region_count,
+             self._systems_at, self._planets_at, self._regions_at, self._names_at,
+             self.grid_cell, self._grid_cols, self._grid_rows, self._grid_at, self._entries_at,
+             map_width, map_height, self._map_image_at) = _HEADER.unpack_from(self._map, 0)
+            self.map_size = (map_width, map_height)
+        except struct.error as e:
+            raise WorldFileError(f"truncated world file: {e}")
+        # Seed, counts and table offsets: enough to tell compiled galaxies apart (saves record it;
+        # 0 is kept for the built-in galaxy)
+        self.identity = zlib.crc32(self._map[:_HEADER.size]) or 1
+        if magic != MAGIC:
+            raise WorldFileError(f"{path} is not a Galaxy Explorer world file")
+        if version != VERSION:
+            raise WorldFileError(f"unsupported world file version {version}")
+        if (self._systems_at + self.system_count * _SYSTEM.size > self._planets_at or
+                self._planets_at + self.planet_count * _PLANET.size > self._regions_at or
+                self._regions_at + self.region_count * _REGION.size > self._names_at or
+                self._names_at > self._grid_at or
+                self._grid_at + (self._grid_cols * self._grid_rows + 1) * 4 > self._entries_at or
+                self._entries_at + self.system_count * _GRID_ENTRY.size > self._map_image_at or
+                self._map_image_at + map_width * map_height * 3 > len(self._map)):
+            raise WorldFileError(f"{path} is truncated or its tables overlap")
+
+    def __len__(self):
+        return self.system_count
+
+    def system_record(self, idx):
+        return _SYSTEM.unpack_from(self._map, self._systems_at + idx * _SYSTEM.size)
+
+    def name(self, name_offset, name_len):
+        start = self._names_at + name_offset
+        return self._map[start:start + name_len].decode('utf-8')
+
+    def planets(self, first, count):
+        planets = []
+        for i in range(first, first + count):
+            (radius, orbit_radius, angle, speed, r, g, b, rotation_angle, rotation_speed,
+             first_region, region_count) = _PLANET.unpack_from(self._map, self._planets_at + i * _PLANET.size)
+            planets.append({
+                'radius': radius,
+                'orbit_radius': orbit_radius,
+                'angle': angle,
+                'speed': speed,
+                'color': (r, g, b),
+                'num_regions': region_count,
+                'regions': self.regions(first_region, region_count),
+                'rotation_angle': rotation_angle,
+                'rotation_speed': rotation_speed,
+            })
+        return planets
+
+    def systems_near(self, pos, radius):
+        """Indices, ascending, of systems whose galaxy pos is closer than radius to pos; reads only nearby cells."""
+        px, py = pos
+        cell = self.grid_cell
+        cols, rows = self._grid_cols, self._grid_rows
+        found = []
+        for row in range(max(int(py - radius) // cell, 0), min(int(py + radius) // cell, rows - 1) + 1):
+            first_cell = row * cols + max(int(px - radius) // cell, 0)
+            last_cell = row * cols + min(int(px + radius) // cell, cols - 1)
+            if last_cell < first_cell:
+                continue
+            # A row's cells are contiguous in the grid table, and so are their entries
+            start, = struct.unpack_from('<I', self._map, self._grid_at + first_cell * 4)
+            end, = struct.unpack_from('<I', self._map, self._grid_at + (last_cell + 1) * 4)
+            entries = self._map[self._entries_at + start * _GRID_ENTRY.size:self._entries_at + end * _GRID_ENTRY.size]
+            for idx, x, y in _GRID_ENTRY.iter_unpack(entries):
+                if math.hypot(x - px, y - py) < radius:
+                    found.append(idx)
+        found.sort()
+        return found
+
+    def map_image(self):
+        """The galaxy map with every system on it, as a new Surface."""
+        start = self._map_image_at
+        return pygame.image.frombytes(self._map[start:start + self.map_size[0] * self.map_size[1] * 3],
+                                      self.map_size, 'RGB')
+
+    def regions(self, first, count):
+        regions = []
+        for i in range(first, first + count):
+            biome, start_angle, end_angle = _REGION.unpack_from(self._map, self._regions_at + i * _REGION.size)
+            name = BIOMES[biome]
+            regions.append({'name': name, 'color': BIOME_COLORS[name],
+                            'start_angle': start_angle, 'end_angle': end_angle})
+        return regions
+
+    def close(self):
+        self._map.close()
+
+class MappedStarSystem(StarSystem):
+    """A StarSystem whose contents come from a WorldFile record instead of being generated."""
+
+    def __init__(self, world, idx):
+        record = world.system_record(idx)
+        (name_offset, name_len, gx, gy, r, g, b, self._record_star_radius, seed, gate_x, gate_y,
+         self._first_planet, self._planet_count, num_planets, belt_inner, belt_outer) = record
+        super().__init__(world.name(name_offset, name_len), (gx, gy), (r, g, b), num_planets, seed=seed)
+        self._world = world
+        self._record_gate = (gate_x, gate_y)
+        self._record_belt_slot = (belt_inner, belt_outer)
+
+    def _generate(self, rng):
+        self._star_radius = self._record_star_radius
+        self._jump_gate_pos = pygame.Vector2(self._record_gate)
+        self._planets = self._world.planets(self._first_planet, self._planet_count)
+        self._belt_slot = self._record_belt_slot
+        self._belts = None
+
+def identity(path):
+    """WorldFile.identity of the galaxy Game would play with path (or settings.WORLD_FILE when None),
+    0 for the built-in one, which is also what Game falls back to when the file can't be used."""
+    path = settings.WORLD_FILE if path is None else path
+    if not path:
+        return 0
+    try:
+        world = WorldFile(path)
+    except (OSError, WorldFileError):
+        return 0
+    return world.identity if len(world) else 0
+
+class MappedGalaxy(Sequence):
+    """Drop-in for the game's star_systems list, backed by a WorldFile.
+
+    A system is decoded the first time it is indexed and then kept, since it
+    carries live state (orbit angles).
+    """
+
+    def __init__(self, world):
+        self.world = world
+        self._systems = {}
+
+    def __len__(self):
+        return len(self.world)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("star system index out of range")
+        system = self._systems.get(idx)
+        if system is None:
+            system = self._systems[idx] = MappedStarSystem(self.world, idx)
+        return system
+
+    def systems_near(self, pos, radius):
+        return self.world.systems_near(pos, radius)
+
+    def map_image(self):
+        return self.world.map_image()
+
+    def generated_items(self):
+        """(index, system) for systems whose contents have been read; never touches other records."""
+        return sorted(((i, s) for i, s in self._systems.items() if s.is_generated), key=lambda item: item[0])
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# State sync over loopback: a headless server Game runs the benchmark scenarios and
+# publishes every tick to in-process SyncClients through real UDP sockets.
+#   python -m galaxy_explorer.netbench --frames 300 --clients 2 --loss 0.05 --reorder 0.05
+import os
+# Must be set before pygame initializes its display/audio subsystems
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import contextlib
+import json
+import random
+import sys
+import time
+import pygame
+
+from . import settings
+from .bench import DEFAULT_SEED, SCENARIOS
+from .core import netsync, texture_jobs
+from .main import Game
+
+class ImpairedLink:
+    """Stands in for sendto: drops packets with probability loss, and holds some back one packet (reorder)."""
+
+    def __init__(self, sock, loss, reorder, seed):
+        self.sock = sock
+        self.loss = loss
+        self.reorder = reorder
+        self.rng = random.Random(seed) # Separate from the game's RNG
+        self._held = {}
+        self.dropped = self.reordered = 0
+
+    def send(self, packet, addr):
+        if self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        held = self._held.pop(addr, None)
+        if held is None and self.rng.random() < self.reorder:
+            self._held[addr] = packet
+            self.reordered += 1
+            return
+        self.sock.sendto(packet, addr)
+        if held is not None:
+            self.sock.sendto(held, addr) # Arrives after a newer packet: the client must drop it
+
+def run(frames, clients, loss, reorder, seed, fps):
+    game = Game(seed=seed)
+    server = netsync.SyncServer(('127.0.0.1', 0))
+    endpoints = [netsync.SyncClient(server.address) for _ in range(clients)]
+    link = ImpairedLink(server.socket, loss, reorder, seed)
+    game.net_server = server
+    server.publish = lambda g, send=link.send, publish=server.publish: publish(g, send)
+
+    dt = 1.0 / fps
+    max_error = 0.0
+    for view_name, enter, script in SCENARIOS:
+        print(f"Syncing {view_name} for {frames} frames...")
+        random.seed(seed)
+        enter(game)
+        for frame in range(frames):
+            t_frame = time.perf_counter()
+            game.sync_simulation()
+            if type(game.current_view).__name__ != view_name:
+                enter(game)
+            events, mouse_pos, keys = script(game, frame)
+            published_pos = pygame.Vector2(game.game_context['player_ship'].pos) # What run_frame publishes
+            game.run_frame(dt, events, mouse_pos, keys)
+            for client in endpoints:
+                client.poll()
+                if client.ship and client.last_sequence == (server.sequence - 1) & 0xFFFFFFFF:
+                    # Replica straight off the wire vs. the state it was encoded from
+                    max_error = max(max_error, abs(client.ship[0] - published_pos.x), abs(client.ship[1] - published_pos.y))
+            time.sleep(max(0.0, dt - (time.perf_counter() - t_frame)))
+
+    results = {
+        'meta': {'frames_per_view': frames, 'clients': clients, 'loss': loss, 'reorder': reorder,
+                 'seed': seed, 'fps': fps, 'interp_delay_ms': settings.NET_INTERP_DELAY_MS},
+        'server': server.report(),
+        'link': {'dropped': link.dropped, 'reordered': link.reordered},
+        'clients': [client.report() for client in endpoints],
+        'max_position_error_px': round(max_error, 4),
+    }
+    for client in endpoints:
+        client.close()
+    server.close()
+    texture_jobs.shutdown()
+    pygame.quit()
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Loopback state sync benchmark (bandwidth, latency, loss).")
+    parser.add_argument('--frames', type=int, default=120, help="frames to run per view")
+    parser.add_argument('--clients', type=int, default=2)
+    parser.add_argument('--loss', type=float, default=0.0, help="fraction of packets dropped")
+    parser.add_argument('--reorder', type=float, default=0.0, help="fraction of packets delivered late")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--fps', type=int, default=settings.FPS, help="tick rate to pace the server at")
+    parser.add_argument('--output', help="write results JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    # Game progress messages go to stderr so stdout stays valid JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        results = run(args.frames, args.clients, args.loss, args.reorder, args.seed, args.fps)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
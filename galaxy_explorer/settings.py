@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # Use utf-8 encoding for broader compatibility
 
+import os
 import pygame
 
 # ------------------------------------------------------------
@@ -35,4 +36,114 @@ HYPERSPACE_TRANSITION = "HYPERSPACE_TRANSITION"
 # Game specific constants
 HYPERSPACE_DURATION = 90 # frames
 PLANET_OVERHEAD_SCALE = 5
-NUM_TWINKLE_STARS = 180
\ No newline at end of file
+PLANET_TEXTURE_LEVELS = (0.25, 0.5, 1.0) # Overhead texture is built in the background at these fractions of full resolution
+# Overhead textures for planets the ship is heading towards are built before it lands
+PREFETCH_RANGE = 260 # Pixels; planets farther away are never prefetched
+PREFETCH_MIN_SCORE = 0.3 # 0..1, closeness times heading
+PREFETCH_CANDIDATES = 2
+PREFETCH_MAX_IN_FLIGHT = 1
+PREFETCH_MEMORY_MB = 4 # Estimated size of the mip chains being prefetched at once; finished ones go to the asset cache
+NUM_TWINKLE_STARS = 180
+
+# Hyperspace streak effect
+HYPERSPACE_STREAK_COUNT = 2000 # Persistent streaks kept by the effect
+HYPERSPACE_STREAK_BUDGET_MS = 4.0 # Max time per frame spent drawing streaks
+WARMUP_BUDGET_MS = 4.0 # Per-frame time spent warming the target system during hyperspace
+
+# Idle views (see BaseView.is_idle): the loop sleeps until input instead of redrawing an unchanged screen
+IDLE_WAIT = True
+IDLE_WAIT_TIMEOUT_MS = 250 # Longest single sleep; autosave and view idleness are rechecked in between
+
+# Dirty-rectangle presentation (opt-in): only changed regions are pushed to the display
+DIRTY_RECT_MODE = False
+DIRTY_RECT_FULL_REDRAW_RATIO = 0.5 # Fall back to a full flip above this fraction of the screen
+
+# Frame profiler (toggle at runtime with PROFILER_TOGGLE_KEY)
+FRAME_PROFILER_ENABLED = False
+FRAME_PROFILER_CAPACITY = 3600 # Frames kept in the ring buffer (1 minute at 60 FPS)
+FRAME_PROFILER_OVERLAY_WINDOW = 240 # Frames covered by the overlay percentiles and graph
+FRAME_PROFILER_DUMP_PATH = None # e.g. "frame_profile.csv" or ".json"; written on exit
+PROFILER_TOGGLE_KEY = pygame.K_F3
+
+# View pool: one instance per state (and per system/planet/region where relevant)
+VIEW_POOL_MAX_VIEWS = 16
+VIEW_POOL_MEMORY_CAP_MB = 64 # Least recently used views are evicted above this
+
+# Adaptive quality: detail parameters per level, lowest first
+QUALITY_LEVELS = (
+    {'name': 'low',    'light_step': 12, 'star_glow_step': 6, 'twinkle_stars': 60,
+     'hyperspace_streaks': 300,  'thrust_particles': 1, 'strafe_particles': 0, 'mask_step_deg': 12},
+    {'name': 'medium', 'light_step': 8,  'star_glow_step': 4, 'twinkle_stars': 120,
+     'hyperspace_streaks': 900,  'thrust_particles': 2, 'strafe_particles': 1, 'mask_step_deg': 8},
+    {'name': 'high',   'light_step': 4,  'star_glow_step': 2, 'twinkle_stars': NUM_TWINKLE_STARS,
+     'hyperspace_streaks': HYPERSPACE_STREAK_COUNT, 'thrust_particles': 2, 'strafe_particles': 1, 'mask_step_deg': 4},
+)
+QUALITY_START_LEVEL = len(QUALITY_LEVELS) - 1
+ADAPTIVE_QUALITY = True
+QUALITY_WINDOW_FRAMES = 60 # Frames per evaluation window
+QUALITY_DOWN_THRESHOLD = 0.9 # Step down when p90 frame work exceeds this fraction of the frame budget
+QUALITY_UP_THRESHOLD = 0.6 # Step up only when p90 stays below this fraction...
+QUALITY_UP_WINDOWS = 3 # ...for this many consecutive windows
+
+# --- Threaded simulation ---
+# Runs handle_event/update of views that support it (StarSystemView, GroundView) on a
+# simulation thread while the main thread renders the previous update's snapshot.
+# Event polling, rendering and all pygame calls stay on the main thread (the ship's image is
+# turned at render time, the update only moves its angle and rect).
+# Off: under the GIL the update's time reappears as contention in render rather than
+# overlapping it. bench --threaded measures StarSystemView and GroundView at parity with
+# the serial loop (3.35 vs 3.38 ms and 0.89 vs 0.88 ms p50), not faster.
+THREADED_SIMULATION = False
+
+# --- Asset manager ---
+ASSET_MEMORY_BUDGET_MB = 32 # Cached generated/loaded surfaces (text, sprites, glows, light maps)
+ASSET_IMAGE_DIR = os.path.join(os.path.dirname(__file__), 'assets', 'images')
+# None = pygame's bundled default font (no system font scan); a .ttf path; or a system font name,
+# whose lookup is remembered in FONT_CACHE_PATH
+FONT_FACE = None
+FONT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.galaxy_explorer', 'fonts.json')
+
+# --- Render resolution ---
+# Views lay out in SCREEN_WIDTH x SCREEN_HEIGHT (logical) coordinates whatever the window size.
+# RENDER_SCALE is the resolution frames are drawn at, as a fraction of the window: below 1.0
+# views draw into a smaller surface (core.canvas maps their coordinates onto it) that is scaled
+# up to the window on present, trading sharpness for fill rate. 0.5 pays off most: pygame
+# upscales by exactly 2x several times faster than by other ratios, which at 0.75 can cost
+# more than the smaller frame saves.
+WINDOW_SIZE = None # (width, height) in pixels; None = SCREEN_WIDTH x SCREEN_HEIGHT. Other aspect ratios get black bars
+RENDER_SCALE = 1.0
+# smoothscale (bilinear) instead of nearest-neighbour on present; it costs about as much as a
+# half-resolution frame saves, so it is off
+RENDER_SCALE_SMOOTH = False
+
+# --- World ---
+WORLD_FILE = None # A galaxy compiled with compile_world.py; None = the built-in galaxy (or pass --world)
+# Systems with more planets than fit on screen grow past it, and the star system view scrolls
+STAR_SYSTEM_SCREEN_PLANETS = 6 # Up to this many, orbits are kept on screen (as they always were)
+STAR_SYSTEM_MAX_ORBIT = 2400 # Outermost planet orbit radius a system can grow to
+STAR_SYSTEM_MARGIN = 250 # Space past the outermost orbit (or belt) before the ship wraps around
+
+# --- Save / resume ---
+SAVE_PATH = os.path.join(os.path.expanduser('~'), '.galaxy_explorer', 'save.gxs')
+AUTOSAVE_INTERVAL_S = 30.0
+
+# --- State sync (--serve / --connect) ---
+NET_KEYFRAME_INTERVAL = 30 # Ticks between packets that carry every field
+NET_REDUNDANT_TICKS = 3 # A changed field is repeated in this many packets, riding out short bursts of loss
+NET_INTERP_DELAY_MS = 50 # Spectators render this far behind the newest tick, to interpolate
+NET_REPORT_TICKS = 3600 # Per-tick report rows kept
+
+# --- Memory instrumentation ---
+MEMORY_TRACKING = False # Or pass --memory-report PATH
+MEMORY_REPORT_PATH = "memory_report.txt"
+MEMORY_SNAPSHOT_INTERVAL_FRAMES = 600
+MEMORY_TRACE_FRAMES = 8 # Stack depth recorded per allocation
+MEMORY_REPORT_TOP_N = 15
+
+# --- Asteroid belts ---
+ASTEROID_BELT_SIZE = 2000 # Rocks per system belt (0 disables belts)
+ASTEROID_HASH_CELL = 32 # Spatial hash cell size in pixels
+ASTEROID_HASH_REBUILD_FRAMES = 8 # Queries are padded by the drift since the last rebuild
+ASTEROID_TARGET_RANGE = 160
+SHIP_COLLISION_RADIUS = 10
+ASTEROID_BOUNCE = 0.5 # Fraction of speed kept when bouncing off a rock
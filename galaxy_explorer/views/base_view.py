@@ -1,9 +1,21 @@
 # -*- coding: utf-8 -*-
 import pygame
+from ..core.render_queue import RenderQueue
 
 class BaseView:
+    # Views that report their changed regions set this to True (see DIRTY_RECT_MODE)
+    supports_dirty_rects = False
+    # Views whose handle_event/update may run on the simulation thread set this to True
+    # and render only from make_snapshot() data (see THREADED_SIMULATION)
+    supports_threaded_update = False
+
     def __init__(self):
         self.next_state_request = None  # Tuple: (STATE_NAME_CONSTANT, params_dict)
+        self._dirty_rects = []
+        self._prev_moving_rects = []
+        self._full_redraw = True # First frame of a view is always presented in full
+        self.snapshot_buffer = None # Set by Game while update runs on the simulation thread
+        self.render_queue = RenderQueue() # render() queues its drawing here and flushes it at the end
 
     def handle_event(self, event, mouse_pos, keys_pressed):
         """Handles a single Pygame event."""
@@ -14,13 +26,75 @@ class BaseView:
         pass
 
     def render(self, screen, mouse_pos, frame_count): # MODIFIED: Added mouse_pos
-        """Renders the view to the screen."""
+        """Renders the view to the screen, a core.canvas.Canvas in logical coordinates."""
         pass
-    
+
+    def is_idle(self):
+        """True while the screen only changes in response to input. Once an idle frame is presented,
+        Game stops updating and rendering until an event arrives (see IDLE_WAIT)."""
+        return False
+
     def on_enter(self, params=None):
         """Called when this view becomes active. Params are from the transition."""
         pass
 
     def on_exit(self):
         """Called when this view is being exited."""
-        pass
\ No newline at end of file
+        pass
+
+    # --- Pooling (see ViewRegistry) ---
+    def suspend(self):
+        """Called after on_exit when the view is parked in the pool. Caches stay alive."""
+        pass
+
+    def resume(self):
+        """Called before on_enter when a pooled view is reused."""
+        self._dirty_rects = []
+        self._prev_moving_rects = []
+        self.mark_full_redraw()
+
+    def cache_bytes(self):
+        """Estimated memory held by the view's caches; used for the pool memory cap."""
+        return 0
+
+    def release_caches(self):
+        """Drops cached data before the pool evicts this view."""
+        pass
+
+    # --- Render snapshots (see core/sim_thread.py) ---
+    def make_snapshot(self):
+        """Immutable copy of the state render() needs, taken right after update()."""
+        return None
+
+    def current_snapshot(self):
+        """Snapshot to render from: the last published one in threaded mode, otherwise taken now."""
+        if self.snapshot_buffer is not None:
+            snapshot = self.snapshot_buffer.front(self)
+            if snapshot is not None:
+                return snapshot
+        return self.make_snapshot()
+
+    # --- Dirty-rectangle reporting ---
+    def mark_dirty(self, rect):
+        """Reports a screen region that changed this frame."""
+        self._dirty_rects.append(pygame.Rect(rect))
+
+    def mark_moving(self, rects):
+        """Reports regions of moving elements; last frame's regions are marked too so they get erased."""
+        rects = [pygame.Rect(r) for r in rects]
+        self._dirty_rects.extend(self._prev_moving_rects)
+        self._dirty_rects.extend(rects)
+        self._prev_moving_rects = rects
+
+    def mark_full_redraw(self):
+        """Requests that the next frame is presented in full."""
+        self._full_redraw = True
+
+    def consume_dirty_rects(self):
+        """Returns the regions changed since the last call, or None if the whole screen must be presented."""
+        rects = self._dirty_rects
+        self._dirty_rects = []
+        if self._full_redraw or not self.supports_dirty_rects:
+            self._full_redraw = False
+            return None
+        return rects
@@ -3,64 +3,116 @@
 import pygame
 from .base_view import BaseView
 from .. import settings
-from ..core import utils
+from ..core import assets, render_queue, utils
+from ..models import world_file
+
+HOVER_RADIUS = 15
 
 class GalaxyView(BaseView):
+    supports_dirty_rects = True
+
     def __init__(self, game_context):
         super().__init__()
         self.game_context = game_context
         self.star_systems_data = game_context['star_systems']
         self.galaxy_zoom_target = None
+        self._map = None
+        self._map_key = None
+
+    def on_enter(self, params=None):
+        # A pooled instance may still hold the target of the last jump
+        self.galaxy_zoom_target = None
 
     def handle_event(self, event, mouse_pos, keys_pressed):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1: # Left click
-            for i, system_data in enumerate(self.star_systems_data):
-                if self.galaxy_zoom_target is None and \
-                   system_data.galaxy_pos.distance_to(pygame.Vector2(mouse_pos)) < 15:
-                    
-                    if i == self.game_context['current_star_system_idx']:
-                        # MODIFIED: Pass 'from_galaxy_map_entry' instead of 'reset_ship'
-                        # This ensures the ship is positioned at the jump gate.
-                        self.next_state_request = (settings.STAR_SYSTEM_VIEW, 
-                                                   {'system_idx': i, 'from_galaxy_map_entry': True})
-                    else:
-                        # This path goes through HyperspaceView, which correctly sets 'from_hyperspace: True'
-                        self.galaxy_zoom_target = i
-                        self.next_state_request = (settings.HYPERSPACE_TRANSITION, {'target_system_idx': i})
-                    break
+            clicked = self._systems_near(mouse_pos, HOVER_RADIUS) if self.galaxy_zoom_target is None else ()
+            if clicked:
+                i = clicked[0]
+                if i == self.game_context['current_star_system_idx']:
+                    # MODIFIED: Pass 'from_galaxy_map_entry' instead of 'reset_ship'
+                    # This ensures the ship is positioned at the jump gate.
+                    self.next_state_request = (settings.STAR_SYSTEM_VIEW, 
+                                               {'system_idx': i, 'from_galaxy_map_entry': True})
+                else:
+                    # This path goes through HyperspaceView, which correctly sets 'from_hyperspace: True'
+                    self.galaxy_zoom_target = i
+                    self.next_state_request = (settings.HYPERSPACE_TRANSITION, {'target_system_idx': i})
+
+    def _systems_near(self, pos, radius):
+        """Indices, ascending, of systems within radius of a map position."""
+        systems = self.star_systems_data
+        if hasattr(systems, 'systems_near'): # World file: grid lookup instead of decoding every record
+            return systems.systems_near(pos, radius)
+        pos = pygame.Vector2(pos)
+        return [i for i, system in enumerate(systems) if system.galaxy_pos.distance_to(pos) < radius]
+
+    def _get_map(self):
+        """Every system's idle dot, drawn once: baked into a world file, or baked here for the built-in galaxy."""
+        systems = self.star_systems_data
+        key = (id(systems), len(systems))
+        if key != self._map_key or self._map is None:
+            if hasattr(systems, 'map_image'):
+                galaxy_map = systems.map_image()
+            else:
+                galaxy_map = pygame.Surface((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
+                for system in systems:
+                    world_file.draw_map_dot(galaxy_map, system)
+            self._map = assets.to_display_format(galaxy_map, alpha=False)
+            self._map_key = key
+        return self._map
+
+    def cache_bytes(self):
+        return utils.surface_bytes(self._map)
+
+    def release_caches(self):
+        self._map = None
+        self._map_key = None
 
     def update(self, dt, mouse_pos, keys_pressed, frame_count):
         pass
 
+    def is_idle(self):
+        # Nothing animates on the map; hover highlights follow mouse events
+        return self.galaxy_zoom_target is None and self.next_state_request is None
+
     def render(self, screen, mouse_pos, frame_count): # MODIFIED: Signature matches BaseView
-        screen.fill(settings.BLACK)
-        utils.draw_text("GALAXY MAP", "main", settings.WHITE, screen, 10, 10)
+        queue = self.render_queue
+        galaxy_map = self._get_map()
+        if galaxy_map.get_size() != screen.get_size():
+            queue.draw(lambda surface: surface.fill(settings.BLACK), render_queue.LAYER_BACKGROUND)
+        queue.blit(galaxy_map, (0, 0), render_queue.LAYER_BACKGROUND)
+        queue.text("GALAXY MAP", "main", settings.WHITE, (10, 10))
         
-        mouse_pos_vec = pygame.Vector2(mouse_pos) # mouse_pos is now correctly passed
-        mouse_on_system_idx = -1
-
-        for i, system_data in enumerate(self.star_systems_data):
-            color = system_data.star_color
-            radius = 8
-            is_current = (i == self.game_context['current_star_system_idx'])
-            is_hover = False
-
-            if self.galaxy_zoom_target is None and system_data.galaxy_pos.distance_to(mouse_pos_vec) < 15:
-                radius = 14
-                mouse_on_system_idx = i
-                is_hover = True
-            
-            if is_current:
-                pygame.draw.circle(screen, settings.GREEN, system_data.galaxy_pos, radius + 6, 3)
-            
-            pygame.draw.circle(screen, color, system_data.galaxy_pos, radius)
-            
-            if is_hover:
-                pygame.draw.circle(screen, settings.WHITE, system_data.galaxy_pos, radius // 2)
+        # Only the current system and those under the cursor differ from the baked map
+        hovered = self._systems_near(mouse_pos, HOVER_RADIUS) if self.galaxy_zoom_target is None else []
+        mouse_on_system_idx = hovered[-1] if hovered else -1
+        moving_rects = []
+        dots = [] # (center, radius, color), batched into one blits call
+
+        current_idx = self.game_context['current_star_system_idx']
+        current_system = self.game_context['current_star_system']
+        ring_pos = pygame.Vector2(current_system.galaxy_pos)
+        ring_radius = (14 if current_idx in hovered else world_file.MAP_DOT_RADIUS) + 6
+        queue.draw(lambda surface: surface.draw_circle(settings.GREEN, ring_pos, ring_radius, 3),
+                   render_queue.LAYER_BACKGROUND)
+
+        for i in hovered:
+            system_data = self.star_systems_data[i]
+            moving_rects.append(pygame.Rect(0, 0, 44, 44).move(system_data.galaxy_pos.x - 22,
+                                                               system_data.galaxy_pos.y - 22))
+            dots.append((system_data.galaxy_pos, 14, tuple(system_data.star_color)))
+            dots.append((system_data.galaxy_pos, 7, settings.WHITE))
+        queue.blits(render_queue.dot_blits(dots))
 
         if mouse_on_system_idx != -1:
             system_name = self.star_systems_data[mouse_on_system_idx].name
-            utils.draw_text(system_name, "small", settings.WHITE, screen, mouse_pos[0] + 15, mouse_pos[1])
+            queue.text(system_name, "small", settings.WHITE, (mouse_pos[0] + 15, mouse_pos[1]))
+            label_surf = utils.render_text(system_name, "small", settings.WHITE)
+            if label_surf:
+                moving_rects.append(label_surf.get_rect(topleft=(mouse_pos[0] + 15, mouse_pos[1])))
         
         current_system_name = self.game_context['current_star_system'].name
-        utils.draw_text(f"Current: {current_system_name}", "main", settings.GREEN, screen, 10, settings.SCREEN_HEIGHT - 40)
\ No newline at end of file
+        queue.text(f"Current: {current_system_name}", "main", settings.GREEN, (10, settings.SCREEN_HEIGHT - 40))
+        queue.flush(screen)
+
+        self.mark_moving(moving_rects)
\ No newline at end of file
@@ -1,12 +1,18 @@
 # -*- coding: utf-8 -*-
+from collections import namedtuple
 import pygame
 import random
 import math
 from .base_view import BaseView
 from .. import settings
-from ..core import utils
+from ..core import render_queue, utils
+
+# Everything render() reads that update() changes
+GroundSnapshot = namedtuple('GroundSnapshot', ['rotation_angle', 'world_scroll', 'char_image', 'char_rect'])
 
 class GroundView(BaseView):
+    supports_threaded_update = True
+
     def __init__(self, game_context):
         super().__init__()
         self.game_context = game_context
@@ -20,6 +26,8 @@ class GroundView(BaseView):
         self.biome_color = settings.BLACK
         self.parallax_mountains = []
         self._gv_star_pos_list = None # For caching star positions
+        self._gv_star_rng = None
+        self._terrain_generated = False
 
     def on_enter(self, params=None):
         self.player_char.reset_position()
@@ -28,8 +36,8 @@ class GroundView(BaseView):
         current_region_idx = self.game_context.get('current_region_idx')
         
         valid_data = False
+        star_system = self.game_context['current_star_system']
         if current_planet_idx is not None and current_region_idx is not None:
-            star_system = self.game_context['current_star_system']
             if 0 <= current_planet_idx < len(star_system.planets):
                 self.current_planet_data = star_system.planets[current_planet_idx]
                 if 0 <= current_region_idx < len(self.current_planet_data['regions']):
@@ -42,6 +50,9 @@ class GroundView(BaseView):
             self.next_state_request = (settings.PLANET_OVERHEAD_VIEW, {})
             return
 
+        if self._terrain_generated:
+            return # Pooled view: keep the terrain generated on the first landing
+
         self.ground_platforms = []
         self.parallax_mountains = []
         self._gv_star_pos_list = None # Reset star cache
@@ -53,26 +64,40 @@ class GroundView(BaseView):
                                            45, ship_height)
 
         world_width_for_elements = settings.SCREEN_WIDTH * 5
+        # Terrain is a function of the system seed and region, so a region looks the same on every
+        # landing (including after eviction from the view pool or a save/load)
+        rng = random.Random((star_system.seed << 16) | (current_planet_idx << 8) | current_region_idx)
 
-        for _p in range(random.randint(15,40)):
-            plat_x_world = random.randint(int(ship_world_x - world_width_for_elements / 2), 
+        for _p in range(rng.randint(15,40)):
+            plat_x_world = rng.randint(int(ship_world_x - world_width_for_elements / 2), 
                                      int(ship_world_x + world_width_for_elements / 2))
-            plat_y_world = random.randint(int(settings.SCREEN_HEIGHT * 0.4), 
+            plat_y_world = rng.randint(int(settings.SCREEN_HEIGHT * 0.4), 
                                      settings.SCREEN_HEIGHT - 100)
             temp_rect_world = pygame.Rect(plat_x_world, plat_y_world, 
-                                         random.randint(80,250), 20)
+                                         rng.randint(80,250), 20)
             if not temp_rect_world.colliderect(self.landed_ship_rect.inflate(40,40)):
                 self.ground_platforms.append(temp_rect_world)
         
-        for _m in range(random.randint(15,40)):
-            m_x_world = random.randint(int(ship_world_x - world_width_for_elements / 2), 
+        for _m in range(rng.randint(15,40)):
+            m_x_world = rng.randint(int(ship_world_x - world_width_for_elements / 2), 
                                   int(ship_world_x + world_width_for_elements / 2))
-            m_h = random.randint(50, settings.SCREEN_HEIGHT // 2)
-            m_w = m_h * random.uniform(1.5, 3.5)
+            m_h = rng.randint(50, settings.SCREEN_HEIGHT // 2)
+            m_w = m_h * rng.uniform(1.5, 3.5)
             mountain_rect_world = pygame.Rect(m_x_world, settings.SCREEN_HEIGHT - 50 - m_h, m_w, m_h)
-            self.parallax_mountains.append((mountain_rect_world, random.uniform(0.1, 0.7))) 
+            self.parallax_mountains.append((mountain_rect_world, rng.uniform(0.1, 0.7))) 
         
         self.parallax_mountains.sort(key=lambda x: x[1], reverse=True)
+        self._terrain_generated = True
+
+    def cache_bytes(self):
+        # Rects and tuples are small; a rough per-element estimate is enough for the pool cap
+        return (len(self.ground_platforms) + len(self.parallax_mountains)) * 200
+
+    def release_caches(self):
+        self.ground_platforms = []
+        self.parallax_mountains = []
+        self._gv_star_pos_list = None
+        self._terrain_generated = False
 
     def handle_event(self, event, mouse_pos, keys_pressed):
         if event.type == pygame.KEYDOWN and event.key == pygame.K_e:
@@ -92,34 +117,65 @@ class GroundView(BaseView):
 
         self.player_char.update(keys_pressed, self.ground_platforms, self.landed_ship_rect)
 
+    def make_snapshot(self):
+        if not self.current_planet_data:
+            return None
+        char = self.player_char
+        return GroundSnapshot(
+            rotation_angle=self.current_planet_data['rotation_angle'],
+            world_scroll=char.world_scroll,
+            char_image=char.image,
+            char_rect=char.rect.copy(),
+        )
+
     def render(self, screen, mouse_pos, frame_count): # MODIFIED: Signature matches BaseView
+        queue = self.render_queue
         if not self.current_planet_data or not self.current_region_data:
-            utils.draw_text("Error: Ground data not loaded.", "main", settings.RED, screen, 100, 100)
+            queue.text("Error: Ground data not loaded.", "main", settings.RED, (100, 100))
+            queue.flush(screen)
             return
+        snap = self.current_snapshot()
 
         sky_color = settings.DARK_GRAY
         num_stars = 0
         daylight_factor = 0.0
         
-        planet_rotation_gv = self.current_planet_data['rotation_angle']
+        planet_rotation_gv = snap.rotation_angle
         daylight_factor = (math.cos(math.radians(planet_rotation_gv + 180)) + 1) / 2.0 
         
         sky_color = utils.lerp_color(settings.DARK_GRAY, settings.LIGHT_BLUE, daylight_factor)
         num_stars = int(150 * max(0.0, 1.0 - daylight_factor * 1.5))
 
-        screen.fill(sky_color)
+        queue.draw(lambda surface: surface.fill(sky_color), render_queue.LAYER_BACKGROUND)
 
         if num_stars > 0:
             if self._gv_star_pos_list is None or len(self._gv_star_pos_list) != 150:
-                 random.seed(123 + int(planet_rotation_gv) % 360) # Seed changes slightly with rotation for variation
-                 self._gv_star_pos_list = [(random.randint(0,settings.SCREEN_WIDTH), random.randint(0,settings.SCREEN_HEIGHT-50)) for _ in range(150)]
-                 random.seed()
+                 # Local RNG so the sky never disturbs the (seeded, replayable) global RNG
+                 self._gv_star_rng = random.Random(123 + int(planet_rotation_gv) % 360) # Seed changes slightly with rotation for variation
+                 self._gv_star_pos_list = [(self._gv_star_rng.randint(0,settings.SCREEN_WIDTH), self._gv_star_rng.randint(0,settings.SCREEN_HEIGHT-50)) for _ in range(150)]
             
-            for i_star in range(min(num_stars, 150)):
-                pygame.draw.circle(screen,settings.WHITE,self._gv_star_pos_list[i_star],random.randint(1,2))
+            queue.blits(render_queue.dot_blits((self._gv_star_pos_list[i_star], self._gv_star_rng.randint(1,2), settings.WHITE)
+                                               for i_star in range(min(num_stars, 150))),
+                        render_queue.LAYER_STARS)
+
+        current_scroll_gv = snap.world_scroll
+        queue.draw(lambda surface: self._draw_landscape(surface, current_scroll_gv, daylight_factor))
+
+        if snap.char_image:
+            queue.blit(snap.char_image, snap.char_rect, render_queue.LAYER_SHIPS)
 
-        current_scroll_gv = self.player_char.world_scroll
+        region_name_gv = self.current_region_data.get('name', "Unknown Region")
+        queue.text(f"Region: {region_name_gv}", "main", settings.WHITE, (10, 10))
 
+        if self.landed_ship_rect and snap.char_rect.colliderect(
+            self.landed_ship_rect.move(int(current_scroll_gv),0)):
+            prompt_rect_screen = self.landed_ship_rect.move(int(current_scroll_gv),0)
+            queue.text("Press [E] to board ship", "main", settings.YELLOW,
+                       (prompt_rect_screen.centerx - 100, prompt_rect_screen.top - 30))
+        queue.flush(screen)
+
+    def _draw_landscape(self, screen, current_scroll_gv, daylight_factor):
+        """Mountains, ground, platforms and the landed ship. Polygons and rects: drawn directly."""
         for mount_rect_world, depth_gv in self.parallax_mountains:
             final_color_factor = (0.4 + (0.6 * (1 - depth_gv))) * (0.3 + 0.7 * daylight_factor)
             mount_color = tuple(max(0,min(255,int(c * final_color_factor))) for c in self.biome_color)
@@ -130,20 +186,20 @@ class GroundView(BaseView):
                 mount_rect_world.height
             )
             if shifted_rect_m_screen.right > 0 and shifted_rect_m_screen.left < settings.SCREEN_WIDTH:
-                pygame.draw.polygon(screen, mount_color, [
+                screen.draw_polygon(mount_color, [
                     (shifted_rect_m_screen.left, shifted_rect_m_screen.bottom),
                     (shifted_rect_m_screen.centerx, shifted_rect_m_screen.top),
                     (shifted_rect_m_screen.right, shifted_rect_m_screen.bottom)
                 ])
 
         ground_color_gv = tuple(max(0,min(255,int(c * (0.5 + 0.5 * daylight_factor)))) for c in self.biome_color)
-        pygame.draw.rect(screen, ground_color_gv, pygame.Rect(0, settings.SCREEN_HEIGHT - 50, settings.SCREEN_WIDTH, 50))
+        screen.draw_rect(ground_color_gv, pygame.Rect(0, settings.SCREEN_HEIGHT - 50, settings.SCREEN_WIDTH, 50))
 
         platform_color = utils.lerp_color(settings.DARK_GRAY, settings.GRAY, daylight_factor)
         for plat_rect_world in self.ground_platforms:
             shifted_rect_p_screen = plat_rect_world.move(int(current_scroll_gv), 0)
             if shifted_rect_p_screen.colliderect(screen.get_rect()):
-                pygame.draw.rect(screen, platform_color, shifted_rect_p_screen)
+                screen.draw_rect(platform_color, shifted_rect_p_screen)
 
         if self.landed_ship_rect:
              shifted_ship_r_screen = self.landed_ship_rect.move(int(current_scroll_gv), 0)
@@ -159,16 +215,5 @@ class GroundView(BaseView):
                       (shifted_ship_r_screen.centerx + 5, shifted_ship_r_screen.bottom - 15),
                       (shifted_ship_r_screen.right, shifted_ship_r_screen.bottom - 15)
                   ]
-                  pygame.draw.polygon(screen, ship_body_color, ship_pts_screen)
-                  pygame.draw.polygon(screen, ship_outline_color, ship_pts_screen, 2)
-
-        self.player_char.draw(screen)
-
-        region_name_gv = self.current_region_data.get('name', "Unknown Region")
-        utils.draw_text(f"Region: {region_name_gv}", "main", settings.WHITE, screen, 10, 10)
-
-        if self.landed_ship_rect and self.player_char.rect.colliderect(
-            self.landed_ship_rect.move(int(current_scroll_gv),0)):
-            prompt_rect_screen = self.landed_ship_rect.move(int(current_scroll_gv),0)
-            utils.draw_text("Press [E] to board ship", "main", settings.YELLOW, screen, 
-                            prompt_rect_screen.centerx - 100, prompt_rect_screen.top - 30)
\ No newline at end of file
+                  screen.draw_polygon(ship_body_color, ship_pts_screen)
+                  screen.draw_polygon(ship_outline_color, ship_pts_screen, 2)
\ No newline at end of file
@@ -2,10 +2,12 @@
 # -*- coding: utf-8 -*-
 import pygame
 import math
-import random
 from .base_view import BaseView
 from .. import settings
-from ..core import utils
+from ..core import render_queue, utils
+from ..core import quality
+from ..core.streaks import StreakField
+from ..core.warmup import SystemWarmupJob
 
 class HyperspaceView(BaseView):
     def __init__(self, game_context, target_system_idx):
@@ -14,15 +16,34 @@ class HyperspaceView(BaseView):
         self.target_system_idx = target_system_idx
         self.hyperspace_timer = 0
 
+        center = (settings.SCREEN_WIDTH / 2, settings.SCREEN_HEIGHT / 2)
+        self.streaks = StreakField(settings.HYPERSPACE_STREAK_COUNT, center,
+                                   math.hypot(settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT) / 2)
+        self._overlay = None # Fade overlay, allocated on first render and reused
+        self.warmup_job = None
+
     def on_enter(self, params=None):
         self.hyperspace_timer = 0
         # target_system_idx is set at __init__ or can be overridden if passed in params
         if params and 'target_system_idx' in params: 
             self.target_system_idx = params['target_system_idx']
 
+        # Pre-render the destination while the jump plays so arrival is not a cold start
+        if self.target_system_idx is not None:
+            self.warmup_job = SystemWarmupJob(self.game_context, self.target_system_idx)
+
+    def _anim_progress(self):
+        progress = self.hyperspace_timer / settings.HYPERSPACE_DURATION
+        return (1 - math.cos(progress * math.pi)) / 2
+
     def update(self, dt, mouse_pos, keys_pressed, frame_count):
         self.hyperspace_timer += 1
+        self.streaks.advance(self._anim_progress())
+        if self.warmup_job:
+            self.warmup_job.run()
+
         if self.hyperspace_timer >= settings.HYPERSPACE_DURATION:
+            self._finish_warmup()
             if self.target_system_idx is not None and \
                0 <= self.target_system_idx < len(self.game_context['star_systems']):
                 self.next_state_request = (settings.STAR_SYSTEM_VIEW, 
@@ -35,36 +56,46 @@ class HyperspaceView(BaseView):
                 # Fallback if target system is invalid
                 self.next_state_request = (settings.GALAXY_VIEW, {})
     
+    def _finish_warmup(self):
+        if not self.warmup_job:
+            return
+        self.warmup_job.cancel()
+        report = self.warmup_job.report()
+        self.game_context['last_warmup_report'] = report
+        print(f"Hyperspace warm-up for system {report['system_idx']}: "
+              f"{'finished' if report['finished'] else 'NOT finished'} before arrival "
+              f"({report['steps']} steps, {report['time_ms']} ms)")
+        self.warmup_job = None
+
+    def on_exit(self):
+        self._finish_warmup()
+
+    def cache_bytes(self):
+        streak_bytes = sum(a.itemsize * len(a) for a in (self.streaks.angle, self.streaks.speed, self.streaks.length,
+                                                         self.streaks.color_idx, self.streaks.dist,
+                                                         self.streaks.dir_x, self.streaks.dir_y))
+        return utils.surface_bytes(self._overlay) + streak_bytes
+
+    def release_caches(self):
+        self._overlay = None
+
     def render(self, screen, mouse_pos, frame_count): # MODIFIED: Signature matches BaseView
-        screen.fill(settings.BLACK)
+        queue = self.render_queue
+        queue.draw(lambda surface: surface.fill(settings.BLACK), render_queue.LAYER_BACKGROUND)
         
         progress = self.hyperspace_timer / settings.HYPERSPACE_DURATION
-        anim_progress = (1 - math.cos(progress * math.pi)) / 2 
+        anim_progress, streak_limit = self._anim_progress(), quality.get('hyperspace_streaks')
+        queue.draw(lambda surface: self.streaks.draw(surface, anim_progress, streak_limit)) # Lines: no sprite to batch
 
+        # Per-surface alpha on a plain surface is much cheaper than a per-pixel SRCALPHA fill
+        if self._overlay is None or self._overlay.get_size() != screen.get_size():
+            self._overlay = pygame.Surface(screen.get_size())
+            self._overlay.fill(settings.BLACK)
         overlay_alpha = int(math.sin(progress * math.pi) * 150)
-        overlay = pygame.Surface((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, overlay_alpha))
-        
-        center_v = pygame.Vector2(settings.SCREEN_WIDTH / 2, settings.SCREEN_HEIGHT / 2)
-
-        for _ in range(150):
-            start_offset_factor = (1 - anim_progress)
-            angle = random.uniform(0, 360)
-            direction = pygame.Vector2(1,0).rotate(angle)
-            # Ensure start_dist_from_center doesn't become negative if anim_progress > 1 (it shouldn't)
-            start_dist_from_center = max(0, start_offset_factor * random.uniform(0, settings.SCREEN_WIDTH*0.1))
-            start_pos = center_v + direction * start_dist_from_center
-            current_length = anim_progress * settings.SCREEN_WIDTH * 1.5 * random.uniform(0.1, 1.0)
-            
-            if current_length > 2:
-                end_pos = start_pos + direction * current_length
-                line_width = int(anim_progress * 3 + 1)
-                # Ensure line_width is at least 1 if anim_progress is very small
-                line_width = max(1, line_width) 
-                line_color = random.choice([settings.WHITE, settings.LIGHT_BLUE, (200,200,255)])
-                pygame.draw.line(screen, line_color, start_pos, end_pos, line_width)
-        
-        screen.blit(overlay, (0,0))
+        if overlay_alpha > 0:
+            self._overlay.set_alpha(overlay_alpha)
+            queue.blit(self._overlay, (0,0), render_queue.LAYER_OVERLAY)
         
-        utils.draw_text("HYPERSPACE TRAVEL", "main", settings.WHITE, screen, 
-                        settings.SCREEN_WIDTH // 2 - 100, settings.SCREEN_HEIGHT // 2 - 20)
\ No newline at end of file
+        queue.text("HYPERSPACE TRAVEL", "main", settings.WHITE,
+                   (settings.SCREEN_WIDTH // 2 - 100, settings.SCREEN_HEIGHT // 2 - 20))
+        queue.flush(screen)
\ No newline at end of file
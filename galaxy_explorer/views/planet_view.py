@@ -5,6 +5,7 @@ import math
 from .base_view import BaseView
 from .. import settings
 from ..core import utils # For assets and drawing functions
+from ..core import assets, planet_textures, quality, render_queue, texture_jobs
 
 class PlanetView(BaseView): # For Planet Overhead View
     def __init__(self, game_context):
@@ -14,7 +15,10 @@ class PlanetView(BaseView): # For Planet Overhead View
         
         self.planet_data = None
         self.planet_overhead_texture = None
-        self.texture_needs_update = True
+        self.texture_level = -1 # Index into PLANET_TEXTURE_LEVELS of the texture shown
+        self.texture_job = None
+        self.awaiting_chain = False # Waiting for the shared mip chain's build instead of running texture_job
+        self.planet_key = None # (system seed, planet idx), for the shared mip chain
         
         self.cached_original_ship_image_for_exit = None 
         self.hovered_region_idx = None
@@ -27,8 +31,15 @@ class PlanetView(BaseView): # For Planet Overhead View
 
         if current_star_system and current_planet_idx is not None and \
            0 <= current_planet_idx < len(current_star_system.planets):
-            self.planet_data = current_star_system.planets[current_planet_idx]
-            self.texture_needs_update = True 
+            planet_data = current_star_system.planets[current_planet_idx]
+            # A pooled view keeps its texture while it shows the same planet
+            if planet_data is not self.planet_data or self.planet_overhead_texture is None:
+                self.planet_overhead_texture = None
+                self.texture_level = -1
+            self.planet_data = planet_data
+            self.planet_key = (current_star_system.seed, current_planet_idx)
+            if self.texture_level < len(settings.PLANET_TEXTURE_LEVELS) - 1:
+                self._use_prefetched_texture()
         else:
             print(f"Error: Invalid planet index ({current_planet_idx}) or star system for PlanetView.")
             self.next_state_request = (settings.STAR_SYSTEM_VIEW, {}) # Fallback
@@ -55,8 +66,7 @@ class PlanetView(BaseView): # For Planet Overhead View
             self.player_ship.angle = -90 
             self.player_ship.velocity = pygame.Vector2(0,0)
 
-            self.player_ship.image = pygame.transform.rotate(self.player_ship.image_orig, self.player_ship.angle)
-            self.player_ship.rect = self.player_ship.image.get_rect(center=self.player_ship.pos)
+            self.player_ship.update_rect()
             self.player_ship.thrust_particles = []
 
 
@@ -75,9 +85,10 @@ class PlanetView(BaseView): # For Planet Overhead View
 
         current_star_system.update_orbits() 
         
-        if self.texture_needs_update and self.planet_data: 
-            self.planet_overhead_texture = utils.create_planet_texture(self.planet_data, settings.PLANET_OVERHEAD_SCALE)
-            self.texture_needs_update = False
+        if self.texture_job:
+            self._take_texture_level()
+        elif self.awaiting_chain:
+            self._take_chain_texture()
         
         self.player_ship.update(keys_pressed, mouse_pos, dt)
 
@@ -123,24 +134,78 @@ class PlanetView(BaseView): # For Planet Overhead View
                     self.hovered_region_idx = i
                     break
 
+    def _use_prefetched_texture(self):
+        prefetcher = self.game_context.get('texture_prefetcher')
+        if prefetcher: # Counts the entry as a hit, late or miss
+            texture = prefetcher.claim(*self.planet_key)
+        else:
+            texture = planet_textures.cached(*self.planet_key, planet_textures.OVERHEAD_LEVEL)
+        if texture: # Built earlier: prefetched, or here, or for the star system view
+            self._show_final_texture(texture, store=False)
+        elif planet_textures.is_pending(*self.planet_key): # Still building; it delivers the full level
+            self._cancel_texture_job()
+            self.awaiting_chain = True
+        else:
+            self._start_texture_job()
+
+    def _take_chain_texture(self):
+        texture = planet_textures.request(*self.planet_key, self.planet_data, planet_textures.OVERHEAD_LEVEL)
+        if texture:
+            self.awaiting_chain = False
+            self._show_final_texture(texture, store=False)
+        elif not planet_textures.is_pending(*self.planet_key): # Cancelled: build it here, level by level
+            self.awaiting_chain = False
+            self._start_texture_job()
+
+    def _show_final_texture(self, texture, store=True):
+        # The finished texture seeds the shared mip chain, so the star system view gets it too
+        self.planet_overhead_texture = planet_textures.store(*self.planet_key, self.planet_data, texture) \
+            if store else texture
+        self.texture_level = len(settings.PLANET_TEXTURE_LEVELS) - 1
+
+    def _start_texture_job(self):
+        self._cancel_texture_job()
+        self.texture_job = texture_jobs.submit(texture_jobs.planet_texture_job(
+            self.planet_data, settings.PLANET_OVERHEAD_SCALE, first_level=self.texture_level + 1))
+
+    def _take_texture_level(self):
+        finished = self.texture_job.done or self.texture_job.cancelled # Read before poll: the last level lands first
+        result = self.texture_job.poll()
+        if result:
+            self.texture_level, texture = result
+            if self.texture_level == len(settings.PLANET_TEXTURE_LEVELS) - 1:
+                self._show_final_texture(texture)
+            else:
+                self.planet_overhead_texture = assets.to_display_format(texture)
+        if finished:
+            self.texture_job = None
+
+    def _cancel_texture_job(self):
+        if self.texture_job:
+            self.texture_job.cancel()
+            self.texture_job = None
+
     def render(self, screen, mouse_pos, frame_count): 
-        screen.fill(settings.BLACK)
-        utils.draw_twinkling_stars(screen, frame_count)
+        queue = self.render_queue
+        queue.draw(lambda surface: surface.fill(settings.BLACK), render_queue.LAYER_BACKGROUND)
+        queue.blits(render_queue.dot_blits(utils.twinkling_star_dots(frame_count), canvas=screen), render_queue.LAYER_STARS,
+                    scaled=True)
 
         if not self.planet_data:
-            utils.draw_text("Error: No planet data loaded.", "main", settings.RED, screen, 100, 100)
+            queue.text("Error: No planet data loaded.", "main", settings.RED, (100, 100))
+            queue.flush(screen)
             return
 
         planet_center = (settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2)
         planet_draw_radius_scaled = self.planet_data['radius'] * settings.PLANET_OVERHEAD_SCALE
         
-        utils.draw_planet_light_and_shadow(screen, planet_center, planet_draw_radius_scaled, self.planet_data['angle'])
+        orbit_angle = self.planet_data['angle']
+        queue.draw(lambda surface: utils.draw_planet_light_and_shadow(surface, planet_center, planet_draw_radius_scaled,
+                                                                      orbit_angle))
 
         if self.planet_overhead_texture:
             R_ccw_logical = self.planet_data['rotation_angle']
-            rotated_texture_surf = pygame.transform.rotate(self.planet_overhead_texture, -R_ccw_logical) 
-            rotated_visual_rect = rotated_texture_surf.get_rect(center=planet_center)
-            screen.blit(rotated_texture_surf, rotated_visual_rect)
+            queue.blit_rotated(self.planet_overhead_texture, -R_ccw_logical, planet_center)
 
             if self.hovered_region_idx is not None:
                 hovered_region_data = self.planet_data['regions'][self.hovered_region_idx]
@@ -160,7 +225,7 @@ class PlanetView(BaseView): # For Planet Overhead View
                 if angle_range_deg == 0 and len(self.planet_data['regions']) == 1: 
                     angle_range_deg = 360.0
 
-                num_steps = max(5, int(angle_range_deg / 4)) 
+                num_steps = max(5, int(angle_range_deg / quality.get('mask_step_deg'))) 
                 if num_steps == 0 and angle_range_deg > 0 : num_steps = 1
 
                 for i_step in range(num_steps + 1):
@@ -177,19 +242,20 @@ class PlanetView(BaseView): # For Planet Overhead View
                     highlight_color = (settings.YELLOW[0], settings.YELLOW[1], settings.YELLOW[2], 100) 
                     pygame.draw.polygon(highlight_surf, highlight_color, points_for_highlight)
 
-                rotated_highlight_surf = pygame.transform.rotate(highlight_surf, -R_ccw_logical)
-                rotated_highlight_rect = rotated_highlight_surf.get_rect(center=planet_center)
-                screen.blit(rotated_highlight_surf, rotated_highlight_rect)
+                queue.blit_rotated(highlight_surf, -R_ccw_logical, planet_center)
         else:
             temp_planet_render_data = {'radius': int(planet_draw_radius_scaled),'color': self.planet_data.get('color', settings.GRAY)}
-            utils.draw_shaded_planet_simple(screen, temp_planet_render_data, planet_center)
-            utils.draw_text("Generating Texture...", "main", settings.YELLOW, screen, 
-                            planet_center[0] - 100, planet_center[1] - 10)
+            item = utils.shaded_planet_blit(temp_planet_render_data, planet_center)
+            if item:
+                queue.blit(*item)
+            queue.text("Generating Texture...", "main", settings.YELLOW,
+                       (planet_center[0] - 100, planet_center[1] - 10), render_queue.LAYER_WORLD)
 
         if self.player_ship:
-            self.player_ship.draw_particles(screen)
-            if self.player_ship.image: 
-                 screen.blit(self.player_ship.image, self.player_ship.rect)
+            queue.blits(render_queue.dot_blits(self.player_ship.particle_snapshot(), canvas=screen),
+                        render_queue.LAYER_PARTICLES, scaled=True)
+            queue.blit_rotated(self.player_ship.image_orig, self.player_ship.angle, self.player_ship.rect.center,
+                               render_queue.LAYER_SHIPS)
 
         # Draw Red 'X' over cursor if orientation is locked
         if self.player_ship and self.player_ship.orientation_locked:
@@ -198,38 +264,40 @@ class PlanetView(BaseView): # For Planet Overhead View
             x_size = 10 
             line_width = 3
             
-            pygame.draw.line(screen, settings.RED, 
-                             (cursor_x_pos - x_size, cursor_y_pos - x_size), 
-                             (cursor_x_pos + x_size, cursor_y_pos + x_size), line_width)
-            pygame.draw.line(screen, settings.RED, 
-                             (cursor_x_pos - x_size, cursor_y_pos + x_size), 
-                             (cursor_x_pos + x_size, cursor_y_pos - x_size), line_width)
+            queue.draw(lambda surface: utils.draw_lock_cross(surface, (cursor_x_pos, cursor_y_pos), x_size, line_width),
+                       render_queue.LAYER_HUD)
 
-        utils.draw_text(f"Planet: {self.planet_data.get('name', 'Unnamed Planet')}", "main", settings.WHITE, screen, settings.SCREEN_WIDTH // 2 - 150, 10)
+        queue.text(f"Planet: {self.planet_data.get('name', 'Unnamed Planet')}", "main", settings.WHITE,
+                   (settings.SCREEN_WIDTH // 2 - 150, 10))
 
         if self.hovered_region_idx is not None:
             hovered_region = self.planet_data['regions'][self.hovered_region_idx]
             text_to_draw = f"Press [E] to land on {hovered_region['name']}"
             
-            font = utils.assets.get_main_font() 
-            if font:
-                text_surf = font.render(text_to_draw, True, settings.YELLOW)
+            text_surf = utils.render_text(text_to_draw, "main", settings.YELLOW)
+            if text_surf:
                 text_rect = text_surf.get_rect(centerx=settings.SCREEN_WIDTH // 2, y=settings.SCREEN_HEIGHT - 70)
-                screen.blit(text_surf, text_rect)
-            else: 
-                utils.draw_text(text_to_draw, "main", settings.YELLOW, screen, 
-                                settings.SCREEN_WIDTH // 2 - 150, settings.SCREEN_HEIGHT - 70) 
+                queue.blit(text_surf, text_rect, render_queue.LAYER_HUD)
         else:
-            utils.draw_text("Fly over a region and press [E] to land. Fly off-screen to exit.", "small", settings.WHITE, screen,
-                            settings.SCREEN_WIDTH // 2 - 200, settings.SCREEN_HEIGHT - 50) 
+            queue.text("Fly over a region and press [E] to land. Fly off-screen to exit.", "small", settings.WHITE,
+                       (settings.SCREEN_WIDTH // 2 - 200, settings.SCREEN_HEIGHT - 50))
+        queue.flush(screen)
 
 
     def on_exit(self):
+        self._cancel_texture_job() # A partial texture is kept; on_enter resumes from its level
+        self.awaiting_chain = False # The shared build carries on; on_enter looks for it again
         if self.player_ship and self.cached_original_ship_image_for_exit:
             self.player_ship.image_orig = self.cached_original_ship_image_for_exit
             self.cached_original_ship_image_for_exit = None 
 
-            self.player_ship.image = pygame.transform.rotate(self.player_ship.image_orig, self.player_ship.angle)
-            self.player_ship.rect = self.player_ship.image.get_rect(center=self.player_ship.pos)
-        
-        self.planet_overhead_texture = None
\ No newline at end of file
+            self.player_ship.update_rect()
+
+    def cache_bytes(self):
+        return utils.surface_bytes(self.planet_overhead_texture)
+
+    def release_caches(self):
+        self._cancel_texture_job()
+        self.awaiting_chain = False
+        self.planet_overhead_texture = None
+        self.texture_level = -1
\ No newline at end of file
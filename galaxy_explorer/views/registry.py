@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import importlib
+import sys
+from collections import OrderedDict
+from .. import settings
+from ..core import startup
+
+# State -> (module, class). Modules are imported on first use so startup only pays for the first view.
+_VIEW_CLASSES = {
+    settings.GALAXY_VIEW: ('.galaxy_view', 'GalaxyView'),
+    settings.STAR_SYSTEM_VIEW: ('.star_system_view', 'StarSystemView'),
+    settings.PLANET_OVERHEAD_VIEW: ('.planet_view', 'PlanetView'),
+    settings.GROUND_VIEW: ('.ground_view', 'GroundView'),
+    settings.HYPERSPACE_TRANSITION: ('.hyperspace_view', 'HyperspaceView'),
+}
+
+def get_view_class(state_name):
+    """Imports (once) and returns the view class for a state, or None if the state is unknown."""
+    if state_name not in _VIEW_CLASSES:
+        return None
+    module_name, class_name = _VIEW_CLASSES[state_name]
+    full_name = __package__ + module_name
+    module = sys.modules.get(full_name)
+    if module is None:
+        with startup.TIMELINE.step(f"import {full_name}"):
+            module = importlib.import_module(module_name, __package__)
+    return getattr(module, class_name)
+
+def get_state_name(view):
+    """State name whose view class `view` is an instance of, or None."""
+    class_name = type(view).__name__
+    for state_name, (_, view_class_name) in _VIEW_CLASSES.items():
+        if view_class_name == class_name:
+            return state_name
+    return None
+
+class ViewRegistry:
+    """Keeps one view instance per state so caches survive transitions.
+
+    Star system, planet and ground views are keyed by the system/planet/region
+    they show. Pooled views are kept in LRU order and evicted (after
+    release_caches) when the pool exceeds VIEW_POOL_MAX_VIEWS or the summed
+    cache_bytes() exceeds VIEW_POOL_MEMORY_CAP_MB.
+    """
+
+    def __init__(self, game_context):
+        self.game_context = game_context
+        self._views = OrderedDict() # pool key -> view, least recently used first
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def _pool_key(self, state_name):
+        ctx = self.game_context
+        if state_name == settings.STAR_SYSTEM_VIEW:
+            return (state_name, ctx['current_star_system_idx'])
+        if state_name == settings.PLANET_OVERHEAD_VIEW:
+            return (state_name, ctx['current_star_system_idx'], ctx['current_planet_idx'])
+        if state_name == settings.GROUND_VIEW:
+            return (state_name, ctx['current_star_system_idx'], ctx['current_planet_idx'], ctx['current_region_idx'])
+        return (state_name,)
+
+    def _create(self, state_name, params):
+        view_class = get_view_class(state_name)
+        if view_class is None:
+            return None
+        if state_name == settings.HYPERSPACE_TRANSITION:
+            return view_class(self.game_context, params.get('target_system_idx'))
+        return view_class(self.game_context)
+
+    def acquire(self, state_name, params):
+        """Returns the view for state_name (resumed if pooled), or None for an unknown state.
+
+        The game context must already reflect the transition params.
+        """
+        key = self._pool_key(state_name)
+        view = self._views.get(key)
+        if view is not None:
+            self._views.move_to_end(key)
+            view.resume()
+            self.reused += 1
+            return view
+
+        view = self._create(state_name, params or {})
+        if view is None:
+            return None
+        self._views[key] = view
+        self.created += 1
+        return view
+
+    def items(self):
+        """(pool key, view) pairs, least recently used first."""
+        return list(self._views.items())
+
+    def memory_bytes(self):
+        return sum(view.cache_bytes() for view in self._views.values())
+
+    def enforce_limits(self, active_view):
+        """Evicts least recently used views (never active_view) until the pool is within limits."""
+        cap_bytes = settings.VIEW_POOL_MEMORY_CAP_MB * 1024 * 1024
+        for key in list(self._views.keys()):
+            if len(self._views) <= settings.VIEW_POOL_MAX_VIEWS and self.memory_bytes() <= cap_bytes:
+                break
+            view = self._views[key]
+            if view is active_view:
+                continue
+            view.release_caches()
+            del self._views[key]
+            self.evicted += 1
+            print(f"View pool: evicted {type(view).__name__} {key[1:]}")
+
+    def clear(self):
+        for view in self._views.values():
+            view.release_caches()
+        self._views.clear()
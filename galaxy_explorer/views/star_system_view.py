@@ -1,11 +1,25 @@
 # File: galaxy_explorer/views/star_system_view.py
 # -*- coding: utf-8 -*-
+from collections import namedtuple
 import pygame
 from .base_view import BaseView
 from .. import settings
-from ..core import utils
+from ..core import planet_textures, quality, render_queue, utils
+from ..core.camera import Camera
+from ..models import asteroids
+from ..models.ship import PlayerShip
+
+# Everything render() reads that update() changes
+StarSystemSnapshot = namedtuple('StarSystemSnapshot', [
+    'ship_sprite', 'ship_angle', 'ship_rect', 'orientation_locked', 'particles',
+    'planet_positions', 'hovered_planet_idx', 'hovered_gate',
+    'belt_positions', 'target', 'planet_rotations', 'camera',
+])
 
 class StarSystemView(BaseView):
+    supports_dirty_rects = True
+    supports_threaded_update = True
+
     def __init__(self, game_context):
         super().__init__()
         self.game_context = game_context
@@ -14,17 +28,27 @@ class StarSystemView(BaseView):
         
         self.hovered_planet_idx = None
         self.hovered_gate = False
+        self.targeted_asteroid = None # (belt index, rock index, distance)
         
         # View-specific flags for on_enter logic
         self._entered_once_flag_sv = False 
         self._last_system_name_viewed_sv = None
+        self._twinkle_rects = utils.get_twinkle_star_rects()
+        self._backdrop = None
+        self._backdrop_key = None
+        self._hidden_twinkles = frozenset()
+        self.camera = Camera()
+        self._rendered_camera = None # Offset of the last frame drawn; a change scrolls the whole screen
+        self._occluder_key = None
 
     def on_enter(self, params=None):
         # Ensure current_star_system is up-to-date from game_context at the moment of entry
         self.current_star_system = self.game_context['current_star_system']
+        planet_textures.cancel_pending(keep_seed=self.current_star_system.seed) # Builds for a system we left
         
         self.hovered_planet_idx = None
         self.hovered_gate = False
+        self.targeted_asteroid = None
         if self.player_ship: # Ensure player_ship exists
             self.player_ship.thrust_particles = [] # Clear particles on view entry
 
@@ -43,8 +67,7 @@ class StarSystemView(BaseView):
                 self.player_ship.velocity = pygame.Vector2(0, 0)
                 self.player_ship.angle = -90 # Pointing "up" screen
                 # Force immediate update of image and rect for first render
-                self.player_ship.image = pygame.transform.rotate(self.player_ship.image_orig, self.player_ship.angle)
-                self.player_ship.rect = self.player_ship.image.get_rect(center=self.player_ship.pos)
+                self.player_ship.update_rect()
                 positioned_specifically = True
 
             elif 'from_planet_idx' in params:
@@ -60,8 +83,7 @@ class StarSystemView(BaseView):
                     
                     self.player_ship.velocity = pygame.Vector2(0, 0)
                     self.player_ship.angle = -90 # Pointing "up" screen
-                    self.player_ship.image = pygame.transform.rotate(self.player_ship.image_orig, self.player_ship.angle)
-                    self.player_ship.rect = self.player_ship.image.get_rect(center=self.player_ship.pos)
+                    self.player_ship.update_rect()
                     positioned_specifically = True
                 else:
                     should_do_default_reset = True # Fallback if planet_idx is bad
@@ -78,11 +100,13 @@ class StarSystemView(BaseView):
             if should_do_default_reset and not positioned_specifically :
                 self.player_ship.reset_position(self.current_star_system)
             elif not positioned_specifically and not should_do_default_reset:
-                self.player_ship.image = pygame.transform.rotate(self.player_ship.image_orig, self.player_ship.angle)
-                self.player_ship.rect = self.player_ship.image.get_rect(center=self.player_ship.pos)
+                self.player_ship.update_rect()
 
         self._last_system_name_viewed_sv = self.current_star_system.name
         self._entered_once_flag_sv = True
+        if self.player_ship:
+            self.camera.follow(self.player_ship.pos, self.current_star_system.bounds)
+        self.mark_full_redraw()
 
     def handle_event(self, event, mouse_pos, keys_pressed):
         if event.type == pygame.KEYDOWN and event.key == pygame.K_e:
@@ -94,8 +118,12 @@ class StarSystemView(BaseView):
     def update(self, dt, mouse_pos, keys_pressed, frame_count):
         if not self.player_ship or not self.current_star_system : return
 
-        self.player_ship.update(keys_pressed, mouse_pos, dt)
+        # The ship steers towards the cursor, so the cursor goes into world coordinates
+        self.player_ship.update(keys_pressed, self.camera.to_world(mouse_pos), dt, self.current_star_system.bounds)
         self.current_star_system.update_orbits()
+        self.current_star_system.update_belts()
+        self._collide_with_asteroids()
+        self.targeted_asteroid = self._find_asteroid_target()
 
         self.hovered_planet_idx = None
         self.hovered_gate = False
@@ -116,86 +144,196 @@ class StarSystemView(BaseView):
             if ship_rect.colliderect(gate_interaction_rect):
                 self.hovered_gate = True
 
+        prefetcher = self.game_context.get('texture_prefetcher')
+        if prefetcher:
+            prefetcher.update(self.current_star_system, self.player_ship)
+
+        self.camera.follow(self.player_ship.pos, self.current_star_system.bounds)
+
+    def _collide_with_asteroids(self):
+        ship = self.player_ship
+        for belt in self.current_star_system.belts:
+            for i, _ in belt.query(ship.pos, settings.SHIP_COLLISION_RADIUS):
+                rock_pos = pygame.Vector2(belt.position(i))
+                normal = ship.pos - rock_pos
+                if normal.length_squared() == 0:
+                    continue
+                normal.normalize_ip()
+                # Push the ship out of the rock and reflect (and damp) the velocity component into it
+                ship.pos = rock_pos + normal * (settings.SHIP_COLLISION_RADIUS + asteroids.rock_radius(belt.sprite_idx[i]))
+                inward = ship.velocity.dot(normal)
+                if inward < 0:
+                    ship.velocity = (ship.velocity - normal * (2 * inward)) * settings.ASTEROID_BOUNCE
+                ship.rect.center = (int(ship.pos.x), int(ship.pos.y))
+
+    def _find_asteroid_target(self):
+        """Closest rock within ASTEROID_TARGET_RANGE of the ship, as (belt index, rock index, distance)."""
+        best = None
+        for belt_idx, belt in enumerate(self.current_star_system.belts):
+            hit = belt.nearest(self.player_ship.pos, settings.ASTEROID_TARGET_RANGE)
+            if hit and (best is None or hit[1] < best[2]):
+                best = (belt_idx, hit[0], hit[1])
+        return best
+
+    def _get_backdrop(self, size):
+        """Baked static layers for the current system; rebuilt only on system change, resize or quality change."""
+        system = self.current_star_system
+        key = (system.name, system.seed, size, quality.get('star_glow_step'))
+        if key != self._backdrop_key or self._backdrop is None:
+            self._backdrop = utils.get_system_backdrop(system, size)
+            self._backdrop_key = key
+            self._occluder_key = None
+            occluders = utils.get_system_backdrop_occluders(system, size)
+            self._hidden_twinkles = frozenset(i for i, rect in enumerate(self._twinkle_rects)
+                                              if rect.collidelist(occluders) != -1)
+        return self._backdrop
+
+    def _update_hidden_twinkles(self, size, camera):
+        """Twinkling stars under the star, gate or name of a system drawn without the backdrop."""
+        system = self.current_star_system
+        key = (system.name, system.seed, size, camera)
+        if key != self._occluder_key:
+            occluders = utils.get_system_backdrop_occluders(system, size, camera)
+            self._hidden_twinkles = frozenset(i for i, rect in enumerate(self._twinkle_rects)
+                                              if rect.collidelist(occluders) != -1)
+            self._occluder_key = key
+            self._backdrop_key = None # Its hidden set is gone: recompute it when a backdrop is used again
+
+    def cache_bytes(self):
+        return utils.surface_bytes(self._backdrop)
+
+    def release_caches(self):
+        self._backdrop = None
+        self._backdrop_key = None
+
+    def make_snapshot(self):
+        system = self.current_star_system
+        ship = self.player_ship
+        return StarSystemSnapshot(
+            ship_sprite=ship.image_orig if ship else None,
+            ship_angle=ship.angle if ship else 0,
+            ship_rect=ship.rect.copy() if ship else None,
+            orientation_locked=bool(ship and ship.orientation_locked),
+            particles=ship.particle_snapshot() if ship else (),
+            planet_positions=tuple(system.get_planet_position(i) for i in range(len(system.planets))) if system else (),
+            hovered_planet_idx=self.hovered_planet_idx,
+            hovered_gate=self.hovered_gate,
+            belt_positions=tuple((belt, belt.x, belt.y) for belt in system.belts) if system else (),
+            planet_rotations=tuple(planet['rotation_angle'] for planet in system.planets) if system else (),
+            target=self._target_snapshot(),
+            camera=self.camera.offset,
+        )
+
+    def _target_snapshot(self):
+        if self.targeted_asteroid is None:
+            return None
+        belt_idx, rock_idx, distance = self.targeted_asteroid
+        belt = self.current_star_system.belts[belt_idx]
+        return (belt.position(rock_idx), asteroids.rock_radius(belt.sprite_idx[rock_idx]), distance)
+
     def render(self, screen, mouse_pos, frame_count):
         if not self.current_star_system: 
             screen.fill(settings.BLACK)
             utils.draw_text("Error: No star system data.", "main", settings.RED, screen, 100, 100)
             return
 
-        screen.fill(settings.BLACK)
-        utils.draw_twinkling_stars(screen, frame_count)
-        
-        star_center_pos = (settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2)
-        
-        star_render_data = {
-            'radius': self.current_star_system.star_radius,
-            'color': self.current_star_system.star_color
-        }
-        utils.draw_shaded_planet_simple(screen, star_render_data, star_center_pos)
-        
-        star_glow_radius = int(self.current_star_system.star_radius * 1.5)
-        if star_glow_radius > 0:
-            star_glow_surf = pygame.Surface((star_glow_radius * 2, star_glow_radius * 2), pygame.SRCALPHA)
-            for i_glow in range(star_glow_radius, 0, -2):
-                t = i_glow / star_glow_radius 
-                alpha_factor = (1 - t**0.5) 
-                alpha = int(120 * alpha_factor) 
-                alpha = max(0, min(255, alpha))
-                glow_edge_color = utils.lerp_color(self.current_star_system.star_color, settings.WHITE, 0.3)
-                current_glow_color = utils.lerp_color(self.current_star_system.star_color, glow_edge_color, 1 - (i_glow / star_glow_radius))
-                pygame.draw.circle(star_glow_surf, (*current_glow_color, alpha),
-                                   (star_glow_radius, star_glow_radius), i_glow)
-            screen.blit(star_glow_surf, 
-                        (star_center_pos[0] - star_glow_radius, star_center_pos[1] - star_glow_radius),
-                        special_flags=pygame.BLEND_RGBA_ADD)
+        queue = self.render_queue
+        system = self.current_star_system
+        snap = self.current_snapshot()
+        cam_x, cam_y = snap.camera
+        if snap.camera != self._rendered_camera:
+            self.mark_full_redraw() # Scrolling moves everything on screen
+            self._rendered_camera = snap.camera
+        screen_rect = screen.get_rect()
+        view = screen_rect.move(cam_x, cam_y) # The part of the world on screen
 
-        for i, planet_data in enumerate(self.current_star_system.planets):
-            planet_pos = self.current_star_system.get_planet_position(i)
-            pygame.draw.circle(screen, settings.DARK_GRAY, star_center_pos, 
-                               planet_data['orbit_radius'], 1) 
-            
-            is_hovered = (i == self.hovered_planet_idx)
+        if system.fits_screen:
+            # Star, glow, orbit rings, idle gate and system name come pre-baked
+            queue.blit(self._get_backdrop(screen.get_size()), (0, 0), render_queue.LAYER_BACKGROUND)
+        else:
+            # Too big to bake: drawn each frame, skipping whatever is off screen
+            queue.draw(lambda surface: utils.draw_system_layers(surface, system, (cam_x, cam_y)),
+                       render_queue.LAYER_BACKGROUND)
+            queue.text(f"System: {system.name}", "main", settings.WHITE, (10, 10), render_queue.LAYER_BACKGROUND)
+            self._update_hidden_twinkles(screen.get_size(), snap.camera)
+        queue.blits(render_queue.dot_blits(utils.twinkling_star_dots(frame_count, self._hidden_twinkles), canvas=screen),
+                    render_queue.LAYER_STARS, scaled=True)
+
+        moving_rects = list(self._twinkle_rects)
+
+        for belt, xs, ys in snap.belt_positions:
+            queue.blits(belt.visible_blits(view, xs, ys, screen), scaled=True)
+            moving_rects.extend(rect.move(-cam_x, -cam_y).clip(screen_rect) for rect in belt.dirty_rects())
+
+        for i, planet_data in enumerate(system.planets):
+            planet_pos = snap.planet_positions[i]
+            planet_extent = planet_data['radius'] + 10
+            planet_rect = pygame.Rect(planet_pos[0] - planet_extent, planet_pos[1] - planet_extent,
+                                      planet_extent * 2, planet_extent * 2)
+            if not planet_rect.colliderect(view):
+                continue # Nearby planets' textures are still requested by the prefetcher
+            moving_rects.append(planet_rect.move(-cam_x, -cam_y))
+            planet_pos = (planet_pos[0] - cam_x, planet_pos[1] - cam_y)
+
+            is_hovered = (i == snap.hovered_planet_idx)
             if is_hovered: 
-                pygame.draw.circle(screen, settings.YELLOW, planet_pos, planet_data['radius'] + 7, 3)
+                ring_radius = planet_data['radius'] + 7
+                queue.draw(lambda surface, pos=planet_pos, r=ring_radius:
+                           surface.draw_circle(settings.YELLOW, pos, r, 3))
             
-            utils.draw_shaded_planet_simple(screen, planet_data, planet_pos)
+            texture = planet_textures.request(system.seed, i, planet_data, planet_textures.SYSTEM_LEVEL)
+            if texture:
+                queue.blit_rotated(texture, -snap.planet_rotations[i], planet_pos)
+            else: # Region texture still building in the background
+                item = utils.shaded_planet_blit(planet_data, planet_pos)
+                if item:
+                    queue.blit(*item)
 
         gate_render_rect = pygame.Rect(0,0,40,60)
-        gate_render_rect.center = self.current_star_system.jump_gate_pos
-        
-        gate_color = settings.PURPLE
-        outline_color = settings.WHITE
-        if self.hovered_gate: 
-            gate_color = settings.LIGHT_BLUE 
-            outline_color = settings.YELLOW
-            pygame.draw.rect(screen, outline_color, gate_render_rect.inflate(6,6), 3) 
-
-        pygame.draw.rect(screen, gate_color, gate_render_rect)
-        pygame.draw.rect(screen, outline_color, gate_render_rect, 2)
-        utils.draw_text("EXIT", "small", settings.WHITE, screen, 
-                        gate_render_rect.centerx - 15, gate_render_rect.centery - 8)
+        gate_render_rect.center = system.jump_gate_pos
+        gate_render_rect.move_ip(-cam_x, -cam_y)
+        if snap.hovered_gate: # The idle gate is part of the backdrop
+            gate_pos = gate_render_rect.center
+            queue.draw(lambda surface: utils.draw_jump_gate(surface, gate_pos, hovered=True))
+        moving_rects.append(gate_render_rect.inflate(10, 10)) # Hover outline toggles
 
-        if self.player_ship:
-            self.player_ship.draw_particles(screen)
-            if self.player_ship.image:
-                screen.blit(self.player_ship.image, self.player_ship.rect)
+        if snap.ship_rect:
+            ship_rect = snap.ship_rect.move(-cam_x, -cam_y)
+            queue.blits(render_queue.dot_blits(snap.particles, (-cam_x, -cam_y), screen), render_queue.LAYER_PARTICLES,
+                        scaled=True)
+            if snap.ship_sprite: # Turned here, on the main thread, rather than in the ship's update
+                queue.blit_rotated(snap.ship_sprite, snap.ship_angle, ship_rect.center, render_queue.LAYER_SHIPS)
+            moving_rects.append(ship_rect.inflate(4, 4))
+            for (px, py), _, _ in snap.particles:
+                moving_rects.append(pygame.Rect(px - cam_x - 6, py - cam_y - 6, 12, 12))
         
+        if snap.target:
+            (tx, ty), rock_r, distance = snap.target
+            tx, ty = tx - cam_x, ty - cam_y
+            reticle_r = rock_r + 6
+            queue.draw(lambda surface: surface.draw_circle(settings.YELLOW, (int(tx), int(ty)), reticle_r, 1),
+                       render_queue.LAYER_OVERLAY)
+            queue.text(f"{int(distance) // 10 * 10} px", "small", settings.YELLOW,
+                       (int(tx) + reticle_r + 2, int(ty) - 6), render_queue.LAYER_OVERLAY)
+            moving_rects.append(pygame.Rect(int(tx) - reticle_r - 2, int(ty) - reticle_r - 2,
+                                            reticle_r * 2 + 70, reticle_r * 2 + 4))
+
         # Draw Red 'X' over cursor if orientation is locked
-        if self.player_ship and self.player_ship.orientation_locked:
+        if snap.orientation_locked:
             cursor_x_pos = mouse_pos[0]
             cursor_y_pos = mouse_pos[1]
             x_size = 10 
             line_width = 3
             
-            pygame.draw.line(screen, settings.RED, 
-                             (cursor_x_pos - x_size, cursor_y_pos - x_size), 
-                             (cursor_x_pos + x_size, cursor_y_pos + x_size), line_width)
-            pygame.draw.line(screen, settings.RED, 
-                             (cursor_x_pos - x_size, cursor_y_pos + x_size), 
-                             (cursor_x_pos + x_size, cursor_y_pos - x_size), line_width)
-
-        utils.draw_text(f"System: {self.current_star_system.name}", "main", settings.WHITE, screen, 10, 10)
-
-        if self.hovered_planet_idx is not None or self.hovered_gate:
-            utils.draw_text("Press [E] to interact", "small", settings.YELLOW, screen, 
-                            settings.SCREEN_WIDTH // 2 - 70, settings.SCREEN_HEIGHT - 30)
\ No newline at end of file
+            queue.draw(lambda surface: utils.draw_lock_cross(surface, (cursor_x_pos, cursor_y_pos), x_size, line_width),
+                       render_queue.LAYER_HUD)
+            moving_rects.append(pygame.Rect(cursor_x_pos - x_size - 3, cursor_y_pos - x_size - 3,
+                                            x_size * 2 + 6, x_size * 2 + 6))
+
+        if snap.hovered_planet_idx is not None or snap.hovered_gate:
+            queue.text("Press [E] to interact", "small", settings.YELLOW,
+                       (settings.SCREEN_WIDTH // 2 - 70, settings.SCREEN_HEIGHT - 30))
+        moving_rects.append(pygame.Rect(settings.SCREEN_WIDTH // 2 - 70, settings.SCREEN_HEIGHT - 30, 200, 24))
+        queue.flush(screen)
+
+        self.mark_moving(moving_rects)
\ No newline at end of file